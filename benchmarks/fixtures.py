@@ -0,0 +1,88 @@
+import itertools
+import uuid
+from typing import Any, Dict, List
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.dialects.postgresql import insert
+
+from benchmarks.harness import BenchContext
+
+PASSWORD = "SecurePass123!"
+_emails = itertools.count()
+
+
+def unique_email(prefix: str = "bench") -> str:
+    return f"{prefix}-{next(_emails)}-{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _seed_rows(ctx: BenchContext, seed_users: int) -> List[Dict[str, Any]]:
+    from src.core.security import hash_password
+
+    hashed = hash_password(PASSWORD)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "name": f"Bench User {i}",
+            "email": f"seed-{i}@example.com",
+            "hashed_password": hashed,
+            "is_public": i % 2 == 0,
+            "is_active": True,
+        }
+        for i in range(seed_users)
+    ]
+    ctx.resources["user_ids"] = sorted(row["id"] for row in rows)
+    ctx.resources["hashed_password"] = hashed
+    return rows
+
+
+async def setup_database(ctx: BenchContext, seed_users: int) -> None:
+    """Recreate the schema and seed users with one shared precomputed hash."""
+    from src.core.database import get_engine
+    from src.database import Base, User
+
+    engine = get_engine()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    rows = _seed_rows(ctx, seed_users)
+    async with engine.begin() as conn:
+        for start in range(0, len(rows), 1000):
+            await conn.execute(insert(User).values(rows[start:start + 1000]))
+
+
+def seed_memory_store(ctx: BenchContext, seed_users: int) -> None:
+    """Seed the in-memory user repository instead of Postgres."""
+    from src.repository.memory import get_memory_user_store
+    from src.service.models import UserDTO
+
+    store = get_memory_user_store()
+    store.clear()
+    for row in _seed_rows(ctx, seed_users):
+        store.add(UserDTO.model_construct(**row, version=1))
+
+
+def user_ids(ctx: BenchContext) -> List[uuid.UUID]:
+    return ctx.resources["user_ids"]
+
+
+def get_client(ctx: BenchContext) -> AsyncClient:
+    client = ctx.resources.get("client")
+    if client is None:
+        from src.app import app
+
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+        ctx.resources["client"] = client
+    return client
+
+
+async def teardown(ctx: BenchContext) -> None:
+    from src.core.database import database
+    from src.core.security import shutdown_hashing_engine
+
+    client = ctx.resources.pop("client", None)
+    if client is not None:
+        await client.aclose()
+    shutdown_hashing_engine()
+    await database.dispose()
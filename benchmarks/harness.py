@@ -0,0 +1,147 @@
+import asyncio
+import inspect
+import json
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+Operation = Callable[[], Any]
+Setup = Callable[["BenchContext"], Awaitable[Operation]]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    suite: str
+    setup: Setup
+    iterations: int
+    concurrency: int = 1
+    warmup: int = 5
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    suite: str
+    iterations: int
+    concurrency: int
+    p50_ms: float
+    p99_ms: float
+    mean_ms: float
+    ops_per_sec: float
+
+    def row(self) -> str:
+        return (
+            f"{self.name:<44} {self.iterations:>7} {self.concurrency:>5} "
+            f"{self.p50_ms:>10.3f} {self.p99_ms:>10.3f} {self.ops_per_sec:>12.1f}"
+        )
+
+
+HEADER = (
+    f"{'benchmark':<44} {'iters':>7} {'conc':>5} "
+    f"{'p50 ms':>10} {'p99 ms':>10} {'ops/s':>12}"
+)
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(
+    name: str, suite: str, iterations: int = 200, concurrency: int = 1, warmup: int = 5
+) -> Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS.append(Benchmark(name, suite, setup, iterations, concurrency, warmup))
+        return setup
+    return register
+
+
+@dataclass
+class BenchContext:
+    """Shared fixtures handed to every benchmark setup function."""
+
+    database_url: str
+    resources: Dict[str, Any] = field(default_factory=dict)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    index = max(0, math.ceil(q * len(ordered)) - 1)
+    return ordered[index]
+
+
+async def _call(op: Operation) -> None:
+    result = op()
+    if inspect.isawaitable(result):
+        await result
+
+
+async def run_benchmark(
+    bench: Benchmark,
+    ctx: BenchContext,
+    iterations: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> BenchmarkResult:
+    op = await bench.setup(ctx)
+    iterations = iterations or bench.iterations
+    concurrency = concurrency or bench.concurrency
+
+    for _ in range(bench.warmup):
+        await _call(op)
+
+    samples: List[float] = []
+    remaining = iterations
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await _call(op)
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return BenchmarkResult(
+        name=bench.name,
+        suite=bench.suite,
+        iterations=len(samples),
+        concurrency=concurrency,
+        p50_ms=percentile(samples, 0.50) * 1000,
+        p99_ms=percentile(samples, 0.99) * 1000,
+        mean_ms=sum(samples) / len(samples) * 1000,
+        ops_per_sec=len(samples) / elapsed,
+    )
+
+
+def save_results(path: str, results: List[BenchmarkResult]) -> None:
+    with open(path, "w") as f:
+        json.dump({r.name: asdict(r) for r in results}, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, BenchmarkResult]:
+    with open(path) as f:
+        return {name: BenchmarkResult(**data) for name, data in json.load(f).items()}
+
+
+def compare_results(
+    baseline: Dict[str, BenchmarkResult],
+    results: List[BenchmarkResult],
+    threshold: float,
+) -> List[str]:
+    """Return one line per benchmark whose p50 or throughput regressed past threshold."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        p50_change = (result.p50_ms - base.p50_ms) / base.p50_ms
+        ops_change = (base.ops_per_sec - result.ops_per_sec) / base.ops_per_sec
+        print(
+            f"{result.name:<44} p50 {base.p50_ms:>9.3f} -> {result.p50_ms:>9.3f} ms "
+            f"({p50_change:+.1%})  ops/s {base.ops_per_sec:>10.1f} -> {result.ops_per_sec:>10.1f}"
+        )
+        if p50_change > threshold or ops_change > threshold:
+            regressions.append(result.name)
+    return regressions
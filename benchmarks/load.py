@@ -0,0 +1,124 @@
+import itertools
+
+from benchmarks.fixtures import PASSWORD, get_client, unique_email, user_ids
+from benchmarks.harness import BenchContext, benchmark
+
+
+def _check(response, status: int = 200) -> None:
+    if response.status_code != status:
+        raise RuntimeError(f"{response.request.method} {response.request.url}: {response.status_code}")
+
+
+@benchmark("api.ping", "load", iterations=5000, concurrency=50)
+async def bench_ping(ctx: BenchContext):
+    client = get_client(ctx)
+
+    async def op():
+        _check(await client.get("/ping"))
+    return op
+
+
+@benchmark("api.get_user", "load", iterations=5000, concurrency=50)
+async def bench_get_user(ctx: BenchContext):
+    client = get_client(ctx)
+    ids = itertools.cycle(user_ids(ctx))
+
+    async def op():
+        _check(await client.get(f"/users/{next(ids)}"))
+    return op
+
+
+@benchmark("api.get_user_hot", "load", iterations=5000, concurrency=50)
+async def bench_get_user_hot(ctx: BenchContext):
+    client = get_client(ctx)
+    hot_id = user_ids(ctx)[0]
+
+    async def op():
+        _check(await client.get(f"/users/{hot_id}"))
+    return op
+
+
+@benchmark("api.auth_me", "load", iterations=5000, concurrency=50)
+async def bench_auth_me(ctx: BenchContext):
+    from src.core.auth import get_token_signer
+
+    client = get_client(ctx)
+    signer = get_token_signer()
+    token = signer.encode(signer.issue(user_ids(ctx)[0], "seed-0@example.com"))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def op():
+        _check(await client.get("/auth/me", headers=headers))
+    return op
+
+
+@benchmark("api.list_users[50]", "load", iterations=1000, concurrency=20)
+async def bench_list_users(ctx: BenchContext):
+    client = get_client(ctx)
+
+    async def op():
+        _check(await client.get("/users", params={"limit": 50}))
+    return op
+
+
+@benchmark("api.get_users_batch[50]", "load", iterations=1000, concurrency=20)
+async def bench_get_users_batch(ctx: BenchContext):
+    client = get_client(ctx)
+    ids = ",".join(str(user_id) for user_id in user_ids(ctx)[:50])
+
+    async def op():
+        _check(await client.get("/users", params={"ids": ids}))
+    return op
+
+
+@benchmark("api.update_user", "load", iterations=2000, concurrency=20)
+async def bench_update_user(ctx: BenchContext):
+    client = get_client(ctx)
+    ids = itertools.cycle(user_ids(ctx))
+
+    async def op():
+        _check(await client.put(f"/users/{next(ids)}", json={"name": "Renamed"}))
+    return op
+
+
+@benchmark("api.deactivate_user", "load", iterations=2000, concurrency=20)
+async def bench_deactivate_user(ctx: BenchContext):
+    client = get_client(ctx)
+    ids = itertools.cycle(user_ids(ctx))
+
+    async def op():
+        _check(await client.delete(f"/users/{next(ids)}"), status=204)
+    return op
+
+
+@benchmark("api.create_user", "load", iterations=200, concurrency=20, warmup=2)
+async def bench_create_user(ctx: BenchContext):
+    client = get_client(ctx)
+
+    async def op():
+        payload = {"name": "Bench", "email": unique_email(), "password": PASSWORD}
+        _check(await client.post("/users/", json=payload), status=201)
+    return op
+
+
+@benchmark("api.create_user_duplicate", "load", iterations=1000, concurrency=20)
+async def bench_create_user_duplicate(ctx: BenchContext):
+    client = get_client(ctx)
+
+    async def op():
+        payload = {"name": "Bench", "email": "SEED-0@example.com", "password": PASSWORD}
+        _check(await client.post("/users/", json=payload), status=409)
+    return op
+
+
+@benchmark("api.create_users_bulk[100]", "load", iterations=5, concurrency=1, warmup=1)
+async def bench_create_users_bulk(ctx: BenchContext):
+    client = get_client(ctx)
+
+    async def op():
+        users = [
+            {"name": "Bench", "email": unique_email(), "password": PASSWORD}
+            for _ in range(100)
+        ]
+        _check(await client.post("/users/bulk", json={"users": users}))
+    return op
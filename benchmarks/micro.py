@@ -0,0 +1,269 @@
+import itertools
+import json
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+
+from benchmarks.fixtures import PASSWORD, unique_email, user_ids
+from benchmarks.harness import BenchContext, benchmark
+from src.core.auth import TokenSigner
+from src.core.batcher import MicroBatcher
+from src.core.database import database
+from src.core.events import UserEvent
+from src.core.feed import UserEventHub
+from src.core.security import hash_password
+from src.database import User
+from src.interface.responses import FastJSONResponse, MsgPackResponse
+from src.interface.routers.user import _user_response
+from src.interface.schemas import UserPageSchema, UserResponseSchema
+from src.repository.user import GET_PROFILE, PUBLIC_COLUMNS, UserRepository, _to_dto
+from src.service.models import UserDTO
+
+def _orm_user(ctx: BenchContext) -> User:
+    return User(
+        id=uuid.uuid4(),
+        name="Bench User",
+        email="bench@example.com",
+        hashed_password=ctx.resources["hashed_password"],
+        is_public=True,
+        is_active=True,
+    )
+
+
+@benchmark("security.hash_password", "micro", iterations=20, warmup=1)
+async def bench_hash_password(ctx: BenchContext):
+    return lambda: hash_password(PASSWORD)
+
+
+@benchmark("auth.verify_token", "micro", iterations=20000, warmup=100)
+async def bench_verify_token(ctx: BenchContext):
+    signer = TokenSigner([b"bench-secret"], ttl_seconds=900)
+    token = signer.encode(signer.issue(uuid.uuid4(), "bench@example.com"))
+    return lambda: signer.verify(token)
+
+
+@benchmark("dto.model_validate", "micro", iterations=20000, warmup=100)
+async def bench_dto_model_validate(ctx: BenchContext):
+    user = _orm_user(ctx)
+    return lambda: UserDTO.model_validate(user)
+
+
+@benchmark("schema.serialize", "micro", iterations=20000, warmup=100)
+async def bench_schema_serialize(ctx: BenchContext):
+    dto = UserDTO.model_validate(_orm_user(ctx))
+    return lambda: UserResponseSchema.model_validate(dto).model_dump_json()
+
+
+async def _public_row(ctx: BenchContext):
+    async with database.session() as session:
+        result = await session.execute(
+            select(*PUBLIC_COLUMNS).where(User.id == user_ids(ctx)[0])
+        )
+        return result.one()
+
+
+@benchmark("read_path.validated", "micro", iterations=20000, warmup=100)
+async def bench_read_path_validated(ctx: BenchContext):
+    row = await _public_row(ctx)
+    return lambda: UserResponseSchema.model_validate(UserDTO.model_validate(row)).model_dump_json()
+
+
+@benchmark("read_path.trusted", "micro", iterations=20000, warmup=100)
+async def bench_read_path_trusted(ctx: BenchContext):
+    row = await _public_row(ctx)
+    return lambda: _user_response(UserDTO.model_construct(**row._mapping)).model_dump_json()
+
+
+def _user_page(size: int) -> UserPageSchema:
+    return UserPageSchema.model_construct(
+        items=[
+            UserResponseSchema.model_construct(
+                id=uuid.uuid4(),
+                name=f"Bench User {i}",
+                email=f"bench{i}@example.com",
+                is_public=True,
+                is_active=True,
+            )
+            for i in range(size)
+        ],
+        next_cursor=None,
+    )
+
+
+@benchmark("encode.jsonable_encoder[500]", "micro", iterations=200)
+async def bench_encode_jsonable(ctx: BenchContext):
+    page = _user_page(500)
+    return lambda: json.dumps(jsonable_encoder(page)).encode()
+
+
+@benchmark("encode.json[500]", "micro", iterations=200)
+async def bench_encode_json(ctx: BenchContext):
+    page = _user_page(500)
+    return lambda: FastJSONResponse(page)
+
+
+@benchmark("encode.msgpack[500]", "micro", iterations=200)
+async def bench_encode_msgpack(ctx: BenchContext):
+    page = _user_page(500)
+    return lambda: MsgPackResponse(page)
+
+
+def _cycle_ids(ctx: BenchContext):
+    return itertools.cycle(user_ids(ctx))
+
+
+@benchmark("repository.get", "micro", iterations=2000)
+async def bench_repository_get(ctx: BenchContext):
+    ids = _cycle_ids(ctx)
+
+    async def op():
+        async with database.session() as session:
+            await UserRepository(session).get(next(ids))
+    return op
+
+
+@benchmark("repository.get_profile", "micro", iterations=2000)
+async def bench_repository_get_profile(ctx: BenchContext):
+    ids = _cycle_ids(ctx)
+
+    async def op():
+        async with database.session() as session:
+            await UserRepository(session).get_profile(next(ids))
+    return op
+
+
+def _orm_profile_select(user_id: uuid.UUID):
+    # How the repository used to build its reads: a fresh ORM-enabled select per call.
+    return select(
+        User.id, User.name, User.email, User.is_public, User.is_active, User.version
+    ).where(User.id == user_id)
+
+
+@benchmark("statement.build[adhoc_orm]", "micro", iterations=20000, warmup=100)
+async def bench_statement_adhoc(ctx: BenchContext):
+    user_id = user_ids(ctx)[0]
+    return lambda: _orm_profile_select(user_id)._generate_cache_key()
+
+
+@benchmark("statement.build[cached]", "micro", iterations=20000, warmup=100)
+async def bench_statement_cached(ctx: BenchContext):
+    return lambda: GET_PROFILE._generate_cache_key()
+
+
+@benchmark("repository.get_profile[adhoc_orm]", "micro", iterations=2000)
+async def bench_repository_get_profile_adhoc(ctx: BenchContext):
+    ids = _cycle_ids(ctx)
+
+    async def op():
+        async with database.session() as session:
+            result = await session.execute(_orm_profile_select(next(ids)))
+            _to_dto(result.one())
+    return op
+
+
+@benchmark("repository.get_many[50]", "micro", iterations=1000)
+async def bench_repository_get_many(ctx: BenchContext):
+    batch = user_ids(ctx)[:50]
+
+    async def op():
+        async with database.session() as session:
+            await UserRepository(session).get_many(batch)
+    return op
+
+
+@benchmark("repository.get_page[50]", "micro", iterations=1000)
+async def bench_repository_get_page(ctx: BenchContext):
+    ids = _cycle_ids(ctx)
+
+    async def op():
+        async with database.session() as session:
+            await UserRepository(session).get_page(50, after=next(ids))
+    return op
+
+
+@benchmark("repository.create", "micro", iterations=1000)
+async def bench_repository_create(ctx: BenchContext):
+    hashed = ctx.resources["hashed_password"]
+
+    async def op():
+        async with database.session() as session:
+            await UserRepository(session).create(
+                UserDTO(name="Bench", email=unique_email(), hashed_password=hashed)
+            )
+    return op
+
+
+@benchmark("repository.create[concurrent]", "micro", iterations=2000, concurrency=32)
+async def bench_repository_create_concurrent(ctx: BenchContext):
+    return await bench_repository_create(ctx)
+
+
+@benchmark("repository.create[batched]", "micro", iterations=2000, concurrency=32)
+async def bench_repository_create_batched(ctx: BenchContext):
+    hashed = ctx.resources["hashed_password"]
+
+    async def flush(users):
+        async with database.session() as session:
+            return await UserRepository(session).create_batch(users)
+
+    batcher = MicroBatcher(flush, max_size=64, max_wait=0.002, name="bench")
+
+    async def op():
+        await batcher.submit(UserDTO(name="Bench", email=unique_email(), hashed_password=hashed))
+    return op
+
+
+@benchmark("repository.create_many[100]", "micro", iterations=50)
+async def bench_repository_create_many(ctx: BenchContext):
+    hashed = ctx.resources["hashed_password"]
+
+    async def op():
+        users = [
+            UserDTO(name="Bench", email=unique_email(), hashed_password=hashed)
+            for _ in range(100)
+        ]
+        async with database.session() as session:
+            await UserRepository(session).create_many(users)
+    return op
+
+
+@benchmark("repository.update", "micro", iterations=1000)
+async def bench_repository_update(ctx: BenchContext):
+    ids = _cycle_ids(ctx)
+
+    async def op():
+        async with database.session() as session:
+            await UserRepository(session).update(next(ids), {"name": "Renamed"})
+    return op
+
+
+@benchmark("repository.update[notify]", "micro", iterations=1000)
+async def bench_repository_update_notify(ctx: BenchContext):
+    ids = _cycle_ids(ctx)
+
+    async def op():
+        async with database.session() as session:
+            repo = UserRepository(session, events_channel="bench_user_events")
+            await repo.update(next(ids), {"name": "Renamed"})
+    return op
+
+
+@benchmark("feed.fan_out[1000]", "micro", iterations=2000, warmup=10)
+async def bench_feed_fan_out(ctx: BenchContext):
+    # Queues are sized for the whole run so every event takes the normal fan-out path.
+    hub = UserEventHub(queue_size=2010)
+    for _ in range(1000):
+        hub.subscribe()
+    event = UserEvent(op="update", ids=(uuid.uuid4(),), at=0.0, seq=1)
+    return lambda: hub.on_event(event)
+
+
+@benchmark("repository.deactivate", "micro", iterations=1000)
+async def bench_repository_deactivate(ctx: BenchContext):
+    ids = _cycle_ids(ctx)
+
+    async def op():
+        async with database.session() as session:
+            await UserRepository(session).deactivate(next(ids))
+    return op
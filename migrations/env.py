@@ -63,9 +63,10 @@ def run_migrations_online() -> None:
 
     """
     import asyncio
-    from src.core.database import engine
+    from src.core.database import get_engine
     
     async def run_async_migrations():
+        engine = get_engine()
         async with engine.begin() as connection:
             await connection.run_sync(do_run_migrations)
         
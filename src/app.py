@@ -1,19 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from src.interface.routers.user import router as user_router
-from src.core import get_settings
+from src.interface.routers.auth import router as auth_router
+from src.interface.routers.system import router as system_router
+from src.core import database, get_settings
+from src.core.auth import get_token_signer
+from src.core.cache import get_user_cache
+from src.core.di import build_user_event_listener
+from src.core.events import user_events_enabled
+from src.core.feed import UserEventHub
+from src.core.metrics import MetricsMiddleware
+from src.core.security import shutdown_hashing_engine
+from src.interface.responses import FastJSONResponse
+from src.warmup import WarmupState, warm_up
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Refuses to start without AUTH_SECRET_KEY where a per-process key would break tokens.
+    get_token_signer()
+    if settings.user_cache_enabled:
+        # Fails fast on a shared cache address without an authkey.
+        get_user_cache()
+    database.connect()
+    app.state.warmup = WarmupState(started=settings.warmup_enabled)
+    warmup = None
+    if settings.warmup_enabled:
+        warmup = asyncio.create_task(warm_up(app.state.warmup, database, settings))
+    app.state.user_feed = None
+    app.state.user_events = None
+    if user_events_enabled(settings):
+        if settings.user_feed_enabled:
+            app.state.user_feed = UserEventHub(
+                buffer_size=settings.user_feed_buffer_size,
+                queue_size=settings.user_feed_queue_size,
+            )
+        app.state.user_events = build_user_event_listener(app.state.user_feed)
+        app.state.user_events.start()
+    yield
+    if app.state.user_events is not None:
+        await app.state.user_events.stop()
+    if warmup is not None:
+        warmup.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmup
+    await database.dispose()
+    shutdown_hashing_engine()
+
+
 app = FastAPI(
     title=settings.title,
     description="API for managing and retrieving skill maps.",
     version=settings.version,
     debug=settings.debug,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(user_router)
+app.include_router(auth_router)
+app.include_router(system_router)
 
 
 @app.get("/ping")
 async def ping():
-    return {"message": "pong!"}
\ No newline at end of file
+    return {"message": "pong!"}
@@ -1,4 +1,4 @@
 from src.core.settings import Settings, get_settings
-from src.core.database import engine, AsyncSessionLocal, get_session
+from src.core.database import database, get_engine, get_session, get_pool_stats
 
-__all__ = ["Settings", "get_settings", "engine", "AsyncSessionLocal", "get_session"]
+__all__ = ["Settings", "get_settings", "database", "get_engine", "get_session", "get_pool_stats"]
@@ -0,0 +1,178 @@
+import base64
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import orjson
+
+from src.core.cache import LRUCache
+from src.core.exceptions import TooManyRequestsException, UnauthorizedException
+from src.core.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    user_id: uuid.UUID
+    email: str
+    issued_at: int
+    expires_at: int
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def key_id(secret: bytes) -> str:
+    return hashlib.sha256(secret).hexdigest()[:8]
+
+
+class TokenSigner:
+    """Issues and verifies HS256 JWTs without touching the database.
+
+    Tokens are signed with the first key; every key in ``keys`` is accepted
+    for verification so secrets can be rotated without logging users out.
+    """
+
+    def __init__(self, keys: List[bytes], ttl_seconds: int):
+        self.keys: Dict[str, bytes] = {key_id(key): key for key in keys}
+        self.active_kid = key_id(keys[0])
+        self.ttl_seconds = ttl_seconds
+        self._header = _b64encode(
+            orjson.dumps({"alg": "HS256", "typ": "JWT", "kid": self.active_kid})
+        )
+
+    def _sign(self, key: bytes, signing_input: str) -> bytes:
+        return hmac.new(key, signing_input.encode("ascii"), hashlib.sha256).digest()
+
+    def issue(self, user_id: uuid.UUID, email: str, now: Optional[int] = None) -> TokenClaims:
+        issued_at = int(time.time()) if now is None else now
+        return TokenClaims(user_id, email, issued_at, issued_at + self.ttl_seconds)
+
+    def encode(self, claims: TokenClaims) -> str:
+        payload = _b64encode(orjson.dumps({
+            "sub": str(claims.user_id),
+            "email": claims.email,
+            "iat": claims.issued_at,
+            "exp": claims.expires_at,
+        }))
+        signing_input = f"{self._header}.{payload}"
+        signature = self._sign(self.keys[self.active_kid], signing_input)
+        return f"{signing_input}.{_b64encode(signature)}"
+
+    def verify(self, token: str, now: Optional[float] = None) -> TokenClaims:
+        try:
+            header_b64, payload_b64, signature_b64 = token.split(".")
+            header = orjson.loads(_b64decode(header_b64))
+            key = self.keys.get(header.get("kid"))
+            if key is None or header.get("alg") != "HS256":
+                raise UnauthorizedException("Invalid token", code="invalid_token")
+            expected = self._sign(key, f"{header_b64}.{payload_b64}")
+            if not hmac.compare_digest(expected, _b64decode(signature_b64)):
+                raise UnauthorizedException("Invalid token", code="invalid_token")
+            payload = orjson.loads(_b64decode(payload_b64))
+            claims = TokenClaims(
+                user_id=uuid.UUID(payload["sub"]),
+                email=payload["email"],
+                issued_at=int(payload["iat"]),
+                expires_at=int(payload["exp"]),
+            )
+        except (ValueError, KeyError, TypeError, AttributeError, orjson.JSONDecodeError):
+            raise UnauthorizedException("Invalid token", code="invalid_token")
+        if claims.expires_at <= (time.time() if now is None else now):
+            raise UnauthorizedException("Token expired", code="token_expired")
+        return claims
+
+
+def token_secret(settings: Settings) -> str:
+    """The configured signing secret, or a per-process one for single-worker development.
+
+    A generated secret only validates tokens in the process that issued them
+    and changes on every restart, so it is refused with several workers or in
+    production.
+    """
+    if settings.auth_secret_key:
+        return settings.auth_secret_key
+    if settings.server_workers > 1 or settings.app_env == "production":
+        raise RuntimeError(
+            "AUTH_SECRET_KEY must be set when running several workers or in production"
+        )
+    logger.warning(
+        "AUTH_SECRET_KEY is not set; using a random per-process key. Tokens will not "
+        "validate in other processes and every restart logs all users out."
+    )
+    return secrets.token_hex(32)
+
+
+@lru_cache()
+def get_token_signer() -> TokenSigner:
+    settings = get_settings()
+    keys = [token_secret(settings), *settings.auth_previous_secret_keys]
+    return TokenSigner([key.encode() for key in keys], settings.auth_token_ttl_seconds)
+
+
+class LoginAttemptTracker:
+    """Counts failed logins per email in a bounded LRU so lockouts cost no bcrypt."""
+
+    def __init__(self, max_attempts: int = 5, lockout_seconds: float = 300.0,
+                 max_entries: int = 100000):
+        self.max_attempts = max_attempts
+        self.lockout_seconds = lockout_seconds
+        self._failures = LRUCache(max_entries=max_entries, ttl=lockout_seconds)
+
+    def check(self, email: str) -> None:
+        if self._failures.get(email.lower(), 0) >= self.max_attempts:
+            raise TooManyRequestsException(
+                "Too many failed login attempts",
+                code="login_locked",
+                retry_after=self.lockout_seconds,
+            )
+
+    def record_failure(self, email: str) -> None:
+        key = email.lower()
+        self._failures.set(key, self._failures.get(key, 0) + 1)
+
+    def acquire(self, email: str) -> None:
+        """Check the lockout and count this attempt as a failure up front.
+
+        Reserving the slot before bcrypt runs means a burst of concurrent
+        guesses cannot all pass ``check`` while earlier ones are still verifying.
+        """
+        self.check(email)
+        self.record_failure(email)
+
+    def release(self, email: str) -> None:
+        """Give back a slot taken by ``acquire`` for an attempt that never got a verdict."""
+        key = email.lower()
+        attempts = self._failures.get(key, 0)
+        if attempts > 1:
+            self._failures.set(key, attempts - 1)
+        else:
+            self._failures.delete(key)
+
+    def reset(self, email: str) -> None:
+        self._failures.delete(email.lower())
+
+    def __len__(self) -> int:
+        return len(self._failures)
+
+
+@lru_cache()
+def get_login_tracker() -> LoginAttemptTracker:
+    settings = get_settings()
+    return LoginAttemptTracker(
+        max_attempts=settings.auth_max_failed_attempts,
+        lockout_seconds=settings.auth_lockout_seconds,
+        max_entries=settings.auth_tracker_max_entries,
+    )
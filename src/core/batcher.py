@@ -0,0 +1,79 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from src.core.metrics import WRITE_BATCH_SIZE, WRITE_BATCH_WAIT
+
+Flush = Callable[[List[Any]], Awaitable[List[Any]]]
+
+
+class MicroBatcher:
+    """Groups items submitted by concurrent callers and flushes them together.
+
+    A batch is flushed when it reaches ``max_size`` items or ``max_wait``
+    seconds after its first item arrived, whichever comes first. ``flush``
+    returns one result per item, in order; an exception instance in that list
+    is raised to the caller that submitted the item.
+    """
+
+    def __init__(
+        self, flush: Flush, max_size: int = 64, max_wait: float = 0.002, name: str = "default"
+    ):
+        self.flush = flush
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.name = name
+        self.batches = 0
+        self.items = 0
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, loop.time()))
+        if len(self._pending) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._start_flush)
+        return await future
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        now = asyncio.get_running_loop().time()
+        self.batches += 1
+        self.items += len(batch)
+        WRITE_BATCH_SIZE.observe(len(batch), batcher=self.name)
+        for _, _, submitted in batch:
+            WRITE_BATCH_WAIT.observe(now - submitted, batcher=self.name)
+        try:
+            results = await self.flush([item for item, _, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "pending": len(self._pending),
+            "flushing": len(self._flushing),
+            "max_size": self.max_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
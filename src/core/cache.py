@@ -0,0 +1,305 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from src.core.metrics import REGISTRY, CallbackMetric
+from src.core.settings import get_settings
+
+_MISSING = object()
+_SHARED_MISSING = "__skillmap_cache_missing__"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    shared_hits: int = 0
+    shared_misses: int = 0
+    shared_errors: int = 0
+
+
+class LRUCache:
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+
+
+class _LockedLRUCache(LRUCache):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return super().get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            super().set(key, value)
+
+    def delete(self, key):
+        with self._lock:
+            super().delete(key)
+
+    def clear(self):
+        with self._lock:
+            super().clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**asdict(self.stats), "entries": len(self._entries)}
+
+
+class _CacheServerManager(BaseManager):
+    pass
+
+
+class _CacheClientManager(BaseManager):
+    pass
+
+
+_CacheClientManager.register("get_cache")
+
+
+def _parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _require_authkey(authkey: Optional[str]) -> bytes:
+    # Manager connections exchange pickles, so anyone holding the key can run
+    # code in the cache process; there is deliberately no default.
+    if not authkey:
+        raise ValueError("USER_CACHE_SHARED_AUTHKEY must be set to use the shared cache")
+    return authkey.encode()
+
+
+def serve_shared_cache(
+    address: str, authkey: Optional[str], max_entries: int = 100000, ttl: float = 60.0
+) -> None:
+    key = _require_authkey(authkey)
+    cache = _LockedLRUCache(max_entries=max_entries, ttl=ttl)
+    _CacheServerManager.register("get_cache", callable=lambda: cache)
+    manager = _CacheServerManager(address=_parse_address(address), authkey=key)
+    manager.get_server().serve_forever()
+
+
+class SharedCacheClient:
+    """Client for a cache process shared by every worker on the host."""
+
+    def __init__(self, address: str, authkey: Optional[str]):
+        self.address = _parse_address(address)
+        self.authkey = _require_authkey(authkey)
+        self._cache = None
+
+    def _proxy(self):
+        if self._cache is None:
+            manager = _CacheClientManager(address=self.address, authkey=self.authkey)
+            manager.connect()
+            self._cache = manager.get_cache()
+        return self._cache
+
+    def _call(self, method: str, *args: Any) -> Any:
+        try:
+            return getattr(self._proxy(), method)(*args)
+        except (OSError, EOFError):
+            self._cache = None
+            raise
+
+    async def get(self, key: Hashable) -> Any:
+        return await asyncio.to_thread(self._call, "get", key, _SHARED_MISSING)
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        await asyncio.to_thread(self._call, "set", key, value)
+
+    async def delete(self, key: Hashable) -> None:
+        await asyncio.to_thread(self._call, "delete", key)
+
+    async def delete_many(self, keys: List[Hashable]) -> None:
+        def delete_all() -> None:
+            for key in keys:
+                self._call("delete", key)
+
+        await asyncio.to_thread(delete_all)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._call, "clear")
+
+
+class TieredCache:
+    """In-process LRU in front of an optional shared cache process.
+
+    Every invalidation bumps an epoch; a read-through fill started before an
+    invalidation is dropped instead of re-populating the stale value.
+    """
+
+    def __init__(self, local: LRUCache, shared: Optional[SharedCacheClient] = None):
+        self.local = local
+        self.shared = shared
+        self._epoch = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.local.stats
+
+    def epoch(self) -> int:
+        return self._epoch
+
+    async def get(self, key: Hashable) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING or self.shared is None:
+            return None if value is _MISSING else value
+        try:
+            value = await self.shared.get(key)
+        except (OSError, EOFError):
+            self.stats.shared_errors += 1
+            return None
+        if value == _SHARED_MISSING:
+            self.stats.shared_misses += 1
+            return None
+        self.stats.shared_hits += 1
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: Hashable, value: Any, epoch: Optional[int] = None) -> None:
+        if epoch is not None and epoch != self._epoch:
+            return
+        self.local.set(key, value)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, value)
+            except (OSError, EOFError):
+                self.stats.shared_errors += 1
+
+    async def delete(self, key: Hashable) -> None:
+        self._epoch += 1
+        self.local.delete(key)
+        if self.shared is not None:
+            try:
+                await self.shared.delete(key)
+            except (OSError, EOFError):
+                self.stats.shared_errors += 1
+
+    async def delete_many(self, keys: List[Hashable]) -> None:
+        self._epoch += 1
+        for key in keys:
+            self.local.delete(key)
+        if self.shared is not None:
+            try:
+                await self.shared.delete_many(keys)
+            except (OSError, EOFError):
+                self.stats.shared_errors += 1
+
+    async def clear(self) -> None:
+        self._epoch += 1
+        self.local.clear()
+        if self.shared is not None:
+            try:
+                await self.shared.clear()
+            except (OSError, EOFError):
+                self.stats.shared_errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **asdict(self.stats),
+            "entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "ttl_seconds": self.local.ttl,
+            "shared": self.shared is not None,
+        }
+
+
+@lru_cache()
+def get_user_cache() -> TieredCache:
+    settings = get_settings()
+    shared = None
+    if settings.user_cache_shared_address:
+        shared = SharedCacheClient(
+            settings.user_cache_shared_address, settings.user_cache_shared_authkey
+        )
+    return TieredCache(
+        LRUCache(
+            max_entries=settings.user_cache_max_entries,
+            ttl=settings.user_cache_ttl_seconds,
+        ),
+        shared=shared,
+    )
+
+
+def _user_cache_events() -> Dict[tuple, float]:
+    if not get_user_cache.cache_info().currsize:
+        return {}
+    return {(event,): value for event, value in asdict(get_user_cache().stats).items()}
+
+
+def _user_cache_entries() -> Dict[tuple, float]:
+    if not get_user_cache.cache_info().currsize:
+        return {}
+    return {(): len(get_user_cache().local)}
+
+
+REGISTRY.register(CallbackMetric(
+    "user_cache_events_total",
+    "User cache hits, misses, evictions, expirations and invalidations.",
+    _user_cache_events,
+    labelnames=("event",),
+    metric_type="counter",
+))
+REGISTRY.register(CallbackMetric(
+    "user_cache_entries",
+    "Entries currently held in the in-process user cache.",
+    _user_cache_entries,
+))
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    serve_shared_cache(
+        settings.user_cache_shared_address or "127.0.0.1:7070",
+        settings.user_cache_shared_authkey,
+        max_entries=settings.user_cache_max_entries,
+        ttl=settings.user_cache_ttl_seconds,
+    )
@@ -1,21 +1,240 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from typing import AsyncGenerator
-from src.core.settings import get_settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncGenerator, Dict, List, Optional
+import itertools
+import os
+import time
+import uuid
+from src.core.metrics import REGISTRY, CallbackMetric, instrument_engine
+from src.core.settings import Settings, get_settings
 
 settings = get_settings()
 
-DATABASE_URL = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
+def _async_url(url: str) -> str:
+    return url.replace("postgresql://", "postgresql+asyncpg://")
 
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
 
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+DATABASE_URL = _async_url(settings.database_url)
+
+
+@dataclass
+class PoolWaitStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_stats.checkouts += 1
+            self.wait_stats.wait_seconds_total += waited
+            self.wait_stats.wait_seconds_max = max(self.wait_stats.wait_seconds_max, waited)
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_options(settings: Settings) -> Dict[str, Any]:
+    statement_cache_size = 0 if settings.db_pgbouncer_mode else settings.db_statement_cache_size
+    connect_args: Dict[str, Any] = {
+        "statement_cache_size": statement_cache_size,
+        "prepared_statement_cache_size": statement_cache_size,
+    }
+    if settings.db_pgbouncer_mode:
+        connect_args["prepared_statement_name_func"] = _unique_statement_name
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+def _create_engine(url: str, settings: Settings) -> AsyncEngine:
+    db_engine = create_async_engine(url, echo=False, future=True, **engine_options(settings))
+    instrument_engine(db_engine.sync_engine)
+    return db_engine
+
+
+class ReplicaRouter:
+    """Hands out sessions bound to one of several read replicas."""
+
+    def __init__(self, engines: List[AsyncEngine], strategy: str = "round_robin"):
+        self.engines = engines
+        self.strategy = strategy
+        self._sessionmakers = [
+            sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+            for replica in engines
+        ]
+        self._counter = itertools.count()
+
+    def choose(self) -> int:
+        if self.strategy == "least_connections":
+            return min(
+                range(len(self.engines)),
+                key=lambda index: self.engines[index].pool.checkedout(),
+            )
+        return next(self._counter) % len(self.engines)
+
+    def session(self) -> AsyncSession:
+        return self._sessionmakers[self.choose()]()
+
+
+class Database:
+    """Engines owned by the current process.
+
+    Nothing is created at import time: the app lifespan (or the first session)
+    builds the engines in each worker, and a process that finds engines created
+    before a fork replaces them instead of sharing the parent's connections.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.engine: Optional[AsyncEngine] = None
+        self.replica_engines: List[AsyncEngine] = []
+        self.replica_router: Optional[ReplicaRouter] = None
+        self.pid: Optional[int] = None
+        self._sessionmaker = None
+
+    def connect(self) -> "Database":
+        if self.engine is not None and self.pid == os.getpid():
+            return self
+        if self.engine is not None:
+            # Inherited across a fork: drop the pools without closing the
+            # parent's sockets.
+            for inherited in [self.engine, *self.replica_engines]:
+                inherited.sync_engine.dispose(close=False)
+        self.engine = _create_engine(_async_url(self.settings.database_url), self.settings)
+        self.replica_engines = [
+            _create_engine(_async_url(url), self.settings)
+            for url in self.settings.db_replica_urls
+        ]
+        self.replica_router = (
+            ReplicaRouter(self.replica_engines, self.settings.db_replica_strategy)
+            if self.replica_engines else None
+        )
+        self._sessionmaker = sessionmaker(
+            self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        self.pid = os.getpid()
+        return self
+
+    def session(self) -> AsyncSession:
+        return self.connect()._sessionmaker()
+
+    async def dispose(self) -> None:
+        engines = [self.engine, *self.replica_engines] if self.engine is not None else []
+        self.engine = None
+        self.replica_engines = []
+        self.replica_router = None
+        self._sessionmaker = None
+        self.pid = None
+        for db_engine in engines:
+            await db_engine.dispose()
+
+
+database = Database(settings)
+
+
+def get_engine() -> AsyncEngine:
+    return database.connect().engine
+
+
+def get_pool_stats(db_engine: AsyncEngine = None) -> Dict[str, Any]:
+    pool = (db_engine or get_engine()).pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(asdict(pool.wait_stats))
+    return stats
+
+
+def _pool_connections() -> Dict[tuple, float]:
+    if database.engine is None:
+        return {}
+    stats = get_pool_stats()
+    return {
+        (state,): stats[state]
+        for state in ("checked_out", "idle", "overflow", "size")
+        if state in stats
+    }
+
+
+def _pool_waits() -> Dict[tuple, float]:
+    if database.engine is None:
+        return {}
+    stats = get_pool_stats()
+    return {(): stats["wait_seconds_total"]} if "wait_seconds_total" in stats else {}
+
+
+def _pool_timeouts() -> Dict[tuple, float]:
+    if database.engine is None:
+        return {}
+    stats = get_pool_stats()
+    return {(): stats["timeouts"]} if "timeouts" in stats else {}
+
+
+REGISTRY.register(CallbackMetric(
+    "db_pool_connections",
+    "Connection pool connections by state.",
+    _pool_connections,
+    labelnames=("state",),
+))
+REGISTRY.register(CallbackMetric(
+    "db_pool_wait_seconds_total",
+    "Total time spent waiting to check out a pooled connection.",
+    _pool_waits,
+    metric_type="counter",
+))
+REGISTRY.register(CallbackMetric(
+    "db_pool_timeouts_total",
+    "Checkouts that timed out waiting for a pooled connection.",
+    _pool_timeouts,
+    metric_type="counter",
+))
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+    async with database.session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_read_session() -> AsyncGenerator[Optional[AsyncSession], None]:
+    replica_router = database.connect().replica_router
+    if replica_router is None:
+        yield None
+        return
+    async with replica_router.session() as session:
         try:
             yield session
         finally:
@@ -1,12 +1,170 @@
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.core import get_session
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncContextManager, AsyncIterator, Callable, List, Optional
+import time
+from src.core import database, get_session, get_settings
+from src.core.batcher import MicroBatcher
+from src.core.database import get_read_session
+from src.core.auth import TokenClaims, get_login_tracker, get_token_signer
+from src.core.cache import get_user_cache
+from src.core.events import UserEventListener, listen_dsn, user_events_enabled
+from src.core.feed import UserEventHub
+from src.core.exceptions import UnauthorizedException
+from src.core.singleflight import get_singleflight
+from src.repository.cached import CachedUserRepository
+from src.repository.interfaces.user import IUserRepository
+from src.repository.memory import InMemoryUserRepository, get_memory_user_store
 from src.repository.user import UserRepository
+from src.service.auth import AuthService
+from src.service.models import UserDTO
 from src.service.user import UserService
 
+bearer_scheme = HTTPBearer(auto_error=False)
+
+PRIMARY_READS_COOKIE = "skillmap_primary_until"
+
+
+def pin_reads_to_primary(response: Response) -> Response:
+    window = get_settings().db_read_your_writes_seconds
+    if window > 0:
+        response.set_cookie(
+            PRIMARY_READS_COOKIE,
+            str(time.time() + window),
+            max_age=max(int(window), 1),
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_READS_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def build_user_repository(
+    session: AsyncSession, read_session: Optional[AsyncSession] = None
+) -> IUserRepository:
+    settings = get_settings()
+    if settings.user_repository_backend == "memory":
+        return InMemoryUserRepository(get_memory_user_store())
+    return UserRepository(
+        session,
+        chunk_size=settings.bulk_insert_chunk_size,
+        read_session=read_session,
+        events_channel=settings.user_events_channel if user_events_enabled(settings) else None,
+    )
+
+
+def flight_repository_factory(
+    session: AsyncSession, read_session: Optional[AsyncSession] = None
+) -> Callable[[str], AsyncContextManager[IUserRepository]]:
+    """Open repositories for singleflight calls shared by several requests.
+
+    Each call gets a session of its own on the engines behind the request's
+    sessions, so cancelling the leading request cannot close it under the
+    requests waiting on the same call.
+    """
+    @asynccontextmanager
+    async def open_flight_repository(read_target: str) -> AsyncIterator[IUserRepository]:
+        replica = read_target == "replica" and read_session is not None
+        bind = read_session.bind if replica else session.bind
+        async with AsyncSession(bind=bind, expire_on_commit=False) as flight_session:
+            repo = build_user_repository(flight_session, flight_session if replica else None)
+            if get_settings().user_cache_enabled:
+                repo = CachedUserRepository(repo, get_user_cache())
+            yield repo
+
+    return open_flight_repository
+
+
+def build_user_event_listener(hub: Optional[UserEventHub] = None) -> UserEventListener:
+    settings = get_settings()
+    listener = UserEventListener(
+        listen_dsn(settings),
+        settings.user_events_channel,
+        keepalive=settings.user_events_keepalive_seconds,
+        max_backoff=settings.user_events_max_backoff_seconds,
+    )
+    if settings.user_cache_enabled and settings.user_cache_invalidation_enabled:
+        cache = get_user_cache()
+        listener.subscribe(
+            lambda event: cache.delete_many(list(event.ids)),
+            lambda reason: cache.clear(),
+        )
+    if hub is not None:
+        listener.subscribe(hub.on_event, hub.on_reset)
+    return listener
+
+
+@lru_cache()
+def get_create_batcher() -> MicroBatcher:
+    settings = get_settings()
+
+    async def flush(users: List[UserDTO]) -> List[Optional[UserDTO]]:
+        async with database.session() as session:
+            return await build_user_repository(session).create_batch(users)
+
+    return MicroBatcher(
+        flush,
+        max_size=settings.user_create_batch_max_size,
+        max_wait=settings.user_create_batch_window_ms / 1000,
+        name="user_create",
+    )
+
 
 async def get_user_service(
+    request: Request,
     session: AsyncSession = Depends(get_session),
+    read_session: Optional[AsyncSession] = Depends(get_read_session),
 ) -> UserService:
-    repo = UserRepository(session)
-    return UserService(repo)
+    settings = get_settings()
+    pinned = reads_pinned_to_primary(request)
+    if pinned:
+        read_session = None
+    repo = build_user_repository(session, read_session)
+    # Pinned clients must see their own write, which a cached copy may predate.
+    if settings.user_cache_enabled and not pinned:
+        repo = CachedUserRepository(repo, get_user_cache())
+    # Pinned clients wrote recently; a shared flight may predate that write.
+    coalesce = settings.user_singleflight_enabled and not pinned
+    singleflight = get_singleflight() if coalesce else None
+    create_batcher = get_create_batcher() if settings.user_create_batching_enabled else None
+    return UserService(
+        repo,
+        singleflight=singleflight,
+        create_batcher=create_batcher,
+        flight_repository=flight_repository_factory(session, read_session),
+    )
+
+
+async def get_auth_service(
+    session: AsyncSession = Depends(get_session),
+) -> AuthService:
+    return AuthService(
+        build_user_repository(session), get_token_signer(), get_login_tracker()
+    )
+
+
+async def get_token_claims(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> TokenClaims:
+    if credentials is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        return get_token_signer().verify(credentials.credentials)
+    except UnauthorizedException as e:
+        raise HTTPException(
+            status_code=401,
+            detail=e.message,
+            headers={"WWW-Authenticate": f'Bearer error="{e.code}"'},
+        )
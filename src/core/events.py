@@ -0,0 +1,206 @@
+import asyncio
+import time
+import uuid
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import asyncpg
+import orjson
+from sqlalchemy.engine import make_url
+
+from src.core.metrics import USER_EVENT_LAG, USER_EVENT_RESETS, USER_EVENTS_RECEIVED
+from src.core.settings import Settings
+
+# NOTIFY payloads must stay under 8000 bytes; 200 hex ids is about 7 KB.
+MAX_IDS_PER_EVENT = 200
+INITIAL_BACKOFF = 0.1
+
+
+@dataclass(frozen=True)
+class UserEvent:
+    op: str
+    ids: Tuple[uuid.UUID, ...]
+    at: float
+    # Number from user_event_seq, identical on every listener; None if unpublished.
+    seq: Optional[int] = None
+
+
+EventHandler = Callable[[UserEvent], Awaitable[Any]]
+ResetHandler = Callable[[str], Awaitable[Any]]
+
+
+def encode_events(op: str, ids: Sequence[uuid.UUID], at: Optional[float] = None) -> List[str]:
+    at = time.time() if at is None else at
+    return [
+        orjson.dumps({
+            "op": op,
+            "ids": [user_id.hex for user_id in ids[start:start + MAX_IDS_PER_EVENT]],
+            "at": at,
+        }).decode()
+        for start in range(0, len(ids), MAX_IDS_PER_EVENT)
+    ]
+
+
+def decode_event(payload: str) -> UserEvent:
+    """Parse a NOTIFY payload: ``<seq>:<json>`` as published, or bare JSON."""
+    seq = None
+    if not payload.startswith("{"):
+        prefix, _, payload = payload.partition(":")
+        seq = int(prefix)
+    data = orjson.loads(payload)
+    return UserEvent(
+        op=data["op"],
+        ids=tuple(uuid.UUID(hex=user_id) for user_id in data["ids"]),
+        at=float(data["at"]),
+        seq=seq,
+    )
+
+
+def user_events_enabled(settings: Settings) -> bool:
+    return settings.user_repository_backend == "postgres" and (
+        settings.user_feed_enabled
+        or (settings.user_cache_enabled and settings.user_cache_invalidation_enabled)
+    )
+
+
+def listen_dsn(settings: Settings) -> str:
+    url = make_url(settings.db_listen_url or settings.database_url)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class _Reset(NamedTuple):
+    reason: str
+
+
+class UserEventListener:
+    """Keeps one LISTEN connection per worker and hands events to subscribers in order.
+
+    Events published while the connection is down are lost, so every connect
+    and every queue overflow is followed by a reset that subscribers answer
+    with a full flush.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        keepalive: float = 30.0,
+        max_backoff: float = 30.0,
+        queue_size: int = 10000,
+        connect: Callable[[str], Awaitable[asyncpg.Connection]] = asyncpg.connect,
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.keepalive = keepalive
+        self.max_backoff = max_backoff
+        self.queue_size = queue_size
+        self.connect = connect
+        self.connected = False
+        self.events = 0
+        self.resets = 0
+        self.reconnects = 0
+        self.errors = 0
+        self.last_lag: Optional[float] = None
+        self._subscribers: List[Tuple[EventHandler, ResetHandler]] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def subscribe(self, on_event: EventHandler, on_reset: ResetHandler) -> None:
+        self._subscribers.append((on_event, on_reset))
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.ensure_future(self._listen()),
+            asyncio.ensure_future(self._dispatch()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+
+    def _put(self, item: Any) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(_Reset("overflow"))
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self._put(payload)
+
+    async def _listen(self) -> None:
+        backoff = INITIAL_BACKOFF
+        reason = "connect"
+        while True:
+            try:
+                conn = await self.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError, asyncio.TimeoutError):
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _: lost.set())
+            try:
+                await conn.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                self._put(_Reset(reason))
+                backoff = INITIAL_BACKOFF
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), self.keepalive)
+                    except asyncio.TimeoutError:
+                        await asyncio.wait_for(conn.execute("SELECT 1"), self.keepalive)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError, asyncio.TimeoutError):
+                pass
+            finally:
+                self.connected = False
+                conn.terminate()
+            self.reconnects += 1
+            reason = "reconnect"
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _dispatch(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if isinstance(item, _Reset):
+                self.resets += 1
+                USER_EVENT_RESETS.inc(reason=item.reason)
+                await self._deliver(lambda on_event, on_reset: on_reset(item.reason))
+                continue
+            try:
+                event = decode_event(item)
+            except (ValueError, KeyError, TypeError):
+                self.errors += 1
+                continue
+            self.events += 1
+            self.last_lag = max(time.time() - event.at, 0.0)
+            USER_EVENTS_RECEIVED.inc(op=event.op)
+            USER_EVENT_LAG.observe(self.last_lag)
+            await self._deliver(lambda on_event, on_reset: on_event(event))
+
+    async def _deliver(self, call: Callable[[EventHandler, ResetHandler], Awaitable[Any]]) -> None:
+        for on_event, on_reset in self._subscribers:
+            try:
+                await call(on_event, on_reset)
+            except Exception:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "channel": self.channel,
+            "connected": self.connected,
+            "events": self.events,
+            "resets": self.resets,
+            "reconnects": self.reconnects,
+            "errors": self.errors,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "last_lag_ms": None if self.last_lag is None else round(self.last_lag * 1000, 3),
+        }
@@ -23,3 +23,17 @@ class UnauthorizedException(AppException):
 
 class ForbiddenException(AppException):
     pass
+
+
+class PreconditionFailedException(AppException):
+    pass
+
+
+class TooManyRequestsException(AppException):
+    def __init__(self, message: str, code: str = None, retry_after: float = None):
+        self.retry_after = retry_after
+        super().__init__(message, code)
+
+
+class ServiceUnavailableException(AppException):
+    pass
@@ -0,0 +1,118 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import orjson
+
+from src.core.events import UserEvent
+from src.core.metrics import USER_FEED_RESYNCS, USER_FEED_SUBSCRIBERS
+
+
+def sse_frame(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode() + orjson.dumps(data) + b"\n\n"
+
+
+class FeedSubscription:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.resyncs = 0
+
+
+class UserEventHub:
+    """Fans the worker's user events out to change feed subscribers.
+
+    Each event is encoded into an SSE frame once and the same bytes are queued
+    for every subscriber. A subscriber whose queue is full is flushed and sent
+    a ``resync`` frame instead of buffering without bound. Recent frames are
+    kept in a ring buffer so clients can resume from ``Last-Event-ID``.
+
+    Event ids are the ``user_event_seq`` numbers carried in the NOTIFY payload,
+    and every listener receives notifications in commit order, so an id seen
+    on one worker can be resumed on any other that still buffers it. Ids are
+    matched by position in the buffer, not compared, because sequence numbers
+    are taken before commit and need not arrive in increasing order.
+    """
+
+    def __init__(self, buffer_size: int = 1024, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.buffer: Deque[Tuple[Optional[str], bytes]] = deque(maxlen=buffer_size)
+        self.subscribers: Set[FeedSubscription] = set()
+        self.published = 0
+        self.resyncs = 0
+
+    @property
+    def last_event_id(self) -> Optional[str]:
+        return self.buffer[-1][0] if self.buffer else None
+
+    async def on_event(self, event: UserEvent) -> None:
+        self.published += 1
+        event_id = None if event.seq is None else str(event.seq)
+        frame = sse_frame(
+            "user",
+            {"op": event.op, "ids": [str(user_id) for user_id in event.ids], "at": event.at},
+            event_id,
+        )
+        self.buffer.append((event_id, frame))
+        for subscription in self.subscribers:
+            self._offer(subscription, frame)
+
+    async def on_reset(self, reason: str) -> None:
+        # Events may have been lost, so ids buffered before the gap can no longer be resumed.
+        self.buffer.clear()
+        for subscription in self.subscribers:
+            self._resync(subscription, reason)
+
+    def _offer(self, subscription: FeedSubscription, frame: bytes) -> None:
+        try:
+            subscription.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._resync(subscription, "lagged")
+
+    def _resync(self, subscription: FeedSubscription, reason: str) -> None:
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        # With nothing buffered an empty id makes the client drop its stale Last-Event-ID.
+        subscription.queue.put_nowait(
+            sse_frame("resync", {"reason": reason}, self.last_event_id or "")
+        )
+        subscription.resyncs += 1
+        self.resyncs += 1
+        USER_FEED_RESYNCS.inc(reason=reason)
+
+    def _replay(self, last_event_id: str) -> Optional[List[bytes]]:
+        backlog: List[bytes] = []
+        for event_id, frame in reversed(self.buffer):
+            if event_id == last_event_id:
+                backlog.reverse()
+                return backlog
+            backlog.append(frame)
+        return None
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> FeedSubscription:
+        subscription = FeedSubscription(self.queue_size)
+        if last_event_id:
+            backlog = self._replay(last_event_id)
+            if backlog is None:
+                self._resync(subscription, "expired")
+            else:
+                for frame in backlog:
+                    self._offer(subscription, frame)
+        self.subscribers.add(subscription)
+        USER_FEED_SUBSCRIBERS.set(len(self.subscribers))
+        return subscription
+
+    def unsubscribe(self, subscription: FeedSubscription) -> None:
+        self.subscribers.discard(subscription)
+        USER_FEED_SUBSCRIBERS.set(len(self.subscribers))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "last_event_id": self.last_event_id,
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "resyncs": self.resyncs,
+            "buffered": len(self.buffer),
+            "buffer_size": self.buffer.maxlen,
+            "queue_size": self.queue_size,
+        }
@@ -0,0 +1,323 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class CallbackMetric(Metric):
+    """Metric whose samples are read from a callback at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+        metric_type: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.type = metric_type
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self.callback().items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [0.0] * (len(self.buckets) + 3)
+        index = bisect_left(self.buckets, value)
+        state[index] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return int(state[-1]) if state else 0
+
+    def sum(self, **labels: str) -> float:
+        state = self._values.get(self._key(labels))
+        return state[-2] if state else 0.0
+
+    def samples(self) -> Iterable[Sample]:
+        for key, state in self._values.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, state[-2]
+            yield f"{self.name}_count", labels, state[-1]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    labelnames=("method", "route", "status"),
+))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+))
+DB_STATEMENT_DURATION = REGISTRY.register(Histogram(
+    "db_statement_duration_seconds",
+    "SQL statement execution time by statement type.",
+    labelnames=("operation",),
+))
+DB_STATEMENT_ERRORS = REGISTRY.register(Counter(
+    "db_statement_errors_total",
+    "SQL statements that raised an error.",
+    labelnames=("operation",),
+))
+PASSWORD_HASH_DURATION = REGISTRY.register(Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt CPU time in the hashing pool by operation.",
+    labelnames=("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0, 30.0),
+))
+PASSWORD_HASH_WAIT = REGISTRY.register(Histogram(
+    "password_hash_queue_seconds",
+    "Time a hashing job spent queued or in transit to the hashing pool.",
+    labelnames=("operation",),
+))
+USER_SIGNUP_DUPLICATES = REGISTRY.register(Counter(
+    "user_signup_duplicates_total",
+    "Signups rejected for an already registered email, by where the duplicate was caught.",
+    labelnames=("stage",),
+))
+PASSWORD_HASHES_SKIPPED = REGISTRY.register(Counter(
+    "password_hashes_skipped_total",
+    "Password hashes not computed because the signup was a known duplicate.",
+))
+PASSWORD_HASH_SECONDS_SAVED = REGISTRY.register(Counter(
+    "password_hash_seconds_saved_total",
+    "Estimated bcrypt CPU seconds saved by skipping hashes for duplicate signups.",
+))
+PASSWORD_REHASHES = REGISTRY.register(Counter(
+    "password_rehashes_total",
+    "Password hashes upgraded to the current bcrypt cost on successful login.",
+))
+AUTH_LOGINS = REGISTRY.register(Counter(
+    "auth_logins_total",
+    "Login attempts by outcome.",
+    labelnames=("result",),
+))
+APP_WARMUP_DURATION = REGISTRY.register(Gauge(
+    "app_warmup_duration_seconds",
+    "Time this worker spent in each cold-start warmup step.",
+    labelnames=("step",),
+))
+WRITE_BATCH_SIZE = REGISTRY.register(Histogram(
+    "write_batch_size",
+    "Items flushed together by a write batcher.",
+    labelnames=("batcher",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+))
+WRITE_BATCH_WAIT = REGISTRY.register(Histogram(
+    "write_batch_wait_seconds",
+    "Time an item waited in a write batcher before its batch was flushed.",
+    labelnames=("batcher",),
+))
+USER_EVENTS_RECEIVED = REGISTRY.register(Counter(
+    "user_events_received_total",
+    "User change events received on this worker's LISTEN connection.",
+    labelnames=("op",),
+))
+USER_EVENT_LAG = REGISTRY.register(Histogram(
+    "user_event_lag_seconds",
+    "Time from publishing a user change event to handling it on this worker.",
+))
+USER_EVENT_RESETS = REGISTRY.register(Counter(
+    "user_event_resets_total",
+    "Full cache flushes after the event stream may have lost events.",
+    labelnames=("reason",),
+))
+USER_FEED_SUBSCRIBERS = REGISTRY.register(Gauge(
+    "user_feed_subscribers",
+    "Open change feed streams on this worker.",
+))
+USER_FEED_RESYNCS = REGISTRY.register(Counter(
+    "user_feed_resyncs_total",
+    "Change feed subscribers told to resync instead of receiving missed events.",
+    labelnames=("reason",),
+))
+USER_EXPORT_ROWS = REGISTRY.register(Counter(
+    "user_export_rows_total",
+    "Rows written by user exports.",
+    labelnames=("format",),
+))
+USER_EXPORT_ROWS_PER_SECOND = REGISTRY.register(Gauge(
+    "user_export_rows_per_second",
+    "Throughput of the most recent user export on this worker.",
+    labelnames=("format",),
+))
+DB_READINESS_LATENCY = REGISTRY.register(Gauge(
+    "db_readiness_latency_seconds",
+    "Round-trip latency of the last readiness probe query.",
+))
+
+
+def _statement_operation(statement: str) -> str:
+    head = statement.lstrip().split(None, 1)
+    return head[0].upper() if head else "UNKNOWN"
+
+
+def instrument_engine(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        DB_STATEMENT_DURATION.observe(
+            time.perf_counter() - started, operation=_statement_operation(statement)
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+        DB_STATEMENT_ERRORS.inc(operation=_statement_operation(context.statement or ""))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"]),
+            )
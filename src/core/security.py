@@ -1,6 +1,38 @@
+import argparse
+import asyncio
+import math
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from passlib.context import CryptContext
+from passlib.hash import bcrypt as bcrypt_hash
+
+from src.core.exceptions import ServiceUnavailableException
+from src.core.metrics import REGISTRY, CallbackMetric, PASSWORD_HASH_DURATION, PASSWORD_HASH_WAIT
+from src.core.settings import get_settings
+
+def build_crypt_context(rounds: Optional[int] = None) -> CryptContext:
+    if rounds is None:
+        return CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # Pinning min and max to the configured cost makes needs_update() flag
+    # every hash made with any other cost, so logins migrate them.
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = build_crypt_context(get_settings().bcrypt_rounds)
 
 
 def hash_password(password: str) -> str:
@@ -9,3 +41,295 @@ def hash_password(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def measure_bcrypt_seconds(rounds: int, samples: int = 3) -> float:
+    handler = bcrypt_hash.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def calibrate_bcrypt_rounds(
+    target_seconds: float, min_rounds: int = 10, max_rounds: int = 16
+) -> int:
+    """Highest cost whose hash time on this host stays within target_seconds.
+
+    Each extra round doubles the work, so one measurement at min_rounds is
+    enough to extrapolate; the floor is kept even if it exceeds the target.
+    """
+    base = measure_bcrypt_seconds(min_rounds)
+    extra = math.floor(math.log2(target_seconds / base)) if base < target_seconds else 0
+    return max(min_rounds, min(max_rounds, min_rounds + extra))
+
+
+def mean_hash_seconds() -> float:
+    count = PASSWORD_HASH_DURATION.count(operation="hash_password")
+    if not count:
+        return 0.0
+    return PASSWORD_HASH_DURATION.sum(operation="hash_password") / count
+
+
+def _timed_call(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class HashingEngine:
+    """Runs bcrypt in a bounded process pool, off the event loop."""
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        queue_size: int = 64,
+        timeout: float = 10.0,
+        bulk_concurrency: Optional[int] = None,
+    ):
+        self.pool_size = pool_size or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        # At least one worker stays free for single-user jobs; a pool of one
+        # process cannot spare one, so there bulk jobs alternate with them.
+        self.bulk_concurrency = max(
+            1, min(bulk_concurrency or self.pool_size // 2, self.pool_size - 1)
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.pool_size + self.queue_size
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking a process that already runs threads (the event loop's
+            # executors, database drivers) can copy held locks into the child.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.pool_size, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _on_done(
+        self, loop: asyncio.AbstractEventLoop, callback: Callable[[], None]
+    ) -> Callable[[Future], None]:
+        def on_done(_: Future) -> None:
+            with suppress(RuntimeError):
+                loop.call_soon_threadsafe(callback)
+
+        return on_done
+
+    def _done(self) -> None:
+        self._pending -= 1
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        try:
+            return self._get_executor().submit(_timed_call, fn, *args)
+        except BrokenProcessPool:
+            self._executor = None
+            raise ServiceUnavailableException(
+                "Password hashing pool is unavailable", code="hashing_unavailable"
+            )
+
+    async def _result(
+        self, job: Future, fn: Callable[..., Any], started: float, timeout: Optional[float]
+    ) -> Any:
+        try:
+            result, elapsed = await asyncio.wait_for(
+                asyncio.wrap_future(job), timeout or self.timeout
+            )
+            PASSWORD_HASH_DURATION.observe(elapsed, operation=fn.__name__)
+            PASSWORD_HASH_WAIT.observe(
+                max(time.perf_counter() - started - elapsed, 0.0), operation=fn.__name__
+            )
+            return result
+        except asyncio.TimeoutError:
+            raise ServiceUnavailableException(
+                "Password hashing timed out", code="hashing_timeout"
+            )
+        except BrokenProcessPool:
+            self._executor = None
+            raise ServiceUnavailableException(
+                "Password hashing pool is unavailable", code="hashing_unavailable"
+            )
+
+    async def run(
+        self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None
+    ) -> Any:
+        if self._pending >= self.capacity:
+            raise ServiceUnavailableException(
+                "Password hashing queue is full", code="hashing_overloaded"
+            )
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        job = self._submit(fn, *args)
+        # A timed out job keeps its worker busy until bcrypt returns, so it
+        # stays admitted until the pool future itself completes.
+        self._pending += 1
+        job.add_done_callback(self._on_done(loop, self._done))
+        return await self._result(job, fn, started, timeout)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash a batch one password per job, at most bulk_concurrency at a time.
+
+        The batch reserves its bulk_concurrency admission slots up front and
+        holds them until its last job leaves the pool, so single-user traffic
+        can fill the rest of the queue but never fail a batch halfway through.
+        """
+        if not passwords:
+            return []
+        if self._pending + self.bulk_concurrency > self.capacity:
+            raise ServiceUnavailableException(
+                "Password hashing queue is full", code="hashing_overloaded"
+            )
+        self._pending += self.bulk_concurrency
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.bulk_concurrency)
+        running = 0
+        finished = False
+
+        def job_done() -> None:
+            nonlocal running
+            running -= 1
+            if finished:
+                self._pending -= 1
+            else:
+                slots.release()
+
+        async def hash_one(password: str) -> str:
+            nonlocal running
+            await slots.acquire()
+            started = time.perf_counter()
+            try:
+                job = self._submit(hash_password, password)
+            except BaseException:
+                slots.release()
+                raise
+            # The slot frees when bcrypt returns, not when a wait times out.
+            running += 1
+            job.add_done_callback(self._on_done(loop, job_done))
+            return await self._result(job, hash_password, started, None)
+
+        jobs = [asyncio.ensure_future(hash_one(password)) for password in passwords]
+        try:
+            return list(await asyncio.gather(*jobs))
+        except BaseException:
+            for job in jobs:
+                job.cancel()
+            raise
+        finally:
+            # Slots of jobs still in the pool are returned by job_done.
+            finished = True
+            self._pending -= self.bulk_concurrency - running
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self.run(verify_and_update_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+@lru_cache()
+def get_hashing_engine() -> HashingEngine:
+    settings = get_settings()
+    return HashingEngine(
+        pool_size=settings.hash_pool_size,
+        queue_size=settings.hash_queue_size,
+        timeout=settings.hash_timeout_seconds,
+        bulk_concurrency=settings.hash_bulk_concurrency,
+    )
+
+
+def shutdown_hashing_engine() -> None:
+    if get_hashing_engine.cache_info().currsize:
+        get_hashing_engine().shutdown()
+        get_hashing_engine.cache_clear()
+
+
+def _hashing_jobs() -> Dict[tuple, float]:
+    if not get_hashing_engine.cache_info().currsize:
+        return {}
+    engine = get_hashing_engine()
+    return {("pending",): engine.pending, ("capacity",): engine.capacity}
+
+
+REGISTRY.register(CallbackMetric(
+    "password_hash_jobs",
+    "Hashing jobs admitted to the pool and the admission limit.",
+    _hashing_jobs,
+    labelnames=("state",),
+))
+
+
+async def hash_password_async(password: str) -> str:
+    return await get_hashing_engine().hash(password)
+
+
+async def hash_passwords_async(passwords: List[str]) -> List[str]:
+    return await get_hashing_engine().hash_many(passwords)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await get_hashing_engine().verify(plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return await get_hashing_engine().verify_and_update(plain_password, hashed_password)
+
+
+def _write_env_setting(path: str, name: str, value: str) -> None:
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        lines = []
+    pattern = re.compile(rf"^\s*{name}\s*=", re.IGNORECASE)
+    lines = [line for line in lines if not pattern.match(line)]
+    lines.append(f"{name}={value}")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python -m src.core.security",
+        description="Pick the bcrypt cost that fits a hashing latency target on this host.",
+    )
+    parser.add_argument("--target-ms", type=float, default=settings.bcrypt_target_ms)
+    parser.add_argument("--min-rounds", type=int, default=settings.bcrypt_min_rounds)
+    parser.add_argument("--max-rounds", type=int, default=settings.bcrypt_max_rounds)
+    parser.add_argument("--env-file", help="Record the result as BCRYPT_ROUNDS in this file")
+    args = parser.parse_args()
+
+    rounds = calibrate_bcrypt_rounds(args.target_ms / 1000, args.min_rounds, args.max_rounds)
+    print(f"rounds={rounds} measured={measure_bcrypt_seconds(rounds) * 1000:.1f}ms "
+          f"target={args.target_ms:.0f}ms")
+    if args.env_file:
+        _write_env_setting(args.env_file, "BCRYPT_ROUNDS", str(rounds))
+        print(f"BCRYPT_ROUNDS={rounds} written to {args.env_file}")
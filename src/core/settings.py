@@ -1,6 +1,7 @@
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import List, Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -16,12 +17,71 @@ class Settings(BaseSettings):
     db_name: str = Field(default="skillmap")
     db_user: str = Field(default="user")
     db_password: str = Field(default="password")
+
+    db_pool_size: int = Field(default=5)
+    db_max_overflow: int = Field(default=10)
+    db_pool_timeout: float = Field(default=30.0)
+    db_pool_recycle: int = Field(default=-1)
+    db_pool_pre_ping: bool = Field(default=False)
+    db_statement_cache_size: int = Field(default=100)
+    db_pgbouncer_mode: bool = Field(default=False)
+    db_replica_urls: List[str] = Field(default_factory=list)
+    db_replica_strategy: Literal["round_robin", "least_connections"] = Field(default="round_robin")
+    db_read_your_writes_seconds: float = Field(default=0.0)
+    db_listen_url: Optional[str] = Field(default=None)
     
     app_env: str = Field(default="development")
     debug: bool = Field(default=True)
     title: str = "SkillMap API"
     version: str = "1.0.0"
 
+    server_host: str = Field(default="0.0.0.0")
+    server_port: int = Field(default=8000)
+    server_workers: int = Field(default=1, ge=1)
+    server_graceful_shutdown_seconds: float = Field(default=30.0)
+
+    warmup_enabled: bool = Field(default=True)
+    warmup_connections: int = Field(default=2, ge=0)
+    warmup_hashing: bool = Field(default=True)
+
+    hash_pool_size: Optional[int] = Field(default=None)
+    hash_queue_size: int = Field(default=64)
+    hash_timeout_seconds: float = Field(default=10.0)
+    hash_bulk_concurrency: Optional[int] = Field(default=None, ge=1)
+
+    bcrypt_rounds: Optional[int] = Field(default=None, ge=4, le=31)
+    bcrypt_target_ms: float = Field(default=250.0)
+    bcrypt_min_rounds: int = Field(default=10, ge=4, le=31)
+    bcrypt_max_rounds: int = Field(default=16, ge=4, le=31)
+
+    bulk_insert_chunk_size: int = Field(default=1000)
+    user_create_batching_enabled: bool = Field(default=False)
+    user_create_batch_max_size: int = Field(default=64, ge=1)
+    user_create_batch_window_ms: float = Field(default=2.0, ge=0)
+
+    user_repository_backend: Literal["postgres", "memory"] = Field(default="postgres")
+    user_cache_enabled: bool = Field(default=False)
+    user_cache_max_entries: int = Field(default=10000)
+    user_cache_ttl_seconds: float = Field(default=60.0)
+    user_cache_shared_address: Optional[str] = Field(default=None)
+    user_cache_shared_authkey: Optional[str] = Field(default=None)
+    user_singleflight_enabled: bool = Field(default=True)
+    user_cache_invalidation_enabled: bool = Field(default=True)
+    user_events_channel: str = Field(default="user_events")
+    user_events_keepalive_seconds: float = Field(default=30.0, gt=0)
+    user_events_max_backoff_seconds: float = Field(default=30.0, gt=0)
+    user_feed_enabled: bool = Field(default=False)
+    user_feed_buffer_size: int = Field(default=1024, ge=1)
+    user_feed_queue_size: int = Field(default=256, ge=1)
+    user_feed_keepalive_seconds: float = Field(default=15.0, gt=0)
+
+    auth_secret_key: Optional[str] = Field(default=None)
+    auth_previous_secret_keys: List[str] = Field(default_factory=list)
+    auth_token_ttl_seconds: int = Field(default=900)
+    auth_max_failed_attempts: int = Field(default=5)
+    auth_lockout_seconds: float = Field(default=300.0)
+    auth_tracker_max_entries: int = Field(default=100000)
+
 
 @lru_cache()
 def get_settings() -> Settings:
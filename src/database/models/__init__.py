@@ -1,3 +1,3 @@
-from src.database.models.user import User
+from src.database.models.user import USER_EVENT_SEQ, User
 
-__all__ = ["User"]
+__all__ = ["User", "USER_EVENT_SEQ"]
@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import sys
+from typing import BinaryIO, List, Optional
+
+from src.core.database import database
+from src.repository.user import UserRepository
+from src.service.export import EXPORT_MEDIA_TYPES, ExportStats, export_users
+
+STREAM_BATCH_ROWS = 5000
+
+
+def _flag(value: str) -> bool:
+    if value.lower() not in ("true", "false"):
+        raise argparse.ArgumentTypeError("expected true or false")
+    return value.lower() == "true"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.export",
+        description="Dump the users table as NDJSON or CSV through a server-side cursor.",
+    )
+    parser.add_argument("--format", dest="export_format", choices=sorted(EXPORT_MEDIA_TYPES),
+                        default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="Compress the output on the fly")
+    parser.add_argument("--output", default="-", help="File to write, - for stdout")
+    parser.add_argument("--active", dest="is_active", type=_flag, default=None,
+                        help="Only export users with this is_active value")
+    parser.add_argument("--public", dest="is_public", type=_flag, default=None,
+                        help="Only export users with this is_public value")
+    return parser.parse_args(argv)
+
+
+async def run_export(args: argparse.Namespace, output: BinaryIO) -> ExportStats:
+    stats = ExportStats()
+    database.connect()
+    try:
+        async with database.session() as session:
+            rows = UserRepository(session).stream_rows(
+                is_active=args.is_active, is_public=args.is_public, batch_size=STREAM_BATCH_ROWS
+            )
+            async for chunk in export_users(
+                rows, args.export_format, compress=args.gzip, stats=stats
+            ):
+                output.write(chunk)
+    finally:
+        await database.dispose()
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.output == "-":
+        stats = asyncio.run(run_export(args, sys.stdout.buffer))
+    else:
+        with open(args.output, "wb") as output:
+            stats = asyncio.run(run_export(args, output))
+    print(
+        f"exported {stats.rows} rows, {stats.bytes} bytes in {stats.seconds:.2f}s "
+        f"({stats.rows_per_second:.0f} rows/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import re
+from typing import Any, Dict, List, Optional, Type
+
+import msgpack
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+JSON_MEDIA_TYPES = (JSON_MEDIA_TYPE, "application/*", "*/*")
+
+_ETAG_VERSION = re.compile(r'^"(\d+)(?:-msgpack)?"$')
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic-core for models and orjson for everything else."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode()
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            content = content.model_dump(mode="json")
+        return msgpack.packb(content, default=str)
+
+
+def _accept_weights(accept: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for part in accept.split(","):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[media_type.lower()] = max(quality, weights.get(media_type.lower(), 0.0))
+    return weights
+
+
+def negotiate_response_class(accept: Optional[str]) -> Type[Response]:
+    if not accept:
+        return FastJSONResponse
+    weights = _accept_weights(accept)
+    msgpack_weight = max((weights.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES))
+    json_weight = max((weights.get(media_type, 0.0) for media_type in JSON_MEDIA_TYPES))
+    if msgpack_weight > 0 and msgpack_weight >= json_weight:
+        return MsgPackResponse
+    return FastJSONResponse
+
+
+def encode_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    response_class = negotiate_response_class(request.headers.get("accept"))
+    return response_class(payload, status_code=status_code, headers={"Vary": "Accept"})
+
+
+def make_etag(version: int, response_class: Type[Response]) -> str:
+    suffix = "-msgpack" if response_class is MsgPackResponse else ""
+    return f'"{version}{suffix}"'
+
+
+def _split_etags(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = _split_etags(if_none_match)
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def if_match_versions(if_match: Optional[str]) -> Optional[List[int]]:
+    """Row versions an If-Match header accepts; None when the request is unconditional.
+
+    Weak and foreign tags never match, so a header made only of those yields an
+    empty list and the write fails its precondition.
+    """
+    if not if_match:
+        return None
+    tags = _split_etags(if_match)
+    if "*" in tags:
+        return None
+    return [int(match.group(1)) for match in map(_ETAG_VERSION.match, tags) if match]
+
+
+def if_none_match_allows(if_none_match: Optional[str], version: int) -> bool:
+    """Whether an If-None-Match header lets a write to a row at this version proceed.
+
+    Tags compare weakly by row version, so the JSON and msgpack tags of one
+    version both block the write, as does "*" for any existing row.
+    """
+    if not if_none_match:
+        return True
+    tags = _split_etags(if_none_match)
+    if "*" in tags:
+        return False
+    versions = {
+        int(match.group(1))
+        for match in (_ETAG_VERSION.match(tag.removeprefix("W/")) for tag in tags)
+        if match
+    }
+    return version not in versions
+
+
+def encode_versioned_response(
+    request: Request, payload: Any, version: int, status_code: int = 200
+) -> Response:
+    response_class = negotiate_response_class(request.headers.get("accept"))
+    etag = make_etag(version, response_class)
+    headers = {"Vary": "Accept", "ETag": etag}
+    # Unsafe methods evaluate If-None-Match before writing; a 304 after the
+    # write would hide a change the client asked not to make.
+    if (
+        request.method in ("GET", "HEAD")
+        and status_code == 200
+        and etag_matches(request.headers.get("if-none-match"), etag)
+    ):
+        return Response(status_code=304, headers=headers)
+    return response_class(payload, status_code=status_code, headers=headers)
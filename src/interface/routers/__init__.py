@@ -1,3 +1,3 @@
-from . import user
+from . import auth, system, user
 
-__all__ = ["user"]
\ No newline at end of file
+__all__ = ["auth", "system", "user"]
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException
+import math
+import time
+from src.core.auth import TokenClaims
+from src.core.di import get_auth_service, get_token_claims
+from src.core.exceptions import (
+    ForbiddenException,
+    ServiceUnavailableException,
+    TooManyRequestsException,
+    UnauthorizedException,
+)
+from src.interface.schemas.auth import CurrentUserSchema, LoginSchema, TokenSchema
+from src.service.auth import AuthService
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+@router.post("/login", response_model=TokenSchema)
+async def login(
+    credentials: LoginSchema,
+    service: AuthService = Depends(get_auth_service),
+):
+    try:
+        token = await service.login(credentials.email, credentials.password)
+    except UnauthorizedException as e:
+        raise HTTPException(
+            status_code=401, detail=e.message, headers={"WWW-Authenticate": "Bearer"}
+        )
+    except ForbiddenException as e:
+        raise HTTPException(status_code=403, detail=e.message)
+    except TooManyRequestsException as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.message,
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except ServiceUnavailableException as e:
+        raise HTTPException(status_code=503, detail=e.message)
+    return TokenSchema(
+        access_token=token.access_token,
+        token_type=token.token_type,
+        expires_in=max(token.expires_at - int(time.time()), 0),
+    )
+
+
+@router.get("/me", response_model=CurrentUserSchema)
+async def me(claims: TokenClaims = Depends(get_token_claims)):
+    return CurrentUserSchema(
+        id=claims.user_id, email=claims.email, expires_at=claims.expires_at
+    )
@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+import time
+from src.core import database, get_settings, get_pool_stats, get_session
+from src.core.cache import get_user_cache
+from src.core.di import get_create_batcher
+from src.core.metrics import REGISTRY, DB_READINESS_LATENCY
+from src.core.singleflight import get_singleflight
+
+router = APIRouter(tags=["system"])
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+@router.get("/ready")
+async def ready(request: Request, session: AsyncSession = Depends(get_session)):
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is not None and not warmup.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    if get_settings().user_repository_backend == "memory":
+        # Nothing is served from Postgres, so its availability is irrelevant.
+        return {"status": "ready", "backend": "memory"}
+    started = time.perf_counter()
+    try:
+        await session.execute(text("SELECT 1"))
+    except (SQLAlchemyError, OSError) as e:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "detail": type(e).__name__},
+        )
+    latency = time.perf_counter() - started
+    DB_READINESS_LATENCY.set(latency)
+    return {"status": "ready", "db_latency_ms": round(latency * 1000, 3)}
+
+
+@router.get("/system/cache")
+async def cache_stats():
+    if not get_settings().user_cache_enabled:
+        return {"enabled": False}
+    return {"enabled": True, **get_user_cache().snapshot()}
+
+
+@router.get("/system/pool")
+async def pool_stats():
+    stats = get_pool_stats()
+    stats["replicas"] = [get_pool_stats(replica) for replica in database.connect().replica_engines]
+    return stats
+
+
+@router.get("/system/warmup")
+async def warmup_stats(request: Request):
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "finished": warmup.finished,
+        "durations_ms": {step: round(seconds * 1000, 3) for step, seconds in warmup.durations.items()},
+        "errors": warmup.errors,
+    }
+
+
+@router.get("/system/events")
+async def events_stats(request: Request):
+    listener = getattr(request.app.state, "user_events", None)
+    if listener is None:
+        return {"enabled": False}
+    hub = getattr(request.app.state, "user_feed", None)
+    return {
+        "enabled": True,
+        **listener.snapshot(),
+        "feed": None if hub is None else hub.snapshot(),
+    }
+
+
+@router.get("/system/batcher")
+async def batcher_stats():
+    if not get_settings().user_create_batching_enabled:
+        return {"enabled": False}
+    return {"enabled": True, **get_create_batcher().snapshot()}
+
+
+@router.get("/system/singleflight")
+async def singleflight_stats():
+    return get_singleflight().snapshot()
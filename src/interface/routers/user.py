@@ -1,16 +1,119 @@
-from fastapi import APIRouter, Depends, HTTPException
-from src.core.exceptions import NotFoundException, AlreadyExistsException
-from src.core.di import get_user_service
-from src.interface.schemas.user import UserCreateSchema, UserUpdateSchema, UserResponseSchema
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from src.core.exceptions import (
+    NotFoundException,
+    AlreadyExistsException,
+    PreconditionFailedException,
+    ServiceUnavailableException,
+    ValidationException,
+)
+from src.core.auth import TokenClaims
+from src.core.di import bearer_scheme, get_token_claims, get_user_service, pin_reads_to_primary
+from src.core.feed import UserEventHub
+from src.core import get_settings
+from src.interface.responses import (
+    encode_response,
+    encode_versioned_response,
+    if_match_versions,
+    if_none_match_allows,
+)
+from src.interface.schemas.user import (
+    UserCreateSchema,
+    UserUpdateSchema,
+    UserResponseSchema,
+    UserBulkCreateSchema,
+    UserBulkCreateResponseSchema,
+    UserPageSchema,
+    UserBatchSchema,
+    UserBulkDeactivateSchema,
+    UserBulkUpdateSchema,
+    UserBulkUpdateResponseSchema,
+)
+from src.service.export import EXPORT_MEDIA_TYPES, export_users
 from src.service.user import UserService
-from src.service.models import UserDTO
+from src.service.models import UserDTO, UserPageDTO, UserBatchDTO, UserBulkUpdateDTO
+from typing import AsyncIterator, List, Literal, Optional, Union
+import asyncio
 import uuid
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+SSE_KEEPALIVE_FRAME = b": keepalive\n\n"
+NDJSON_FLUSH_ROWS = 500
+BATCH_MAX_IDS = 100
+
+
+def _parse_ids(raw_ids: List[str]) -> List[uuid.UUID]:
+    try:
+        ids = [uuid.UUID(part) for raw in raw_ids for part in raw.split(",") if part]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be UUIDs")
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {BATCH_MAX_IDS} ids per request")
+    return ids
+
+
+def _user_response(user: UserDTO) -> UserResponseSchema:
+    return UserResponseSchema.model_construct(
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        is_public=user.is_public,
+        is_active=user.is_active,
+    )
+
+
+def _page_response(page: UserPageDTO) -> UserPageSchema:
+    return UserPageSchema.model_construct(
+        items=[_user_response(user) for user in page.items],
+        next_cursor=page.next_cursor,
+    )
+
+
+def _batch_response(batch: UserBatchDTO) -> UserBatchSchema:
+    return UserBatchSchema.model_construct(
+        items=[_user_response(user) for user in batch.items],
+        missing=batch.missing,
+    )
+
+
+def _bulk_update_response(result: UserBulkUpdateDTO) -> UserBulkUpdateResponseSchema:
+    return UserBulkUpdateResponseSchema.model_construct(
+        updated=result.updated, not_found=result.not_found
+    )
+
+
+async def _encode_ndjson(users: AsyncIterator[UserDTO]) -> AsyncIterator[bytes]:
+    buffer = []
+    async for user in users:
+        buffer.append(_user_response(user).model_dump_json())
+        if len(buffer) >= NDJSON_FLUSH_ROWS:
+            yield ("\n".join(buffer) + "\n").encode()
+            buffer = []
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode()
+
+
+async def _stream_feed(
+    hub: UserEventHub, last_event_id: Optional[str], keepalive: float
+) -> AsyncIterator[bytes]:
+    subscription = hub.subscribe(last_event_id)
+    try:
+        while True:
+            try:
+                yield await asyncio.wait_for(subscription.queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield SSE_KEEPALIVE_FRAME
+    finally:
+        hub.unsubscribe(subscription)
+
 
 @router.post("/", response_model=UserResponseSchema, status_code=201)
 async def create_user(
+    request: Request,
     user_data: UserCreateSchema,
     service: UserService = Depends(get_user_service),
 ):
@@ -21,26 +124,170 @@ async def create_user(
             hashed_password=user_data.password,
             is_public=user_data.is_public,
         )
-        user_id = await service.create_user(user_dto)
-        created_user = await service.get_user(user_id)
-        return created_user
+        user = await service.create_user(user_dto)
+        return pin_reads_to_primary(encode_versioned_response(
+            request, _user_response(user), user.version, status_code=201
+        ))
     except AlreadyExistsException as e:
         raise HTTPException(status_code=409, detail=e.message)
+    except ServiceUnavailableException as e:
+        raise HTTPException(status_code=503, detail=e.message)
+
+
+@router.post("/bulk", response_model=UserBulkCreateResponseSchema)
+async def create_users(
+    request: Request,
+    bulk_data: UserBulkCreateSchema,
+    service: UserService = Depends(get_user_service),
+):
+    try:
+        user_dtos = [
+            UserDTO(
+                name=user_data.name,
+                email=user_data.email,
+                hashed_password=user_data.password,
+                is_public=user_data.is_public,
+            )
+            for user_data in bulk_data.users
+        ]
+        results = await service.create_users(user_dtos)
+        created = sum(1 for result in results if result.status == "created")
+        response = UserBulkCreateResponseSchema(
+            created=created,
+            duplicates=len(results) - created,
+            results=[result.model_dump() for result in results],
+        )
+    except ServiceUnavailableException as e:
+        raise HTTPException(status_code=503, detail=e.message)
+    return pin_reads_to_primary(encode_response(request, response))
+
+
+@router.patch("/bulk", response_model=UserBulkUpdateResponseSchema)
+async def update_users(
+    request: Request,
+    bulk_data: UserBulkUpdateSchema,
+    service: UserService = Depends(get_user_service),
+):
+    user_dto = UserDTO(**bulk_data.model_dump(exclude_unset=True, exclude={"ids"}))
+    result = await service.update_users(bulk_data.ids, user_dto)
+    return pin_reads_to_primary(
+        encode_response(request, _bulk_update_response(result))
+    )
+
+
+@router.post("/bulk/deactivate", response_model=UserBulkUpdateResponseSchema)
+async def deactivate_users(
+    request: Request,
+    bulk_data: UserBulkDeactivateSchema,
+    service: UserService = Depends(get_user_service),
+):
+    result = await service.deactivate_users(bulk_data.ids)
+    return pin_reads_to_primary(
+        encode_response(request, _bulk_update_response(result))
+    )
+
+
+@router.get("", response_model=Union[UserPageSchema, UserBatchSchema])
+async def list_users(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_public: Optional[bool] = None,
+    ids: Optional[List[str]] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    service: UserService = Depends(get_user_service),
+):
+    if ids:
+        batch = await service.get_users(_parse_ids(ids))
+        return encode_response(request, _batch_response(batch))
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        # Streaming the whole table is a bulk read channel, authenticated like /users/export.
+        await get_token_claims(credentials)
+        users = service.stream_users(is_active=is_active, is_public=is_public)
+        return StreamingResponse(_encode_ndjson(users), media_type=NDJSON_MEDIA_TYPE)
+    try:
+        page = await service.list_users(
+            limit, cursor=cursor, is_active=is_active, is_public=is_public
+        )
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    return encode_response(request, _page_response(page))
+
+
+@router.get("/export")
+async def export_users_stream(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    gzip: bool = False,
+    is_active: Optional[bool] = None,
+    is_public: Optional[bool] = None,
+    claims: TokenClaims = Depends(get_token_claims),
+    service: UserService = Depends(get_user_service),
+):
+    rows = service.stream_user_rows(is_active=is_active, is_public=is_public)
+    headers = {"Content-Disposition": f'attachment; filename="users.{export_format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export_users(rows, export_format, compress=gzip),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers,
+    )
+
+
+@router.get("/events")
+async def user_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    claims: TokenClaims = Depends(get_token_claims),
+):
+    hub = getattr(request.app.state, "user_feed", None)
+    if hub is None:
+        raise HTTPException(status_code=404, detail="Change feed is not enabled")
+    return StreamingResponse(
+        _stream_feed(hub, last_event_id, get_settings().user_feed_keepalive_seconds),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{user_id}", response_model=UserResponseSchema)
 async def get_user(
+    request: Request,
     user_id: uuid.UUID,
     service: UserService = Depends(get_user_service),
 ):
     try:
-        return await service.get_user(user_id)
+        user = await service.get_profile(user_id)
     except NotFoundException as e:
         raise HTTPException(status_code=404, detail=e.message)
+    return encode_versioned_response(request, _user_response(user), user.version)
+
+
+async def _expected_versions(
+    request: Request, service: UserService, user_id: uuid.UUID
+) -> Optional[List[int]]:
+    expected = if_match_versions(request.headers.get("if-match"))
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return expected
+    version = (await service.get_user(user_id)).version
+    if expected is not None and version not in expected:
+        raise PreconditionFailedException(
+            "User was modified by another request", code="version_mismatch"
+        )
+    if not if_none_match_allows(if_none_match, version):
+        raise PreconditionFailedException(
+            "User matches If-None-Match", code="version_match"
+        )
+    # The write only applies to the version checked here, so a concurrent
+    # update in between fails it instead of slipping past If-None-Match.
+    return [version]
 
 
 @router.put("/{user_id}", response_model=UserResponseSchema)
 async def update_user(
+    request: Request,
     user_id: uuid.UUID,
     user_data: UserUpdateSchema,
     service: UserService = Depends(get_user_service),
@@ -51,20 +298,36 @@ async def update_user(
             update_dict["hashed_password"] = update_dict.pop("password")
         
         user_dto = UserDTO(**update_dict)
-        updated = await service.update_user(user_id, user_dto)
-        return updated
+        updated = await service.update_user(
+            user_id,
+            user_dto,
+            expected_versions=await _expected_versions(request, service, user_id),
+        )
+        return pin_reads_to_primary(
+            encode_versioned_response(request, _user_response(updated), updated.version)
+        )
     except NotFoundException as e:
         raise HTTPException(status_code=404, detail=e.message)
+    except PreconditionFailedException as e:
+        raise HTTPException(status_code=412, detail=e.message)
     except AlreadyExistsException as e:
         raise HTTPException(status_code=409, detail=e.message)
+    except ServiceUnavailableException as e:
+        raise HTTPException(status_code=503, detail=e.message)
 
 
 @router.delete("/{user_id}", status_code=204)
 async def deactivate_user(
+    request: Request,
     user_id: uuid.UUID,
     service: UserService = Depends(get_user_service),
 ):
     try:
-        await service.deactivate_user(user_id)
+        await service.deactivate_user(
+            user_id, expected_versions=await _expected_versions(request, service, user_id)
+        )
     except NotFoundException as e:
-        raise HTTPException(status_code=404, detail=e.message)
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=e.message)
+    except PreconditionFailedException as e:
+        raise HTTPException(status_code=412, detail=e.message)
+    return pin_reads_to_primary(Response(status_code=204))
\ No newline at end of file
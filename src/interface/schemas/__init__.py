@@ -1,7 +1,31 @@
-from src.interface.schemas.user import UserCreateSchema, UserUpdateSchema, UserResponseSchema
+from src.interface.schemas.user import (
+    UserCreateSchema,
+    UserUpdateSchema,
+    UserResponseSchema,
+    UserBulkCreateSchema,
+    UserBulkResultSchema,
+    UserBulkCreateResponseSchema,
+    UserPageSchema,
+    UserBatchSchema,
+    UserBulkDeactivateSchema,
+    UserBulkUpdateSchema,
+    UserBulkUpdateResponseSchema,
+)
+from src.interface.schemas.auth import LoginSchema, TokenSchema, CurrentUserSchema
 
 __all__ = [
     "UserCreateSchema",
     "UserUpdateSchema",
     "UserResponseSchema",
+    "UserBulkCreateSchema",
+    "UserBulkResultSchema",
+    "UserBulkCreateResponseSchema",
+    "UserPageSchema",
+    "UserBatchSchema",
+    "UserBulkDeactivateSchema",
+    "UserBulkUpdateSchema",
+    "UserBulkUpdateResponseSchema",
+    "LoginSchema",
+    "TokenSchema",
+    "CurrentUserSchema",
 ]
\ No newline at end of file
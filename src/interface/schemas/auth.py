@@ -0,0 +1,19 @@
+from pydantic import BaseModel, EmailStr
+import uuid
+
+
+class LoginSchema(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class TokenSchema(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
+class CurrentUserSchema(BaseModel):
+    id: uuid.UUID
+    email: str
+    expires_at: int
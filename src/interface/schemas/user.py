@@ -1,7 +1,10 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
+from typing import List, Optional
 import uuid
 
+BULK_CREATE_MAX_ITEMS = 10000
+BULK_UPDATE_MAX_IDS = 10000
+
 
 class UserCreateSchema(BaseModel):
     name: str
@@ -25,3 +28,54 @@ class UserResponseSchema(BaseModel):
     email: EmailStr
     is_public: bool
     is_active: bool
+
+
+class UserBulkCreateSchema(BaseModel):
+    users: List[UserCreateSchema] = Field(..., min_length=1, max_length=BULK_CREATE_MAX_ITEMS)
+
+
+class UserBulkResultSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    email: str
+    status: str
+    id: Optional[uuid.UUID] = None
+
+
+class UserBulkCreateResponseSchema(BaseModel):
+    created: int
+    duplicates: int
+    results: List[UserBulkResultSchema]
+
+
+class UserPageSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    items: List[UserResponseSchema]
+    next_cursor: Optional[str] = None
+
+
+class UserBatchSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    items: List[UserResponseSchema]
+    missing: List[uuid.UUID]
+
+
+class UserBulkDeactivateSchema(BaseModel):
+    ids: List[uuid.UUID] = Field(..., min_length=1, max_length=BULK_UPDATE_MAX_IDS)
+
+
+class UserBulkUpdateSchema(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    ids: List[uuid.UUID] = Field(..., min_length=1, max_length=BULK_UPDATE_MAX_IDS)
+    name: Optional[str] = None
+    is_public: Optional[bool] = None
+
+
+class UserBulkUpdateResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    updated: int
+    not_found: List[uuid.UUID]
@@ -0,0 +1,128 @@
+from typing import AsyncIterator, List, Optional, Sequence, Set, Tuple
+import uuid
+
+from src.core.cache import TieredCache
+from src.service.models import UserDTO
+from src.repository.interfaces.user import IUserRepository
+
+
+class CachedUserRepository(IUserRepository):
+    def __init__(self, repository: IUserRepository, cache: TieredCache):
+        self.repository = repository
+        self.cache = cache
+
+    @property
+    def read_target(self) -> Optional[str]:
+        return self.repository.read_target
+
+    async def get(self, user_id: uuid.UUID) -> UserDTO:
+        return await self.repository.get(user_id)
+
+    async def get_profile(self, user_id: uuid.UUID) -> UserDTO:
+        user = await self.cache.get(user_id)
+        if user is not None:
+            return user
+        epoch = self.cache.epoch()
+        user = await self.repository.get_profile(user_id)
+        # A lagging replica can return a row older than an invalidation that
+        # already ran, which would then be served until the entry expires.
+        if self.read_target != "replica":
+            await self.cache.set(user_id, user, epoch=epoch)
+        return user
+
+    async def get_credentials(self, email: str) -> UserDTO:
+        return await self.repository.get_credentials(email)
+
+    async def get_many(self, user_ids: List[uuid.UUID]) -> List[UserDTO]:
+        users = []
+        missing = []
+        for user_id in user_ids:
+            user = await self.cache.get(user_id)
+            if user is None:
+                missing.append(user_id)
+            else:
+                users.append(user)
+        if missing:
+            users.extend(await self.repository.get_many(missing))
+        return users
+
+    async def get_page(
+        self,
+        limit: int,
+        after: Optional[uuid.UUID] = None,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+    ) -> List[UserDTO]:
+        return await self.repository.get_page(
+            limit, after=after, is_active=is_active, is_public=is_public
+        )
+
+    def stream(
+        self,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[UserDTO]:
+        return self.repository.stream(
+            is_active=is_active, is_public=is_public, batch_size=batch_size
+        )
+
+    def stream_rows(
+        self,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Tuple]]:
+        return self.repository.stream_rows(
+            is_active=is_active, is_public=is_public, batch_size=batch_size
+        )
+
+    async def existing_emails(self, emails: List[str]) -> Set[str]:
+        return await self.repository.existing_emails(emails)
+
+    async def create(self, user: UserDTO) -> UserDTO:
+        return await self.repository.create(user)
+
+    async def create_many(self, users: List[UserDTO]) -> List[Optional[uuid.UUID]]:
+        return await self.repository.create_many(users)
+
+    async def create_batch(self, users: List[UserDTO]) -> List[Optional[UserDTO]]:
+        return await self.repository.create_batch(users)
+
+    async def update(
+        self,
+        user_id: uuid.UUID,
+        updates: dict,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> UserDTO:
+        try:
+            return await self.repository.update(user_id, updates, expected_versions)
+        finally:
+            await self.cache.delete(user_id)
+
+    async def update_password_hash(
+        self, user_id: uuid.UUID, old_hash: str, new_hash: str
+    ) -> bool:
+        return await self.repository.update_password_hash(user_id, old_hash, new_hash)
+
+    async def deactivate(
+        self,
+        user_id: uuid.UUID,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> None:
+        try:
+            await self.repository.deactivate(user_id, expected_versions)
+        finally:
+            await self.cache.delete(user_id)
+
+    async def update_many(self, user_ids: List[uuid.UUID], updates: dict) -> List[uuid.UUID]:
+        try:
+            return await self.repository.update_many(user_ids, updates)
+        finally:
+            await self.cache.delete_many(user_ids)
+
+    async def deactivate_many(self, user_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        try:
+            return await self.repository.deactivate_many(user_ids)
+        finally:
+            await self.cache.delete_many(user_ids)
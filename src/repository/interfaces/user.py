@@ -1,20 +1,102 @@
 from abc import ABC, abstractmethod
 from src.service.models.user import UserDTO
+from typing import AsyncIterator, List, Optional, Sequence, Set, Tuple
 import uuid
 
 class IUserRepository(ABC):
+    @property
+    def read_target(self) -> Optional[str]:
+        """Where reads currently go, or None once they must see this request's own writes."""
+        return "primary"
+
     @abstractmethod
     def get(self, user_id: uuid.UUID) -> UserDTO:
         pass
+
+    @abstractmethod
+    def get_profile(self, user_id: uuid.UUID) -> UserDTO:
+        pass
     
     @abstractmethod
-    def create(self, user: UserDTO) -> uuid.UUID:
+    def get_credentials(self, email: str) -> UserDTO:
+        pass
+
+    @abstractmethod
+    def get_many(self, user_ids: List[uuid.UUID]) -> List[UserDTO]:
+        pass
+
+    @abstractmethod
+    def get_page(
+        self,
+        limit: int,
+        after: Optional[uuid.UUID] = None,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+    ) -> List[UserDTO]:
+        pass
+
+    @abstractmethod
+    def stream(
+        self,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[UserDTO]:
+        pass
+
+    @abstractmethod
+    def stream_rows(
+        self,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Tuple]]:
+        """Batches of (id, name, email, is_public, is_active, version) tuples in id order."""
+        pass
+
+    @abstractmethod
+    def existing_emails(self, emails: List[str]) -> Set[str]:
         pass
 
     @abstractmethod
-    def update(self, user: UserDTO) -> None:
+    def create(self, user: UserDTO) -> UserDTO:
         pass
 
     @abstractmethod
-    def deactivate(self, user: UserDTO) -> None:
-        pass
\ No newline at end of file
+    def create_many(self, users: List[UserDTO]) -> List[Optional[uuid.UUID]]:
+        pass
+
+    @abstractmethod
+    def create_batch(self, users: List[UserDTO]) -> List[Optional[UserDTO]]:
+        pass
+
+    @abstractmethod
+    def update(
+        self,
+        user_id: uuid.UUID,
+        updates: dict,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> UserDTO:
+        pass
+
+    @abstractmethod
+    def update_password_hash(
+        self, user_id: uuid.UUID, old_hash: str, new_hash: str
+    ) -> bool:
+        pass
+
+    @abstractmethod
+    def deactivate(
+        self,
+        user_id: uuid.UUID,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def update_many(self, user_ids: List[uuid.UUID], updates: dict) -> List[uuid.UUID]:
+        pass
+
+    @abstractmethod
+    def deactivate_many(self, user_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        pass
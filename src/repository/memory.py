@@ -0,0 +1,249 @@
+from bisect import bisect_right, insort
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+import uuid
+
+from src.core.exceptions import (
+    NotFoundException,
+    AlreadyExistsException,
+    PreconditionFailedException,
+)
+from src.service.models import UserDTO
+from src.repository.interfaces.user import IUserRepository
+
+PUBLIC_FIELDS = ("id", "name", "email", "is_public", "is_active", "version")
+_UPDATABLE_FIELDS = frozenset(UserDTO.model_fields) - {"id", "version"}
+
+
+class InMemoryUserStore:
+    """Users held in process memory, indexed by id, lowercased email and id order."""
+
+    def __init__(self):
+        self.users: Dict[uuid.UUID, UserDTO] = {}
+        self.emails: Dict[str, uuid.UUID] = {}
+        self.ids: List[uuid.UUID] = []
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def add(self, user: UserDTO) -> None:
+        self.users[user.id] = user
+        self.emails[user.email.lower()] = user.id
+        insort(self.ids, user.id)
+
+    def replace(self, previous: UserDTO, user: UserDTO) -> None:
+        if previous.email.lower() != user.email.lower():
+            del self.emails[previous.email.lower()]
+            self.emails[user.email.lower()] = user.id
+        self.users[user.id] = user
+
+    def clear(self) -> None:
+        self.users.clear()
+        self.emails.clear()
+        self.ids.clear()
+
+
+@lru_cache()
+def get_memory_user_store() -> InMemoryUserStore:
+    return InMemoryUserStore()
+
+
+def _public(user: UserDTO) -> UserDTO:
+    return UserDTO.model_construct(**{field: getattr(user, field) for field in PUBLIC_FIELDS})
+
+
+def _matches(user: UserDTO, is_active: Optional[bool], is_public: Optional[bool]) -> bool:
+    return (is_active is None or user.is_active == is_active) and (
+        is_public is None or user.is_public == is_public
+    )
+
+
+class InMemoryUserRepository(IUserRepository):
+    def __init__(self, store: InMemoryUserStore):
+        self.store = store
+
+    def _find(self, user_id: uuid.UUID) -> UserDTO:
+        user = self.store.users.get(user_id)
+        if user is None:
+            raise NotFoundException(f"User with id {user_id} not found")
+        return user
+
+    def _find_versioned(
+        self, user_id: uuid.UUID, expected_versions: Optional[Sequence[int]]
+    ) -> UserDTO:
+        user = self.store.users.get(user_id)
+        if user is None:
+            raise NotFoundException("User not found")
+        if expected_versions is not None and user.version not in expected_versions:
+            raise PreconditionFailedException(
+                "User was modified by another request", code="version_mismatch"
+            )
+        return user
+
+    async def get(self, user_id: uuid.UUID) -> UserDTO:
+        return self._find(user_id).model_copy()
+
+    async def get_profile(self, user_id: uuid.UUID) -> UserDTO:
+        return _public(self._find(user_id))
+
+    async def get_credentials(self, email: str) -> UserDTO:
+        user_id = self.store.emails.get(email.lower())
+        if user_id is None:
+            raise NotFoundException("User not found")
+        return self.store.users[user_id].model_copy()
+
+    async def get_many(self, user_ids: List[uuid.UUID]) -> List[UserDTO]:
+        users = self.store.users
+        return [_public(users[user_id]) for user_id in dict.fromkeys(user_ids) if user_id in users]
+
+    async def get_page(
+        self,
+        limit: int,
+        after: Optional[uuid.UUID] = None,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+    ) -> List[UserDTO]:
+        ids = self.store.ids
+        start = 0 if after is None else bisect_right(ids, after)
+        page = []
+        for user_id in ids[start:]:
+            user = self.store.users[user_id]
+            if _matches(user, is_active, is_public):
+                page.append(_public(user))
+                if len(page) == limit:
+                    break
+        return page
+
+    async def stream(
+        self,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[UserDTO]:
+        after = None
+        while True:
+            page = await self.get_page(batch_size, after, is_active, is_public)
+            for user in page:
+                yield user
+            if len(page) < batch_size:
+                return
+            after = page[-1].id
+
+    async def stream_rows(
+        self,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Tuple]]:
+        after = None
+        while True:
+            page = await self.get_page(batch_size, after, is_active, is_public)
+            if page:
+                yield [tuple(getattr(user, field) for field in PUBLIC_FIELDS) for user in page]
+            if len(page) < batch_size:
+                return
+            after = page[-1].id
+
+    async def existing_emails(self, emails: List[str]) -> Set[str]:
+        return {email.lower() for email in emails if email.lower() in self.store.emails}
+
+    async def create(self, user: UserDTO) -> UserDTO:
+        if user.email.lower() in self.store.emails:
+            raise AlreadyExistsException("User with this email already exists")
+        created = UserDTO.model_construct(**{
+            "is_public": True,
+            **user.model_dump(exclude_none=True),
+            "id": user.id or uuid.uuid4(),
+            "is_active": True if user.is_active is None else user.is_active,
+            "version": 1,
+        })
+        self.store.add(created)
+        return created.model_copy()
+
+    async def create_batch(self, users: List[UserDTO]) -> List[Optional[UserDTO]]:
+        ids = await self.create_many(users)
+        return [
+            None if user_id is None else self.store.users[user_id].model_copy()
+            for user_id in ids
+        ]
+
+    async def create_many(self, users: List[UserDTO]) -> List[Optional[uuid.UUID]]:
+        ids: List[Optional[uuid.UUID]] = []
+        for user in users:
+            if user.email.lower() in self.store.emails:
+                ids.append(None)
+                continue
+            created = UserDTO.model_construct(
+                id=uuid.uuid4(),
+                name=user.name,
+                email=user.email,
+                hashed_password=user.hashed_password,
+                is_public=True if user.is_public is None else user.is_public,
+                is_active=True,
+                version=1,
+            )
+            self.store.add(created)
+            ids.append(created.id)
+        return ids
+
+    async def update(
+        self,
+        user_id: uuid.UUID,
+        updates: dict,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> UserDTO:
+        values = {key: value for key, value in updates.items() if key in _UPDATABLE_FIELDS}
+        if not values:
+            user = self._find(user_id)
+            if expected_versions is not None and user.version not in expected_versions:
+                raise PreconditionFailedException(
+                    "User was modified by another request", code="version_mismatch"
+                )
+            return user.model_copy()
+
+        user = self._find_versioned(user_id, expected_versions)
+        email = values.get("email")
+        if email is not None and self.store.emails.get(email.lower(), user_id) != user_id:
+            raise AlreadyExistsException("Email already in use")
+        updated = user.model_copy(update={**values, "version": user.version + 1})
+        self.store.replace(user, updated)
+        return updated.model_copy()
+
+    async def update_password_hash(
+        self, user_id: uuid.UUID, old_hash: str, new_hash: str
+    ) -> bool:
+        user = self.store.users.get(user_id)
+        if user is None or user.hashed_password != old_hash:
+            return False
+        self.store.replace(user, user.model_copy(update={"hashed_password": new_hash}))
+        return True
+
+    async def deactivate(
+        self,
+        user_id: uuid.UUID,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> None:
+        user = self._find_versioned(user_id, expected_versions)
+        self.store.replace(
+            user, user.model_copy(update={"is_active": False, "version": user.version + 1})
+        )
+
+    async def update_many(self, user_ids: List[uuid.UUID], updates: dict) -> List[uuid.UUID]:
+        values = {key: value for key, value in updates.items() if key in _UPDATABLE_FIELDS}
+        found = [user_id for user_id in dict.fromkeys(user_ids) if user_id in self.store.users]
+        if not values:
+            return found
+        email = values.get("email")
+        if email is not None:
+            owner = self.store.emails.get(email.lower())
+            if len(found) > 1 or (owner is not None and owner not in found):
+                raise AlreadyExistsException("Email already in use")
+        for user_id in found:
+            user = self.store.users[user_id]
+            self.store.replace(
+                user, user.model_copy(update={**values, "version": user.version + 1})
+            )
+        return found
+
+    async def deactivate_many(self, user_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        return await self.update_many(user_ids, {"is_active": False})
@@ -1,55 +1,401 @@
+from sqlalchemy import (
+    Integer, Row, Select, String, Update, any_, bindparam, func, select, update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 import uuid
 
-from src.core.exceptions import NotFoundException, AlreadyExistsException
-from src.database.models import User
+from src.core.events import encode_events
+from src.core.exceptions import (
+    NotFoundException,
+    AlreadyExistsException,
+    PreconditionFailedException,
+)
+from src.database.models import USER_EVENT_SEQ, User
 from src.service.models import UserDTO
 from src.repository.interfaces.user import IUserRepository
 
+# Statements below are built once at import and executed as plain Core on the
+# session's connection: their cache keys are memoized and no ORM compile or
+# result-processing step runs per call.
+users = User.__table__
+
+PUBLIC_COLUMNS = (
+    users.c.id, users.c.name, users.c.email, users.c.is_public, users.c.is_active, users.c.version,
+)
+USER_COLUMNS = PUBLIC_COLUMNS + (users.c.hashed_password,)
+
+_IDS_PARAM = bindparam("ids", type_=ARRAY(UUID(as_uuid=True)))
+_EMAILS_PARAM = bindparam("emails", type_=ARRAY(String))
+_VERSIONS_PARAM = bindparam("versions", type_=ARRAY(Integer))
+_USER_ID = users.c.id == bindparam("user_id")
+_IDS_MATCH = users.c.id == any_(_IDS_PARAM)
+_LOWER_EMAIL = func.lower(users.c.email)
+
+GET_USER = select(*USER_COLUMNS).where(_USER_ID)
+GET_PROFILE = select(*PUBLIC_COLUMNS).where(_USER_ID)
+GET_CREDENTIALS = select(*USER_COLUMNS).where(_LOWER_EMAIL == bindparam("email"))
+GET_MANY = select(*PUBLIC_COLUMNS).where(_IDS_MATCH)
+EXISTING_IDS = select(users.c.id).where(_IDS_MATCH)
+EXISTING_EMAILS = select(_LOWER_EMAIL).where(_LOWER_EMAIL == any_(_EMAILS_PARAM))
+GET_VERSION = select(users.c.version).where(_USER_ID)
+INSERT_USER = insert(users).returning(*USER_COLUMNS)
+INSERT_USERS = insert(users).on_conflict_do_nothing().returning(users.c.id)
+INSERT_USER_ROWS = insert(users).on_conflict_do_nothing().returning(*USER_COLUMNS)
+# NOTIFY is transactional: events reach listeners only if the write commits.
+# Each payload is prefixed with a number from user_event_seq, which every
+# listener receives unchanged, so it can serve as a cluster-wide event id.
+_PAYLOAD = func.unnest(bindparam("payloads", type_=ARRAY(String))).column_valued("payload")
+PUBLISH_EVENTS = select(func.pg_notify(
+    bindparam("channel"), func.concat(USER_EVENT_SEQ.next_value(), ":", _PAYLOAD)
+))
+UPDATE_PASSWORD_HASH = (
+    update(users)
+    .where(_USER_ID, users.c.hashed_password == bindparam("old_hash"))
+    .values(hashed_password=bindparam("new_hash"))
+    .returning(users.c.id)
+)
+
+
+def _versioned(stmt: Update, versioned: bool) -> Update:
+    stmt = stmt.where(_USER_ID)
+    if versioned:
+        stmt = stmt.where(users.c.version == any_(_VERSIONS_PARAM))
+    return stmt
+
+
+DEACTIVATE = {
+    versioned: _versioned(update(users), versioned)
+    .values(is_active=False, version=users.c.version + 1)
+    .returning(users.c.id)
+    for versioned in (False, True)
+}
+DEACTIVATE_MANY = (
+    update(users)
+    .where(_IDS_MATCH)
+    .values(is_active=False, version=users.c.version + 1)
+    .returning(users.c.id)
+)
+
+
+@lru_cache(maxsize=64)
+def update_statement(keys: Tuple[str, ...], versioned: bool) -> Update:
+    return (
+        _versioned(update(users), versioned)
+        .values(**{key: bindparam(f"new_{key}") for key in keys}, version=users.c.version + 1)
+        .returning(*USER_COLUMNS)
+    )
+
+
+@lru_cache(maxsize=16)
+def update_many_statement(keys: Tuple[str, ...]) -> Update:
+    return (
+        update(users)
+        .where(_IDS_MATCH)
+        .values(**{key: bindparam(f"new_{key}") for key in keys}, version=users.c.version + 1)
+        .returning(users.c.id)
+    )
+
+
+@lru_cache(maxsize=16)
+def page_statement(
+    keyset: bool, by_active: bool, by_public: bool, limited: bool = True
+) -> Select:
+    stmt = select(*PUBLIC_COLUMNS)
+    if by_active:
+        stmt = stmt.where(users.c.is_active == bindparam("is_active"))
+    if by_public:
+        stmt = stmt.where(users.c.is_public == bindparam("is_public"))
+    if keyset:
+        stmt = stmt.where(users.c.id > bindparam("after"))
+    stmt = stmt.order_by(users.c.id)
+    return stmt.limit(bindparam("limit")) if limited else stmt
+
+
+def _filter_params(
+    is_active: Optional[bool], is_public: Optional[bool], **params: Any
+) -> Dict[str, Any]:
+    if is_active is not None:
+        params["is_active"] = is_active
+    if is_public is not None:
+        params["is_public"] = is_public
+    return params
+
+
+def _to_dto(row: Row) -> UserDTO:
+    return UserDTO.model_construct(**row._mapping)
+
 
 class UserRepository(IUserRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        chunk_size: int = 1000,
+        read_session: Optional[AsyncSession] = None,
+        events_channel: Optional[str] = None,
+    ):
         self.session = session
+        self.chunk_size = chunk_size
+        self.read_session = read_session
+        self.events_channel = events_channel
+        self.wrote = False
+
+    @property
+    def read_target(self) -> Optional[str]:
+        if self.wrote:
+            return None
+        return "primary" if self.read_session is None else "replica"
+
+    @property
+    def reader(self) -> AsyncSession:
+        if self.read_session is None or self.wrote:
+            return self.session
+        return self.read_session
+
+    async def _execute(
+        self, stmt, params: Any = None, session: Optional[AsyncSession] = None
+    ) -> Result:
+        conn = await (session or self.session).connection()
+        return await conn.execute(stmt, params)
+
+    async def _commit_write(self) -> None:
+        self.wrote = True
+        await self.session.commit()
+
+    async def _publish(self, op: str, user_ids: List[uuid.UUID]) -> None:
+        if self.events_channel is None or not user_ids:
+            return
+        await self._execute(
+            PUBLISH_EVENTS,
+            {"channel": self.events_channel, "payloads": encode_events(op, user_ids)},
+        )
     
-    async def get(self, user_id: int) -> UserDTO:
-        user = await self.session.get(User, user_id)
-        if not user:
+    async def _get(
+        self, user_id: uuid.UUID, stmt: Select, session: Optional[AsyncSession] = None
+    ) -> UserDTO:
+        row = (await self._execute(stmt, {"user_id": user_id}, session)).one_or_none()
+        if row is None:
             raise NotFoundException(f"User with id {user_id} not found")
-        return UserDTO.model_validate(user)
+        return _to_dto(row)
 
-    async def create(self, user: UserDTO) -> int:
-        db_user = User(**user.model_dump(exclude_unset=True))
-        self.session.add(db_user)
+    async def get(self, user_id: uuid.UUID) -> UserDTO:
+        return await self._get(user_id, GET_USER)
+
+    async def get_profile(self, user_id: uuid.UUID) -> UserDTO:
+        return await self._get(user_id, GET_PROFILE, self.reader)
+
+    async def get_credentials(self, email: str) -> UserDTO:
+        row = (await self._execute(GET_CREDENTIALS, {"email": email.lower()})).one_or_none()
+        await self.session.commit()
+        if row is None:
+            raise NotFoundException("User not found")
+        return _to_dto(row)
+
+    async def get_many(self, user_ids: List[uuid.UUID]) -> List[UserDTO]:
+        if not user_ids:
+            return []
+        result = await self._execute(GET_MANY, {"ids": list(user_ids)}, self.reader)
+        return [_to_dto(row) for row in result]
+
+    async def get_page(
+        self,
+        limit: int,
+        after: Optional[uuid.UUID] = None,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+    ) -> List[UserDTO]:
+        stmt = page_statement(after is not None, is_active is not None, is_public is not None)
+        params = _filter_params(is_active, is_public, limit=limit)
+        if after is not None:
+            params["after"] = after
+        result = await self._execute(stmt, params, self.reader)
+        return [_to_dto(row) for row in result]
+
+    async def stream(
+        self,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[UserDTO]:
+        async for rows in self.stream_rows(is_active, is_public, batch_size):
+            for row in rows:
+                yield _to_dto(row)
+
+    async def stream_rows(
+        self,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Tuple]]:
+        stmt = page_statement(False, is_active is not None, is_public is not None, limited=False)
+        conn = await self.reader.connection()
+        result = await conn.stream(
+            stmt.execution_options(yield_per=batch_size), _filter_params(is_active, is_public)
+        )
+        # One await per fetched batch instead of one per row.
+        async for rows in result.partitions():
+            yield rows
+
+    async def existing_emails(self, emails: List[str]) -> Set[str]:
+        if not emails:
+            return set()
+        result = await self._execute(
+            EXISTING_EMAILS, {"emails": [email.lower() for email in emails]}
+        )
+        found = set(result.scalars())
+        # End the read transaction so no connection is held while the caller hashes.
+        await self.session.commit()
+        return found
+
+    async def create(self, user: UserDTO) -> UserDTO:
         try:
-            await self.session.commit()
-            await self.session.refresh(db_user)
-            return db_user.id
+            result = await self._execute(INSERT_USER, user.model_dump(exclude_none=True))
+            row = result.one()
+            await self._publish("create", [row.id])
+            await self._commit_write()
         except IntegrityError:
             await self.session.rollback()
             raise AlreadyExistsException("User with this email already exists")
+        return _to_dto(row)
+
+    def _rows(self, users: List[UserDTO]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": uuid.uuid4(),
+                "name": user.name,
+                "email": user.email,
+                "hashed_password": user.hashed_password,
+                "is_public": True if user.is_public is None else user.is_public,
+                "is_active": True,
+            }
+            for user in users
+        ]
 
-    async def update(self, user_id: uuid.UUID, updates: dict) -> UserDTO:
-        existing_user = await self.session.get(User, user_id)
-        if not existing_user:
+    async def create_many(self, users: List[UserDTO]) -> List[Optional[uuid.UUID]]:
+        rows = self._rows(users)
+        inserted = set()
+        for start in range(0, len(rows), self.chunk_size):
+            result = await self._execute(INSERT_USERS, rows[start:start + self.chunk_size])
+            chunk = result.scalars().all()
+            await self._publish("create", chunk)
+            inserted.update(chunk)
+            await self._commit_write()
+        return [row["id"] if row["id"] in inserted else None for row in rows]
+
+    async def create_batch(self, users: List[UserDTO]) -> List[Optional[UserDTO]]:
+        rows = self._rows(users)
+        result = await self._execute(INSERT_USER_ROWS, rows)
+        created = {row.id: _to_dto(row) for row in result}
+        await self._publish("create", list(created))
+        await self._commit_write()
+        return [created.get(row["id"]) for row in rows]
+
+    async def _raise_not_updated(self, user_id: uuid.UUID) -> None:
+        version = (await self._execute(GET_VERSION, {"user_id": user_id})).scalar_one_or_none()
+        if version is None:
             raise NotFoundException(f"User not found")
-        
-        for key, value in updates.items():
-            if hasattr(existing_user, key):
-                setattr(existing_user, key, value)
-        
+        raise PreconditionFailedException(
+            "User was modified by another request", code="version_mismatch"
+        )
+
+    async def update(
+        self,
+        user_id: uuid.UUID,
+        updates: dict,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> UserDTO:
+        values = {key: value for key, value in updates.items() if key in users.c}
+        values.pop("version", None)
+        if not values:
+            user = await self.get(user_id)
+            if expected_versions is not None and user.version not in expected_versions:
+                raise PreconditionFailedException(
+                    "User was modified by another request", code="version_mismatch"
+                )
+            return user
+
+        stmt = update_statement(tuple(sorted(values)), expected_versions is not None)
+        params = {f"new_{key}": value for key, value in values.items()}
+        params["user_id"] = user_id
+        if expected_versions is not None:
+            params["versions"] = list(expected_versions)
         try:
-            await self.session.commit()
-            await self.session.refresh(existing_user)
-            return UserDTO.model_validate(existing_user)
+            row = (await self._execute(stmt, params)).one_or_none()
+            if row is not None:
+                await self._publish("update", [row.id])
+            await self._commit_write()
         except IntegrityError:
             await self.session.rollback()
             raise AlreadyExistsException("Email already in use")
+        if row is None:
+            await self._raise_not_updated(user_id)
+        return _to_dto(row)
 
-    async def deactivate(self, user_id: uuid.UUID) -> None:
-        user = await self.session.get(User, user_id)
-        if not user:
-            raise NotFoundException(f"User not found")
-        
-        user.is_active = False
-        await self.session.commit()
\ No newline at end of file
+    async def update_password_hash(
+        self, user_id: uuid.UUID, old_hash: str, new_hash: str
+    ) -> bool:
+        result = await self._execute(
+            UPDATE_PASSWORD_HASH,
+            {"user_id": user_id, "old_hash": old_hash, "new_hash": new_hash},
+        )
+        updated = result.scalar_one_or_none()
+        await self._commit_write()
+        return updated is not None
+
+    async def deactivate(
+        self,
+        user_id: uuid.UUID,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> None:
+        params: Dict[str, Any] = {"user_id": user_id}
+        if expected_versions is not None:
+            params["versions"] = list(expected_versions)
+        result = await self._execute(DEACTIVATE[expected_versions is not None], params)
+        deactivated = result.scalar_one_or_none()
+        if deactivated is not None:
+            await self._publish("deactivate", [deactivated])
+        await self._commit_write()
+        if deactivated is None:
+            await self._raise_not_updated(user_id)
+
+    async def _update_chunks(
+        self, op: str, stmt: Update, user_ids: List[uuid.UUID], params: Dict[str, Any]
+    ) -> List[uuid.UUID]:
+        # Sorted, bounded chunks each commit on their own: row locks are taken in
+        # index order and no single transaction holds back vacuum for the whole batch.
+        ids = sorted(set(user_ids))
+        updated: List[uuid.UUID] = []
+        for start in range(0, len(ids), self.chunk_size):
+            result = await self._execute(
+                stmt, {**params, "ids": ids[start:start + self.chunk_size]}
+            )
+            chunk = result.scalars().all()
+            await self._publish(op, chunk)
+            updated.extend(chunk)
+            await self._commit_write()
+        return updated
+
+    async def update_many(self, user_ids: List[uuid.UUID], updates: dict) -> List[uuid.UUID]:
+        values = {key: value for key, value in updates.items() if key in users.c}
+        values.pop("version", None)
+        values.pop("id", None)
+        if not values:
+            result = await self._execute(EXISTING_IDS, {"ids": list(set(user_ids))})
+            return list(result.scalars())
+
+        stmt = update_many_statement(tuple(sorted(values)))
+        try:
+            return await self._update_chunks(
+                "update", stmt, user_ids, {f"new_{key}": value for key, value in values.items()}
+            )
+        except IntegrityError:
+            await self.session.rollback()
+            raise AlreadyExistsException("Email already in use")
+
+    async def deactivate_many(self, user_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        return await self._update_chunks("deactivate", DEACTIVATE_MANY, user_ids, {})
@@ -0,0 +1,54 @@
+import argparse
+import importlib.util
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+
+from src.core.settings import get_settings
+
+APP = "src.app:app"
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python -m src.server",
+        description="Serve the SkillMap API with one event loop and connection pool per worker.",
+    )
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument("--workers", type=int, default=settings.server_workers)
+    parser.add_argument("--graceful-timeout", type=float,
+                        default=settings.server_graceful_shutdown_seconds,
+                        help="Seconds to let in-flight requests finish on SIGTERM")
+    return parser.parse_args(argv)
+
+
+def server_options(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "host": args.host,
+        "port": args.port,
+        "workers": args.workers,
+        "loop": "uvloop" if _available("uvloop") else "asyncio",
+        "http": "httptools" if _available("httptools") else "h11",
+        "lifespan": "on",
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        "proxy_headers": True,
+        "reload": False,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.workers > 1 and not get_settings().auth_secret_key:
+        # Each worker would sign tokens with its own random key.
+        raise SystemExit("AUTH_SECRET_KEY must be set to serve with more than one worker")
+    uvicorn.run(APP, **server_options(args))
+
+
+if __name__ == "__main__":
+    main()
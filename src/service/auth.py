@@ -0,0 +1,75 @@
+from src.core.auth import LoginAttemptTracker, TokenSigner
+from src.core.exceptions import (
+    ForbiddenException,
+    NotFoundException,
+    TooManyRequestsException,
+    UnauthorizedException,
+)
+from src.core.metrics import AUTH_LOGINS, PASSWORD_REHASHES
+from src.core.security import hash_password_async, verify_and_update_password_async
+from src.repository.interfaces.user import IUserRepository
+from src.service.models import AccessTokenDTO
+from typing import Optional
+import secrets
+
+_dummy_hash: Optional[str] = None
+
+
+async def get_dummy_hash() -> str:
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await hash_password_async(secrets.token_hex(16))
+    return _dummy_hash
+
+
+class AuthService:
+    def __init__(
+        self,
+        user_repository: IUserRepository,
+        signer: TokenSigner,
+        tracker: LoginAttemptTracker,
+    ):
+        self.user_repository = user_repository
+        self.signer = signer
+        self.tracker = tracker
+
+    async def login(self, email: str, password: str) -> AccessTokenDTO:
+        try:
+            self.tracker.acquire(email)
+        except TooManyRequestsException:
+            AUTH_LOGINS.inc(result="locked")
+            raise
+
+        try:
+            try:
+                user = await self.user_repository.get_credentials(email)
+            except NotFoundException:
+                user = None
+            # Unknown emails still pay for one bcrypt so response times do not reveal them.
+            hashed_password = user.hashed_password if user else await get_dummy_hash()
+            valid, new_hash = await verify_and_update_password_async(password, hashed_password)
+        except Exception:
+            # A lookup or hashing error is not a wrong password.
+            self.tracker.release(email)
+            raise
+        if user is None or not valid:
+            AUTH_LOGINS.inc(result="invalid_credentials")
+            raise UnauthorizedException("Invalid email or password", code="invalid_credentials")
+
+        self.tracker.reset(email)
+        if new_hash is not None:
+            if await self.user_repository.update_password_hash(
+                user.id, user.hashed_password, new_hash
+            ):
+                PASSWORD_REHASHES.inc()
+        if not user.is_active:
+            AUTH_LOGINS.inc(result="inactive")
+            raise ForbiddenException("User is deactivated", code="user_inactive")
+
+        claims = self.signer.issue(user.id, user.email)
+        AUTH_LOGINS.inc(result="success")
+        return AccessTokenDTO(
+            access_token=self.signer.encode(claims),
+            user_id=user.id,
+            expires_at=claims.expires_at,
+        )
@@ -0,0 +1,109 @@
+import csv
+import io
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Optional, Sequence, Tuple
+
+import orjson
+
+from src.core.metrics import USER_EXPORT_ROWS, USER_EXPORT_ROWS_PER_SECOND
+
+EXPORT_FIELDS = ("id", "name", "email", "is_public", "is_active", "version")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# wbits=31 makes zlib write a gzip header and trailer.
+GZIP_WBITS = 31
+GZIP_LEVEL = 6
+# Spreadsheets evaluate cells starting with these as formulas (CSV injection).
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+@dataclass
+class ExportStats:
+    rows: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _encode_ndjson(rows: Sequence[Tuple]) -> bytes:
+    # Ids come back as asyncpg's own UUID type, which orjson does not serialize.
+    return b"".join(
+        orjson.dumps({
+            "id": str(user_id),
+            "name": name,
+            "email": email,
+            "is_public": is_public,
+            "is_active": is_active,
+            "version": version,
+        }) + b"\n"
+        for user_id, name, email, is_public, is_active, version in rows
+    )
+
+
+def _csv_text(value: str) -> str:
+    return "'" + value if value.startswith(CSV_FORMULA_PREFIXES) else value
+
+
+def _csv_encoder() -> Callable[[Sequence[Tuple]], bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def encode(rows: Sequence[Tuple]) -> bytes:
+        buffer.seek(0)
+        buffer.truncate()
+        # name and email are user-supplied; the other columns cannot start a formula.
+        writer.writerows(
+            (user_id, _csv_text(name), _csv_text(email), is_public, is_active, version)
+            for user_id, name, email, is_public, is_active, version in rows
+        )
+        return buffer.getvalue().encode()
+
+    return encode
+
+
+async def export_users(
+    batches: AsyncIterator[Sequence[Tuple]],
+    export_format: str = "ndjson",
+    compress: bool = False,
+    stats: Optional[ExportStats] = None,
+) -> AsyncIterator[bytes]:
+    """Encode row batches from ``stream_rows`` as NDJSON or CSV, gzipped if asked.
+
+    Each batch becomes one chunk, so memory is bounded by the batch size and
+    the compressor window, not by the number of rows.
+    """
+    stats = ExportStats() if stats is None else stats
+    encode = _encode_ndjson if export_format == "ndjson" else _csv_encoder()
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS) if compress else None
+
+    def output(data: bytes) -> bytes:
+        if compressor is not None:
+            data = compressor.compress(data)
+        stats.bytes += len(data)
+        return data
+
+    try:
+        if export_format == "csv":
+            yield output((",".join(EXPORT_FIELDS) + "\n").encode())
+        async for rows in batches:
+            stats.rows += len(rows)
+            chunk = output(encode(rows))
+            if chunk:
+                yield chunk
+        if compressor is not None:
+            tail = compressor.flush()
+            stats.bytes += len(tail)
+            yield tail
+    finally:
+        stats.finished = time.perf_counter()
+        USER_EXPORT_ROWS.inc(stats.rows, format=export_format)
+        USER_EXPORT_ROWS_PER_SECOND.set(stats.rows_per_second, format=export_format)
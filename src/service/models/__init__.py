@@ -1,5 +1,11 @@
-from src.service.models.user import UserDTO
+from src.service.models.user import UserDTO, UserBulkResultDTO, UserPageDTO, UserBatchDTO, UserBulkUpdateDTO
+from src.service.models.auth import AccessTokenDTO
 
 __all__ = [
     "UserDTO",
+    "UserBulkResultDTO",
+    "UserPageDTO",
+    "UserBatchDTO",
+    "UserBulkUpdateDTO",
+    "AccessTokenDTO",
 ]
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+import uuid
+
+
+class AccessTokenDTO(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    user_id: uuid.UUID
+    expires_at: int
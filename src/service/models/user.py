@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional
+from typing import List, Optional
 import uuid
 
 
@@ -12,4 +12,26 @@ class UserDTO(BaseModel):
     hashed_password: Optional[str] = None
     is_public: Optional[bool] = None
     is_active: Optional[bool] = None
+    version: Optional[int] = None
 
+
+
+class UserBulkResultDTO(BaseModel):
+    email: str
+    status: str
+    id: Optional[uuid.UUID] = None
+
+
+class UserPageDTO(BaseModel):
+    items: List[UserDTO]
+    next_cursor: Optional[str] = None
+
+
+class UserBatchDTO(BaseModel):
+    items: List[UserDTO]
+    missing: List[uuid.UUID]
+
+
+class UserBulkUpdateDTO(BaseModel):
+    updated: int
+    not_found: List[uuid.UUID]
@@ -1,32 +1,208 @@
-from src.core.exceptions import NotFoundException, AlreadyExistsException
-from src.core.security import hash_password
-from src.service.models import UserDTO
+from src.core.exceptions import NotFoundException, AlreadyExistsException, ValidationException
+from src.core.metrics import (
+    PASSWORD_HASH_SECONDS_SAVED,
+    PASSWORD_HASHES_SKIPPED,
+    USER_SIGNUP_DUPLICATES,
+)
+from src.core.batcher import MicroBatcher
+from src.core.security import hash_password_async, hash_passwords_async, mean_hash_seconds
+from src.core.singleflight import SingleFlight
+from src.service.models import (
+    UserDTO, UserBulkResultDTO, UserPageDTO, UserBatchDTO, UserBulkUpdateDTO,
+)
 from src.repository.interfaces.user import IUserRepository
+from typing import AsyncContextManager, AsyncIterator, Callable, List, Optional, Sequence, Tuple
+import base64
+import binascii
 import uuid
 
 
+def encode_cursor(user_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(user_id.bytes).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return uuid.UUID(bytes=base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError):
+        raise ValidationException("Invalid cursor", code="invalid_cursor")
+
+
+def _record_precheck_duplicates(count: int) -> None:
+    if count:
+        USER_SIGNUP_DUPLICATES.inc(count, stage="precheck")
+        PASSWORD_HASHES_SKIPPED.inc(count)
+        PASSWORD_HASH_SECONDS_SAVED.inc(count * mean_hash_seconds())
+
+
+def _bulk_result(requested: List[uuid.UUID], updated: List[uuid.UUID]) -> UserBulkUpdateDTO:
+    found = set(updated)
+    return UserBulkUpdateDTO(
+        updated=len(found),
+        not_found=[user_id for user_id in requested if user_id not in found],
+    )
+
+
 class UserService:
-    def __init__(self, user_repository: IUserRepository):
+    def __init__(
+        self,
+        user_repository: IUserRepository,
+        singleflight: Optional[SingleFlight] = None,
+        create_batcher: Optional[MicroBatcher] = None,
+        flight_repository: Optional[
+            Callable[[str], AsyncContextManager[IUserRepository]]
+        ] = None,
+    ):
         self.user_repository = user_repository
+        self.singleflight = singleflight
+        self.create_batcher = create_batcher
+        self.flight_repository = flight_repository
+
+    async def _insert(self, user: UserDTO) -> UserDTO:
+        if self.create_batcher is None:
+            return await self.user_repository.create(user)
+        created = await self.create_batcher.submit(user)
+        if created is None:
+            raise AlreadyExistsException("User with this email already exists")
+        return created
 
-    async def create_user(self, user: UserDTO) -> uuid.UUID:
+    async def create_user(self, user: UserDTO) -> UserDTO:
         if not user.name or not user.email or not user.hashed_password:
             raise ValueError("name, email and password are required for user creation")
-        user.hashed_password = hash_password(user.hashed_password)
-        return await self.user_repository.create(user)
+        if await self.user_repository.existing_emails([user.email]):
+            _record_precheck_duplicates(1)
+            raise AlreadyExistsException("User with this email already exists")
+        user.hashed_password = await hash_password_async(user.hashed_password)
+        try:
+            return await self._insert(user)
+        except AlreadyExistsException:
+            USER_SIGNUP_DUPLICATES.inc(stage="insert")
+            raise
+
+    async def create_users(self, users: List[UserDTO]) -> List[UserBulkResultDTO]:
+        for user in users:
+            if not user.name or not user.email or not user.hashed_password:
+                raise ValueError("name, email and password are required for user creation")
+        seen = await self.user_repository.existing_emails([user.email for user in users])
+        candidates = []
+        for index, user in enumerate(users):
+            email = user.email.lower()
+            if email not in seen:
+                seen.add(email)
+                candidates.append(index)
+        _record_precheck_duplicates(len(users) - len(candidates))
+
+        hashed = await hash_passwords_async(
+            [users[index].hashed_password for index in candidates]
+        )
+        prepared = [
+            users[index].model_copy(update={"hashed_password": hashed_password})
+            for index, hashed_password in zip(candidates, hashed)
+        ]
+        ids: List[Optional[uuid.UUID]] = [None] * len(users)
+        for index, user_id in zip(candidates, await self.user_repository.create_many(prepared)):
+            ids[index] = user_id
+        inserted_duplicates = sum(1 for index in candidates if ids[index] is None)
+        if inserted_duplicates:
+            USER_SIGNUP_DUPLICATES.inc(inserted_duplicates, stage="insert")
+        return [
+            UserBulkResultDTO(
+                email=user.email,
+                status="created" if user_id else "duplicate",
+                id=user_id,
+            )
+            for user, user_id in zip(users, ids)
+        ]
 
     async def get_user(self, user_id: uuid.UUID) -> UserDTO:
         return await self.user_repository.get(user_id)
 
-    async def update_user(self, user_id: uuid.UUID, user: UserDTO) -> UserDTO:
-        updates = user.model_dump(exclude_unset=True, exclude={"id"})
+    async def get_profile(self, user_id: uuid.UUID) -> UserDTO:
+        # A read that must see this request's write cannot share a flight that
+        # may have started before it, and replica flights never serve primary reads.
+        target = self.user_repository.read_target
+        if self.singleflight is None or target is None:
+            return await self.user_repository.get_profile(user_id)
+        return await self.singleflight.do(
+            ("user", user_id, target), lambda: self._shared_profile(target, user_id)
+        )
+
+    async def _shared_profile(self, target: str, user_id: uuid.UUID) -> UserDTO:
+        # Other requests wait on this call, so it must not run on this request's
+        # session, which is closed if the request is cancelled.
+        if self.flight_repository is None:
+            return await self.user_repository.get_profile(user_id)
+        async with self.flight_repository(target) as repo:
+            return await repo.get_profile(user_id)
+
+    async def get_users(self, user_ids: List[uuid.UUID]) -> UserBatchDTO:
+        requested = list(dict.fromkeys(user_ids))
+        found = {user.id: user for user in await self.user_repository.get_many(requested)}
+        return UserBatchDTO(
+            items=[found[user_id] for user_id in requested if user_id in found],
+            missing=[user_id for user_id in requested if user_id not in found],
+        )
+
+    async def list_users(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+    ) -> UserPageDTO:
+        after = decode_cursor(cursor) if cursor else None
+        users = await self.user_repository.get_page(
+            limit + 1, after=after, is_active=is_active, is_public=is_public
+        )
+        next_cursor = encode_cursor(users[limit - 1].id) if len(users) > limit else None
+        return UserPageDTO(items=users[:limit], next_cursor=next_cursor)
+
+    def stream_users(
+        self,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+    ) -> AsyncIterator[UserDTO]:
+        return self.user_repository.stream(is_active=is_active, is_public=is_public)
+
+    def stream_user_rows(
+        self,
+        is_active: Optional[bool] = None,
+        is_public: Optional[bool] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Tuple]]:
+        return self.user_repository.stream_rows(
+            is_active=is_active, is_public=is_public, batch_size=batch_size
+        )
+
+    async def update_user(
+        self,
+        user_id: uuid.UUID,
+        user: UserDTO,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> UserDTO:
+        updates = user.model_dump(exclude_unset=True, exclude={"id", "version"})
         if "hashed_password" in updates:
             if updates["hashed_password"]:
-                updates["hashed_password"] = hash_password(updates["hashed_password"])
+                updates["hashed_password"] = await hash_password_async(updates["hashed_password"])
             else:
                 del updates["hashed_password"]
-        return await self.user_repository.update(user_id, updates)
+        return await self.user_repository.update(user_id, updates, expected_versions)
+
+    async def deactivate_user(
+        self,
+        user_id: uuid.UUID,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> None:
+        await self.user_repository.deactivate(user_id, expected_versions)
 
-    async def deactivate_user(self, user_id: uuid.UUID) -> None:
-        await self.user_repository.deactivate(user_id)
+    async def update_users(self, user_ids: List[uuid.UUID], user: UserDTO) -> UserBulkUpdateDTO:
+        requested = list(dict.fromkeys(user_ids))
+        updates = user.model_dump(exclude_unset=True, exclude={"id", "version"})
+        updated = await self.user_repository.update_many(requested, updates)
+        return _bulk_result(requested, updated)
 
+    async def deactivate_users(self, user_ids: List[uuid.UUID]) -> UserBulkUpdateDTO:
+        requested = list(dict.fromkeys(user_ids))
+        updated = await self.user_repository.deactivate_many(requested)
+        return _bulk_result(requested, updated)
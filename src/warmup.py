@@ -0,0 +1,119 @@
+import asyncio
+import inspect
+import time
+import uuid
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Dict
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.core.auth import get_token_signer
+from src.core.database import Database
+from src.core.exceptions import NotFoundException
+from src.core.metrics import APP_WARMUP_DURATION
+from src.core.security import get_hashing_engine, verify_password_async
+from src.core.settings import Settings
+from src.interface.responses import FastJSONResponse, MsgPackResponse
+from src.interface.schemas import UserCreateSchema, UserPageSchema, UserResponseSchema
+from src.repository.user import UserRepository
+from src.service.auth import get_dummy_hash
+
+WARMUP_EMAIL = "warmup@example.com"
+
+
+@dataclass
+class WarmupState:
+    started: bool = False
+    finished: bool = False
+    durations: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ready(self) -> bool:
+        return not self.started or self.finished
+
+
+async def _prime_repository(repo: UserRepository) -> None:
+    missing = uuid.UUID(int=0)
+    for lookup in (repo.get, repo.get_profile):
+        with suppress(NotFoundException):
+            await lookup(missing)
+    with suppress(NotFoundException):
+        await repo.get_credentials(WARMUP_EMAIL)
+    await repo.get_many([missing])
+    await repo.get_page(limit=1)
+    await repo.existing_emails([WARMUP_EMAIL])
+
+
+async def warm_connections(db_engine: AsyncEngine, count: int) -> None:
+    """Open ``count`` pooled connections at once and prepare the read queries on each."""
+    opened = await asyncio.gather(
+        *(db_engine.connect() for _ in range(count)), return_exceptions=True
+    )
+    connections = [conn for conn in opened if not isinstance(conn, BaseException)]
+    try:
+        for conn in opened:
+            if isinstance(conn, BaseException):
+                raise conn
+        for conn in connections:
+            async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+                await _prime_repository(UserRepository(session))
+    finally:
+        for conn in connections:
+            await conn.close()
+
+
+def warm_serialization() -> None:
+    UserCreateSchema(name="Warmup", email=WARMUP_EMAIL, password="warmup-password")
+    user = UserResponseSchema(
+        id=uuid.UUID(int=0), name="Warmup", email=WARMUP_EMAIL, is_public=True, is_active=True
+    )
+    page = UserPageSchema(items=[user], next_cursor=None)
+    for response_class in (FastJSONResponse, MsgPackResponse):
+        response_class(user)
+        response_class(page)
+    signer = get_token_signer()
+    signer.verify(signer.encode(signer.issue(uuid.UUID(int=0), WARMUP_EMAIL)))
+
+
+async def warm_hashing() -> None:
+    dummy_hash = await get_dummy_hash()
+    # One job per pool slot so every worker process is spawned and has bcrypt loaded.
+    await asyncio.gather(*(
+        verify_password_async("warmup-password", dummy_hash)
+        for _ in range(get_hashing_engine().pool_size)
+    ))
+
+
+async def _timed(state: WarmupState, step: str, work) -> None:
+    started = time.perf_counter()
+    try:
+        result = work()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        state.errors[step] = type(e).__name__
+    finally:
+        state.durations[step] = time.perf_counter() - started
+        APP_WARMUP_DURATION.set(state.durations[step], step=step)
+
+
+async def warm_up(state: WarmupState, database: Database, settings: Settings) -> None:
+    state.started = True
+    started = time.perf_counter()
+    try:
+        if settings.user_repository_backend == "postgres" and settings.warmup_connections:
+            database.connect()
+            count = min(settings.warmup_connections, settings.db_pool_size)
+            await _timed(state, "connections", lambda: asyncio.gather(*(
+                warm_connections(db_engine, count)
+                for db_engine in [database.engine, *database.replica_engines]
+            )))
+        await _timed(state, "serialization", warm_serialization)
+        if settings.warmup_hashing:
+            await _timed(state, "hashing", warm_hashing)
+    finally:
+        state.durations["total"] = time.perf_counter() - started
+        APP_WARMUP_DURATION.set(state.durations["total"], step="total")
+        state.finished = True
@@ -98,3 +98,22 @@ async def created_user(db_session: AsyncSession, sample_created_user: User) -> U
     await db_session.commit()
     await db_session.refresh(sample_created_user)
     return sample_created_user
+
+
+@pytest.fixture
+async def created_users(db_session: AsyncSession) -> list:
+    """Create several users in the database, ordered by id."""
+    users = [
+        User(
+            id=uuid.uuid4(),
+            name=f"User {i}",
+            email=f"user{i}@example.com",
+            hashed_password="not-a-real-hash",
+            is_public=i % 2 == 0,
+            is_active=i != 4,
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(users)
+    await db_session.commit()
+    return sorted(users, key=lambda user: user.id)
@@ -1,3 +1,5 @@
+import json
+import msgpack
 import pytest
 from httpx import AsyncClient
 from syrupy.assertion import SnapshotAssertion
@@ -42,6 +44,53 @@ class TestUserAPI:
         assert response.status_code == 409
         snapshot.assert_match(response.json())
     
+    async def test_create_user_duplicate_email_case_insensitive(
+        self,
+        client: AsyncClient,
+        created_user,
+        sample_user_data
+    ):
+        """Test emails differing only in case are treated as duplicates."""
+        response = await client.post(
+            "/users/", json={**sample_user_data, "email": sample_user_data["email"].upper()}
+        )
+
+        assert response.status_code == 409
+
+    async def test_create_users_bulk(
+        self,
+        client: AsyncClient,
+        created_user,
+        sample_user_data,
+        sample_user_data_2,
+        snapshot: SnapshotAssertion
+    ):
+        """Test bulk creation returns per-item results including duplicates."""
+        response = await client.post(
+            "/users/bulk",
+            json={"users": [sample_user_data_2, sample_user_data]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert uuid.UUID(data["results"][0]["id"])
+        assert data["results"][1]["id"] is None
+
+        get_response = await client.get(f"/users/{data['results'][0]['id']}")
+        assert get_response.status_code == 200
+
+        data["results"] = [
+            {k: v for k, v in result.items() if k != "id"}
+            for result in data["results"]
+        ]
+        snapshot.assert_match(data)
+
+    async def test_create_users_bulk_empty(self, client: AsyncClient):
+        """Test bulk creation rejects an empty batch."""
+        response = await client.post("/users/bulk", json={"users": []})
+
+        assert response.status_code == 422
+
     @pytest.mark.parametrize("invalid_data,expected_status", [
         (
             {"name": "Test", "email": "not-an-email", "password": "Pass123!"},
@@ -115,6 +164,115 @@ class TestUserAPI:
         assert response.status_code == 422
         snapshot.assert_match(response.json())
     
+    async def test_list_users_pagination(
+        self,
+        client: AsyncClient,
+        created_users,
+        snapshot: SnapshotAssertion
+    ):
+        """Test listing users page by page with a cursor."""
+        first = await client.get("/users", params={"limit": 2, "is_active": True})
+        assert first.status_code == 200
+        cursor = first.json()["next_cursor"]
+        assert cursor
+
+        second = await client.get(
+            "/users", params={"limit": 2, "is_active": True, "cursor": cursor}
+        )
+        assert second.status_code == 200
+        assert second.json()["next_cursor"] is None
+
+        items = first.json()["items"] + second.json()["items"]
+        assert [item["id"] for item in items] == [
+            str(u.id) for u in created_users if u.is_active
+        ]
+        snapshot.assert_match(sorted(item["email"] for item in items))
+
+    async def test_list_users_ndjson_stream(self, client: AsyncClient, created_users):
+        """Test listing users as a streamed NDJSON body, for authenticated callers only."""
+        from src.core.auth import get_token_signer
+
+        signer = get_token_signer()
+        token = signer.encode(signer.issue(created_users[0].id, created_users[0].email))
+        anonymous = await client.get("/users", headers={"Accept": "application/x-ndjson"})
+        response = await client.get(
+            "/users",
+            params={"is_public": True},
+            headers={"Accept": "application/x-ndjson", "Authorization": f"Bearer {token}"},
+        )
+
+        assert anonymous.status_code == 401
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["id"] for line in lines] == [
+            str(u.id) for u in created_users if u.is_public
+        ]
+        assert all("hashed_password" not in line for line in lines)
+
+    async def test_get_users_by_ids(self, client: AsyncClient, created_users):
+        """Test resolving several ids in one request, repeated or comma-separated."""
+        unknown = str(uuid.uuid4())
+        response = await client.get(
+            "/users",
+            params={"ids": [f"{created_users[1].id},{unknown}", str(created_users[3].id)]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["id"] for item in data["items"]] == [
+            str(created_users[1].id), str(created_users[3].id)
+        ]
+        assert data["missing"] == [unknown]
+
+    async def test_get_user_msgpack(self, client: AsyncClient, created_user):
+        """Test a client asking for MessagePack gets the same payload in binary form."""
+        json_response = await client.get(f"/users/{created_user.id}")
+        response = await client.get(
+            f"/users/{created_user.id}",
+            headers={"Accept": "application/msgpack"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/msgpack"
+        assert response.headers["vary"] == "Accept"
+        assert msgpack.unpackb(response.content) == json_response.json()
+
+    async def test_list_users_msgpack(self, client: AsyncClient, created_users):
+        """Test list pages honour the Accept header preference order."""
+        response = await client.get(
+            "/users",
+            params={"limit": 2},
+            headers={"Accept": "application/json;q=0.5, application/x-msgpack"},
+        )
+
+        assert response.status_code == 200
+        data = msgpack.unpackb(response.content)
+        assert [item["id"] for item in data["items"]] == [str(u.id) for u in created_users[:2]]
+        assert data["next_cursor"]
+
+    async def test_json_preferred_over_msgpack(self, client: AsyncClient, created_user):
+        """Test JSON is served when the client ranks it above MessagePack."""
+        response = await client.get(
+            f"/users/{created_user.id}",
+            headers={"Accept": "application/json, application/msgpack;q=0.1"},
+        )
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["id"] == str(created_user.id)
+
+    async def test_get_users_by_invalid_ids(self, client: AsyncClient):
+        """Test malformed ids are rejected."""
+        response = await client.get("/users", params={"ids": "not-a-uuid"})
+
+        assert response.status_code == 422
+
+    async def test_list_users_invalid_cursor(self, client: AsyncClient):
+        """Test listing with a malformed cursor."""
+        response = await client.get("/users", params={"cursor": "%%%"})
+
+        assert response.status_code == 400
+
     @pytest.mark.parametrize("update_data", [
         {"name": "Updated Name"},
         {"is_public": False},
@@ -222,6 +380,77 @@ class TestUserAPI:
         assert get_response.status_code == 200
         assert get_response.json()["is_active"] == False
     
+    async def test_get_user_not_modified(self, client: AsyncClient, created_user):
+        """Test a matching If-None-Match is answered with an empty 304."""
+        response = await client.get(f"/users/{created_user.id}")
+        etag = response.headers["etag"]
+
+        cached = await client.get(
+            f"/users/{created_user.id}", headers={"If-None-Match": etag}
+        )
+        msgpack_response = await client.get(
+            f"/users/{created_user.id}",
+            headers={"If-None-Match": etag, "Accept": "application/msgpack"},
+        )
+
+        assert etag == '"1"'
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        assert msgpack_response.status_code == 200
+        assert msgpack_response.headers["etag"] == '"1-msgpack"'
+
+    async def test_update_user_if_match(self, client: AsyncClient, created_user):
+        """Test If-Match makes PUT fail with 412 once another write changed the row."""
+        etag = (await client.get(f"/users/{created_user.id}")).headers["etag"]
+
+        first = await client.put(
+            f"/users/{created_user.id}", json={"name": "First"}, headers={"If-Match": etag}
+        )
+        second = await client.put(
+            f"/users/{created_user.id}", json={"name": "Second"}, headers={"If-Match": etag}
+        )
+        stale_get = await client.get(
+            f"/users/{created_user.id}", headers={"If-None-Match": etag}
+        )
+
+        assert first.status_code == 200
+        assert first.headers["etag"] == '"2"'
+        assert second.status_code == 412
+        assert stale_get.status_code == 200
+        assert stale_get.json()["name"] == "First"
+
+    async def test_write_if_none_match(self, client: AsyncClient, created_user):
+        """Test If-None-Match on PUT/DELETE fails with 412 before writing, never 304 after."""
+        any_version = await client.put(
+            f"/users/{created_user.id}", json={"name": "Any"}, headers={"If-None-Match": "*"}
+        )
+        current = await client.delete(
+            f"/users/{created_user.id}", headers={"If-None-Match": 'W/"1-msgpack"'}
+        )
+        unchanged = await client.get(f"/users/{created_user.id}")
+        stale = await client.put(
+            f"/users/{created_user.id}", json={"name": "Fresh"}, headers={"If-None-Match": '"5"'}
+        )
+
+        assert any_version.status_code == 412
+        assert current.status_code == 412
+        assert unchanged.json()["name"] == created_user.name
+        assert unchanged.json()["is_active"] is True
+        assert stale.status_code == 200
+        assert stale.json()["name"] == "Fresh"
+        assert stale.headers["etag"] == '"2"'
+
+    async def test_delete_user_if_match(self, client: AsyncClient, created_user):
+        """Test DELETE honours If-Match."""
+        stale = await client.delete(f"/users/{created_user.id}", headers={"If-Match": '"5"'})
+        weak = await client.delete(f"/users/{created_user.id}", headers={"If-Match": 'W/"1"'})
+        current = await client.delete(f"/users/{created_user.id}", headers={"If-Match": '"1"'})
+
+        assert stale.status_code == 412
+        assert weak.status_code == 412
+        assert current.status_code == 204
+
     async def test_delete_user_not_found(
         self,
         client: AsyncClient,
@@ -234,6 +463,32 @@ class TestUserAPI:
         assert response.status_code == 404
         snapshot.assert_match(response.json())
     
+    async def test_bulk_update_and_deactivate_users(
+        self, client: AsyncClient, created_users
+    ):
+        """Test bulk endpoints patch and deactivate many users and list unknown ids."""
+        ids = [str(user.id) for user in created_users[:2]]
+        missing = str(uuid.uuid4())
+        await client.get(f"/users/{ids[0]}")
+
+        patch_response = await client.patch(
+            "/users/bulk", json={"ids": ids + [missing], "is_public": False}
+        )
+        deactivate_response = await client.post(
+            "/users/bulk/deactivate", json={"ids": ids + [missing]}
+        )
+        email_response = await client.patch(
+            "/users/bulk", json={"ids": ids, "email": "same@example.com"}
+        )
+        user = (await client.get(f"/users/{ids[0]}")).json()
+
+        assert patch_response.status_code == 200
+        assert patch_response.json() == {"updated": 2, "not_found": [missing]}
+        assert deactivate_response.json() == {"updated": 2, "not_found": [missing]}
+        assert email_response.status_code == 422
+        assert user["is_public"] == False
+        assert user["is_active"] == False
+
     async def test_create_multiple_users(
         self,
         client: AsyncClient,
@@ -303,3 +558,230 @@ class TestUserAPI:
             "deactivated": {k: v for k, v in final_user.items() if k != "id"}
         }
         snapshot.assert_match(lifecycle_snapshot)
+
+    async def test_memory_backend_serves_api(
+        self,
+        client: AsyncClient,
+        db_session,
+        sample_user_data,
+        monkeypatch
+    ):
+        """Test the API runs against the in-memory repository without touching Postgres."""
+        from sqlalchemy import func, select
+        from src.core import get_settings
+        from src.database.models import User
+        from src.repository.memory import get_memory_user_store
+
+        monkeypatch.setattr(get_settings(), "user_repository_backend", "memory")
+        get_memory_user_store.cache_clear()
+        try:
+            create_response = await client.post("/users/", json=sample_user_data)
+            user_id = create_response.json()["id"]
+            duplicate_response = await client.post("/users/", json=sample_user_data)
+            login_response = await client.post("/auth/login", json={
+                "email": sample_user_data["email"],
+                "password": sample_user_data["password"],
+            })
+            get_response = await client.get(f"/users/{user_id}")
+            stored = len(get_memory_user_store())
+        finally:
+            get_memory_user_store.cache_clear()
+
+        assert create_response.status_code == 201
+        assert duplicate_response.status_code == 409
+        assert login_response.status_code == 200
+        assert get_response.json()["email"] == sample_user_data["email"]
+        assert stored == 1
+        assert await db_session.scalar(select(func.count()).select_from(User)) == 0
+
+    async def test_writes_pin_reads_to_primary(
+        self,
+        client: AsyncClient,
+        sample_user_data,
+        monkeypatch
+    ):
+        """Test writes set the read-your-writes cookie only when the window is enabled."""
+        from src.core import get_settings
+        from src.core.di import PRIMARY_READS_COOKIE
+
+        response = await client.post("/users/", json=sample_user_data)
+        assert PRIMARY_READS_COOKIE not in response.cookies
+
+        monkeypatch.setattr(get_settings(), "db_read_your_writes_seconds", 5.0)
+        user_id = response.json()["id"]
+        update_response = await client.put(f"/users/{user_id}", json={"name": "Renamed"})
+        delete_response = await client.delete(f"/users/{user_id}")
+
+        assert PRIMARY_READS_COOKIE in update_response.cookies
+        assert delete_response.status_code == 204
+        assert PRIMARY_READS_COOKIE in delete_response.cookies
+        assert (await client.get(f"/users/{user_id}")).json()["is_active"] == False
+
+    async def test_export_requires_token(
+        self, client: AsyncClient, created_user, sample_user_data
+    ):
+        """Test the export streams CSV for authenticated callers and rejects others."""
+        anonymous = await client.get("/users/export")
+        token = (await client.post("/auth/login", json={
+            "email": sample_user_data["email"],
+            "password": sample_user_data["password"],
+        })).json()["access_token"]
+
+        response = await client.get(
+            "/users/export",
+            params={"format": "csv", "gzip": "true"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert anonymous.status_code == 401
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text.splitlines() == [
+            "id,name,email,is_public,is_active,version",
+            f"{created_user.id},{created_user.name},{created_user.email},True,True,1",
+        ]
+
+    async def test_change_feed_disabled(
+        self, client: AsyncClient, created_user, sample_user_data
+    ):
+        """Test the change feed requires a token and is not served unless it is enabled."""
+        anonymous = await client.get("/users/events")
+        token = (await client.post("/auth/login", json={
+            "email": sample_user_data["email"],
+            "password": sample_user_data["password"],
+        })).json()["access_token"]
+
+        response = await client.get(
+            "/users/events", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert anonymous.status_code == 401
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Change feed is not enabled"
+
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestAuthAPI:
+    """Integration tests for login and token authentication."""
+
+    async def test_login_and_me(self, client: AsyncClient, created_user, sample_user_data):
+        """Test a token from /auth/login authenticates /auth/me."""
+        response = await client.post("/auth/login", json={
+            "email": sample_user_data["email"],
+            "password": sample_user_data["password"],
+        })
+
+        assert response.status_code == 200
+        token = response.json()
+        assert token["token_type"] == "bearer"
+        assert 0 < token["expires_in"] <= 900
+
+        me = await client.get(
+            "/auth/me", headers={"Authorization": f"Bearer {token['access_token']}"}
+        )
+        assert me.status_code == 200
+        assert me.json()["id"] == str(created_user.id)
+        assert me.json()["email"] == sample_user_data["email"]
+
+    async def test_login_wrong_password(self, client: AsyncClient, created_user, sample_user_data):
+        """Test wrong credentials are rejected with 401."""
+        response = await client.post("/auth/login", json={
+            "email": sample_user_data["email"],
+            "password": "wrong-password",
+        })
+
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+
+    @pytest.mark.parametrize("headers", [
+        {},
+        {"Authorization": "Bearer not-a-token"},
+        {"Authorization": "Basic dXNlcjpwYXNz"},
+    ])
+    async def test_me_requires_valid_token(self, client: AsyncClient, headers):
+        """Test /auth/me rejects missing, malformed and non-bearer credentials."""
+        response = await client.get("/auth/me", headers=headers)
+
+        assert response.status_code == 401
+
+    async def test_login_lockout(self, client: AsyncClient):
+        """Test repeated failures for one email are throttled with 429."""
+        payload = {"email": f"locked-{uuid.uuid4().hex}@example.com", "password": "wrong"}
+        statuses = [(await client.post("/auth/login", json=payload)).status_code for _ in range(5)]
+        locked = await client.post("/auth/login", json=payload)
+
+        assert statuses == [401] * 5
+        assert locked.status_code == 429
+        assert int(locked.headers["retry-after"]) > 0
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestSystemAPI:
+    """Integration tests for metrics and readiness endpoints."""
+
+    async def test_metrics_exposes_route_latency(self, client: AsyncClient, created_user):
+        """Test /metrics reports per-route latency using the route template."""
+        await client.get(f"/users/{created_user.id}")
+
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/users/{user_id}",status="200"}'
+            in body
+        )
+        assert "http_requests_in_flight" in body
+        assert "db_pool_connections" in body
+
+    async def test_ready_waits_for_warmup(self, client: AsyncClient):
+        """Test /ready reports 503 until the worker's warmup has finished."""
+        from src.app import app
+        from src.warmup import WarmupState
+
+        app.state.warmup = WarmupState(started=True)
+        try:
+            warming = await client.get("/ready")
+            app.state.warmup.finished = True
+            warmed = await client.get("/ready")
+        finally:
+            del app.state.warmup
+
+        assert warming.status_code == 503
+        assert warming.json() == {"status": "warming_up"}
+        assert warmed.status_code == 200
+
+    async def test_ready_with_memory_backend(self, client: AsyncClient, monkeypatch):
+        """Test /ready does not probe Postgres when the memory backend is selected."""
+        from src.app import app
+        from src.core import get_session, get_settings
+
+        class UnreachableSession:
+            async def execute(self, *args, **kwargs):
+                raise ConnectionRefusedError()
+
+        async def unreachable_session():
+            yield UnreachableSession()
+
+        app.dependency_overrides[get_session] = unreachable_session
+        postgres_response = await client.get("/ready")
+        monkeypatch.setattr(get_settings(), "user_repository_backend", "memory")
+        memory_response = await client.get("/ready")
+
+        assert postgres_response.status_code == 503
+        assert memory_response.status_code == 200
+        assert memory_response.json() == {"status": "ready", "backend": "memory"}
+
+    async def test_ready_measures_db_latency(self, client: AsyncClient):
+        """Test /ready runs a database round trip."""
+        response = await client.get("/ready")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["db_latency_ms"] >= 0
@@ -0,0 +1,239 @@
+import asyncio
+import uuid
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.auth import LoginAttemptTracker, TokenSigner, token_secret
+from src.core.exceptions import (
+    ForbiddenException,
+    TooManyRequestsException,
+    UnauthorizedException,
+)
+from src.core.metrics import PASSWORD_REHASHES
+from src.core.security import build_crypt_context
+from src.core.settings import get_settings
+from src.repository.memory import InMemoryUserRepository, InMemoryUserStore
+from src.repository.user import UserRepository
+from src.service.auth import AuthService
+from src.service.models import UserDTO
+
+
+@pytest.fixture
+def signer():
+    """Token signer with a fixed key."""
+    return TokenSigner([b"test-secret"], ttl_seconds=60)
+
+
+@pytest.mark.unit
+class TestTokenSigner:
+    """Unit tests for stateless access tokens."""
+
+    def test_roundtrip(self, signer):
+        """Test a freshly issued token verifies to the same claims."""
+        user_id = uuid.uuid4()
+        claims = signer.issue(user_id, "test@example.com")
+
+        verified = signer.verify(signer.encode(claims))
+
+        assert verified == claims
+        assert verified.expires_at - verified.issued_at == 60
+
+    def test_rejects_tampered_payload(self, signer):
+        """Test changing the payload invalidates the signature."""
+        token = signer.encode(signer.issue(uuid.uuid4(), "test@example.com"))
+        header, _, signature = token.split(".")
+        forged = signer.encode(signer.issue(uuid.uuid4(), "admin@example.com")).split(".")[1]
+
+        with pytest.raises(UnauthorizedException) as exc_info:
+            signer.verify(f"{header}.{forged}.{signature}")
+        assert exc_info.value.code == "invalid_token"
+
+    @pytest.mark.parametrize("token", ["", "abc", "a.b.c", "a.b.c.d"])
+    def test_rejects_malformed(self, signer, token):
+        """Test garbage tokens are rejected rather than raising unexpected errors."""
+        with pytest.raises(UnauthorizedException):
+            signer.verify(token)
+
+    def test_rejects_expired(self, signer):
+        """Test tokens past their expiry are rejected."""
+        token = signer.encode(signer.issue(uuid.uuid4(), "test@example.com", now=1000))
+
+        with pytest.raises(UnauthorizedException) as exc_info:
+            signer.verify(token, now=1060)
+        assert exc_info.value.code == "token_expired"
+
+    def test_key_rotation(self, signer):
+        """Test tokens signed with a previous key still verify after rotation."""
+        old_token = signer.encode(signer.issue(uuid.uuid4(), "test@example.com"))
+        rotated = TokenSigner([b"new-secret", b"test-secret"], ttl_seconds=60)
+        unrelated = TokenSigner([b"other-secret"], ttl_seconds=60)
+
+        assert rotated.verify(old_token).email == "test@example.com"
+        with pytest.raises(UnauthorizedException):
+            unrelated.verify(old_token)
+
+    @pytest.mark.parametrize("update", [{"server_workers": 4}, {"app_env": "production"}])
+    def test_missing_secret_is_refused_across_processes(self, update):
+        """Test a per-process key is refused where tokens must validate in other processes."""
+        settings = get_settings().model_copy(update={"auth_secret_key": None, **update})
+
+        with pytest.raises(RuntimeError):
+            token_secret(settings)
+
+    def test_missing_secret_warns_in_development(self, caplog):
+        """Test a single development worker falls back to a random key with a warning."""
+        settings = get_settings().model_copy(update={
+            "auth_secret_key": None, "server_workers": 1, "app_env": "development",
+        })
+
+        assert token_secret(settings) != token_secret(settings)
+        assert "AUTH_SECRET_KEY is not set" in caplog.text
+
+
+@pytest.mark.unit
+class TestLoginAttemptTracker:
+    """Unit tests for failed login tracking."""
+
+    def test_locks_after_max_failures(self):
+        """Test an email is locked after too many failures, case-insensitively."""
+        tracker = LoginAttemptTracker(max_attempts=2, lockout_seconds=30)
+        tracker.record_failure("a@example.com")
+        tracker.check("a@example.com")
+        tracker.record_failure("A@example.com")
+
+        with pytest.raises(TooManyRequestsException) as exc_info:
+            tracker.check("a@example.com")
+        assert exc_info.value.retry_after == 30
+
+        tracker.reset("a@example.com")
+        tracker.check("a@example.com")
+
+    def test_acquire_reserves_and_release_returns_slots(self):
+        """Test attempts count before verification and unjudged ones are given back."""
+        tracker = LoginAttemptTracker(max_attempts=2, lockout_seconds=30)
+        tracker.acquire("a@example.com")
+        tracker.acquire("a@example.com")
+
+        with pytest.raises(TooManyRequestsException):
+            tracker.acquire("a@example.com")
+
+        tracker.release("a@example.com")
+        tracker.acquire("a@example.com")
+        tracker.release("a@example.com")
+        tracker.release("a@example.com")
+        assert len(tracker) == 0
+
+    def test_is_bounded(self):
+        """Test the tracker never holds more than its entry limit."""
+        tracker = LoginAttemptTracker(max_entries=3)
+        for i in range(10):
+            tracker.record_failure(f"user{i}@example.com")
+
+        assert len(tracker) == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAuthService:
+    """Unit tests for the login flow."""
+
+    async def test_login_success(self, db_session: AsyncSession, created_user, signer):
+        """Test valid credentials return a token for the user, matching email case-insensitively."""
+        service = AuthService(UserRepository(db_session), signer, LoginAttemptTracker())
+
+        token = await service.login(created_user.email.upper(), "SecurePass123!")
+
+        assert token.user_id == created_user.id
+        assert signer.verify(token.access_token).user_id == created_user.id
+
+    async def test_login_failures_lock_before_bcrypt(
+        self,
+        db_session: AsyncSession,
+        created_user,
+        signer,
+        monkeypatch
+    ):
+        """Test a locked email is rejected without verifying the password."""
+        service = AuthService(
+            UserRepository(db_session), signer, LoginAttemptTracker(max_attempts=2)
+        )
+        for _ in range(2):
+            with pytest.raises(UnauthorizedException):
+                await service.login(created_user.email, "wrong-password")
+
+        async def fail_verify(plain_password, hashed_password):
+            raise AssertionError("locked login must not reach bcrypt")
+
+        monkeypatch.setattr("src.service.auth.verify_and_update_password_async", fail_verify)
+        with pytest.raises(TooManyRequestsException):
+            await service.login(created_user.email, "SecurePass123!")
+
+    async def test_concurrent_burst_is_capped(self, signer, monkeypatch):
+        """Test parallel guesses for one email reach bcrypt at most max_attempts times."""
+        repo = InMemoryUserRepository(InMemoryUserStore())
+        await repo.create(UserDTO(
+            name="Burst", email="burst@example.com", hashed_password="hashed_password_123"
+        ))
+        verified = []
+
+        async def slow_verify(plain_password, hashed_password):
+            verified.append(plain_password)
+            await asyncio.sleep(0.05)
+            return False, None
+
+        monkeypatch.setattr("src.service.auth.verify_and_update_password_async", slow_verify)
+        service = AuthService(repo, signer, LoginAttemptTracker(max_attempts=3))
+
+        results = await asyncio.gather(
+            *(service.login("burst@example.com", f"guess-{i}") for i in range(10)),
+            return_exceptions=True,
+        )
+
+        assert len(verified) == 3
+        assert sum(isinstance(r, UnauthorizedException) for r in results) == 3
+        assert sum(isinstance(r, TooManyRequestsException) for r in results) == 7
+
+    async def test_login_unknown_email(self, db_session: AsyncSession, signer):
+        """Test an unknown email fails like a wrong password."""
+        service = AuthService(UserRepository(db_session), signer, LoginAttemptTracker())
+
+        with pytest.raises(UnauthorizedException) as exc_info:
+            await service.login("nobody@example.com", "whatever")
+        assert exc_info.value.code == "invalid_credentials"
+
+    async def test_login_inactive_user(self, db_session: AsyncSession, created_user, signer):
+        """Test deactivated users cannot obtain a token."""
+        repo = UserRepository(db_session)
+        await repo.deactivate(created_user.id)
+        service = AuthService(repo, signer, LoginAttemptTracker())
+
+        with pytest.raises(ForbiddenException):
+            await service.login(created_user.email, "SecurePass123!")
+
+    async def test_login_upgrades_outdated_hash(
+        self,
+        db_session: AsyncSession,
+        created_user,
+        signer,
+        monkeypatch
+    ):
+        """Test a successful login re-hashes a password made with an outdated cost."""
+        context = build_crypt_context(4)
+
+        async def verify_and_update(plain_password, hashed_password):
+            return context.verify_and_update(plain_password, hashed_password)
+
+        monkeypatch.setattr(
+            "src.service.auth.verify_and_update_password_async", verify_and_update
+        )
+        repo = UserRepository(db_session)
+        service = AuthService(repo, signer, LoginAttemptTracker())
+        rehashes_before = PASSWORD_REHASHES.value()
+
+        await service.login(created_user.email, "SecurePass123!")
+        upgraded = (await repo.get(created_user.id)).hashed_password
+        await service.login(created_user.email, "SecurePass123!")
+
+        assert upgraded.startswith("$2b$04$")
+        assert context.verify("SecurePass123!", upgraded)
+        assert PASSWORD_REHASHES.value() - rehashes_before == 1
+        assert (await repo.get(created_user.id)).version == 1
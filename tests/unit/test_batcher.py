@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from src.core.batcher import MicroBatcher
+from src.core.metrics import WRITE_BATCH_SIZE
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestMicroBatcher:
+    """Unit tests for grouping concurrent writes into batches."""
+
+    async def test_concurrent_items_share_one_flush(self):
+        """Test items submitted within the window are flushed together."""
+        batches = []
+
+        async def flush(items):
+            batches.append(items)
+            return [item * 10 for item in items]
+
+        batcher = MicroBatcher(flush, max_size=100, max_wait=0.01, name="test_window")
+
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+        assert results == [0, 10, 20, 30, 40]
+        assert batches == [[0, 1, 2, 3, 4]]
+        assert WRITE_BATCH_SIZE.count(batcher="test_window") == 1
+        assert WRITE_BATCH_SIZE.sum(batcher="test_window") == 5
+
+    async def test_full_batches_flush_without_waiting(self):
+        """Test reaching max_size flushes immediately and the rest waits for the window."""
+        batches = []
+
+        async def flush(items):
+            batches.append(items)
+            return items
+
+        batcher = MicroBatcher(flush, max_size=2, max_wait=0.01)
+
+        await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+        assert batches == [[0, 1], [2, 3], [4]]
+        assert batcher.snapshot()["batches"] == 3
+        assert batcher.snapshot()["pending"] == 0
+
+    async def test_errors_reach_their_callers(self):
+        """Test per-item exceptions go to one caller and flush failures go to all."""
+        async def flush(items):
+            return [ValueError(item) if item == "bad" else item for item in items]
+
+        async def broken(items):
+            raise RuntimeError("database down")
+
+        batcher = MicroBatcher(flush, max_size=10, max_wait=0.001)
+        good, bad = await asyncio.gather(
+            batcher.submit("good"), batcher.submit("bad"), return_exceptions=True
+        )
+        failing = MicroBatcher(broken, max_size=10, max_wait=0.001)
+        failures = await asyncio.gather(
+            failing.submit(1), failing.submit(2), return_exceptions=True
+        )
+
+        assert good == "good"
+        assert isinstance(bad, ValueError)
+        assert all(isinstance(failure, RuntimeError) for failure in failures)
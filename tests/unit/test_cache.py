@@ -0,0 +1,163 @@
+import multiprocessing
+import socket
+import time
+import uuid
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.cache import LRUCache, SharedCacheClient, TieredCache, serve_shared_cache
+from src.core.exceptions import NotFoundException
+from src.repository.cached import CachedUserRepository
+from src.repository.user import UserRepository
+
+
+@pytest.fixture
+def shared_cache_address():
+    """Run a shared cache process on a free local port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    address = f"127.0.0.1:{port}"
+    process = multiprocessing.Process(
+        target=serve_shared_cache, args=(address, "test"), daemon=True
+    )
+    process.start()
+    for _ in range(50):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    yield address
+    process.terminate()
+    process.join()
+
+
+@pytest.mark.unit
+class TestLRUCache:
+    """Unit tests for the in-process LRU cache."""
+
+    def test_hit_and_miss_counters(self):
+        """Test hits and misses are counted."""
+        cache = LRUCache(max_entries=10, ttl=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted at the size bound."""
+        cache = LRUCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats.evictions == 1
+
+    def test_expires_after_ttl(self):
+        """Test entries older than the TTL are treated as misses."""
+        cache = LRUCache(max_entries=10, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache.stats.expirations == 1
+        assert len(cache) == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestTieredCache:
+    """Unit tests for the tiered cache and the caching repository."""
+
+    async def test_fill_after_invalidation_is_dropped(self):
+        """Test a read-through fill that raced an invalidation is discarded."""
+        cache = TieredCache(LRUCache())
+        epoch = cache.epoch()
+        await cache.delete("a")
+        await cache.set("a", "stale", epoch=epoch)
+
+        assert await cache.get("a") is None
+
+    async def test_shared_cache_between_workers(self, shared_cache_address):
+        """Test a value set by one worker is visible to another through the shared process."""
+        first = TieredCache(LRUCache(), SharedCacheClient(shared_cache_address, "test"))
+        second = TieredCache(LRUCache(), SharedCacheClient(shared_cache_address, "test"))
+
+        await first.set("a", {"name": "A"})
+
+        assert await second.get("a") == {"name": "A"}
+        assert second.stats.shared_hits == 1
+
+        await first.delete("a")
+        second.local.clear()
+        assert await second.get("a") is None
+
+    async def test_shared_cache_unavailable_is_a_miss(self):
+        """Test an unreachable shared cache degrades to a miss."""
+        cache = TieredCache(LRUCache(), SharedCacheClient("127.0.0.1:1", "test"))
+
+        assert await cache.get("a") is None
+        assert cache.stats.shared_errors == 1
+
+    @pytest.mark.parametrize("authkey", [None, ""])
+    async def test_shared_cache_requires_authkey(self, authkey):
+        """Test neither side of the shared cache runs without an explicit authkey."""
+        with pytest.raises(ValueError):
+            SharedCacheClient("127.0.0.1:7070", authkey)
+        with pytest.raises(ValueError):
+            serve_shared_cache("0.0.0.0:0", authkey)
+
+    async def test_repository_reads_through_and_invalidates(
+        self,
+        db_session: AsyncSession,
+        created_user
+    ):
+        """Test cached reads and invalidation on update and deactivate."""
+        cache = TieredCache(LRUCache())
+        repo = CachedUserRepository(UserRepository(db_session), cache)
+
+        await repo.get_profile(created_user.id)
+        await repo.get_profile(created_user.id)
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+        await repo.update(created_user.id, {"name": "Renamed"})
+        assert (await repo.get_profile(created_user.id)).name == "Renamed"
+
+        await repo.deactivate(created_user.id)
+        assert (await repo.get_profile(created_user.id)).is_active == False
+        assert cache.stats.invalidations == 2
+
+    async def test_repository_fills_only_from_primary(
+        self,
+        db_session: AsyncSession,
+        created_user
+    ):
+        """Test replica reads use the cache but never fill it."""
+        cache = TieredCache(LRUCache())
+        replica_repo = CachedUserRepository(
+            UserRepository(db_session, read_session=db_session), cache
+        )
+        primary_repo = CachedUserRepository(UserRepository(db_session), cache)
+
+        await replica_repo.get_profile(created_user.id)
+        assert len(cache.local) == 0
+
+        await primary_repo.get_profile(created_user.id)
+        await replica_repo.get_profile(created_user.id)
+        assert cache.stats.hits == 1
+
+    async def test_repository_does_not_cache_missing(self, db_session: AsyncSession):
+        """Test not-found lookups are not cached."""
+        cache = TieredCache(LRUCache())
+        repo = CachedUserRepository(UserRepository(db_session), cache)
+
+        with pytest.raises(NotFoundException):
+            await repo.get_profile(uuid.uuid4())
+        assert len(cache.local) == 0
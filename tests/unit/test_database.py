@@ -0,0 +1,174 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.core.database import (
+    Database,
+    InstrumentedQueuePool,
+    ReplicaRouter,
+    engine_options,
+    get_pool_stats,
+)
+from src.core.settings import Settings
+
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.mark.unit
+class TestEngineOptions:
+    """Unit tests for engine configuration from settings."""
+
+    def test_pool_settings_are_applied(self):
+        """Test pool sizing and statement cache settings reach the engine options."""
+        settings = Settings(
+            database_url=TEST_DATABASE_URL,
+            db_pool_size=7,
+            db_max_overflow=3,
+            db_pool_recycle=600,
+            db_pool_pre_ping=True,
+            db_statement_cache_size=250,
+        )
+
+        options = engine_options(settings)
+
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == 7
+        assert options["max_overflow"] == 3
+        assert options["pool_recycle"] == 600
+        assert options["pool_pre_ping"] == True
+        assert options["connect_args"]["statement_cache_size"] == 250
+        assert "prepared_statement_name_func" not in options["connect_args"]
+
+    def test_pgbouncer_mode_disables_statement_caches(self):
+        """Test PgBouncer mode turns off prepared statement caching."""
+        settings = Settings(database_url=TEST_DATABASE_URL, db_pgbouncer_mode=True)
+
+        connect_args = engine_options(settings)["connect_args"]
+
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        name_func = connect_args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestPoolStats:
+    """Unit tests for pool introspection."""
+
+    async def test_reports_checkouts_and_waits(self):
+        """Test checked-out, idle and timeout counters track pool usage."""
+        settings = Settings(
+            database_url=TEST_DATABASE_URL,
+            db_pool_size=1,
+            db_max_overflow=0,
+            db_pool_timeout=0.1,
+        )
+        test_engine = create_async_engine(TEST_DATABASE_URL, **engine_options(settings))
+        try:
+            async with test_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                busy = get_pool_stats(test_engine)
+                with pytest.raises(PoolTimeoutError):
+                    async with test_engine.connect():
+                        pass
+            idle = get_pool_stats(test_engine)
+        finally:
+            await test_engine.dispose()
+
+        assert busy["checked_out"] == 1
+        assert busy["idle"] == 0
+        assert idle["checked_out"] == 0
+        assert idle["idle"] == 1
+        assert idle["timeouts"] == 1
+        assert idle["checkouts"] == 2
+        assert idle["wait_seconds_max"] >= 0.1
+
+    async def test_pgbouncer_mode_executes_queries(self):
+        """Test queries run with statement caching disabled."""
+        settings = Settings(database_url=TEST_DATABASE_URL, db_pgbouncer_mode=True)
+        test_engine = create_async_engine(TEST_DATABASE_URL, **engine_options(settings))
+        try:
+            async with test_engine.connect() as conn:
+                for _ in range(3):
+                    assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+        finally:
+            await test_engine.dispose()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestReplicaRouter:
+    """Unit tests for read replica selection."""
+
+    async def test_round_robin(self):
+        """Test replicas are handed out in turn."""
+        engines = [create_async_engine(TEST_DATABASE_URL) for _ in range(3)]
+        try:
+            router = ReplicaRouter(engines, strategy="round_robin")
+
+            assert [router.choose() for _ in range(6)] == [0, 1, 2, 0, 1, 2]
+        finally:
+            for replica in engines:
+                await replica.dispose()
+
+    async def test_least_connections(self):
+        """Test the replica with the fewest checked-out connections is chosen."""
+        settings = Settings(database_url=TEST_DATABASE_URL)
+        engines = [
+            create_async_engine(TEST_DATABASE_URL, **engine_options(settings)) for _ in range(2)
+        ]
+        try:
+            router = ReplicaRouter(engines, strategy="least_connections")
+            async with engines[0].connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                busy_first = router.choose()
+            async with engines[1].connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                busy_second = router.choose()
+        finally:
+            for replica in engines:
+                await replica.dispose()
+
+        assert busy_first == 1
+        assert busy_second == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestDatabaseLifecycle:
+    """Unit tests for per-process engine creation and disposal."""
+
+    async def test_engines_are_created_lazily_and_disposed(self):
+        """Test no engine exists until first use and dispose releases it."""
+        db = Database(Settings(database_url=TEST_DATABASE_URL))
+        assert db.engine is None
+
+        async with db.session() as session:
+            assert (await session.execute(text("SELECT 1"))).scalar() == 1
+        engine = db.engine
+        assert db.connect().engine is engine
+
+        await db.dispose()
+        assert db.engine is None
+
+    async def test_forked_process_gets_its_own_engine(self):
+        """Test a process other than the creator replaces the inherited engine."""
+        db = Database(Settings(
+            database_url=TEST_DATABASE_URL,
+            db_replica_urls=[TEST_DATABASE_URL],
+        ))
+        inherited = db.connect().engine
+        inherited_replica = db.replica_engines[0]
+        db.pid = -1
+
+        try:
+            db.connect()
+
+            assert db.engine is not inherited
+            assert db.replica_engines[0] is not inherited_replica
+            assert db.replica_router.engines == db.replica_engines
+        finally:
+            await db.dispose()
+            await inherited.dispose()
+            await inherited_replica.dispose()
@@ -0,0 +1,85 @@
+import csv
+import gzip
+import io
+import orjson
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
+
+from src.export import parse_args, run_export
+from src.service.export import EXPORT_FIELDS, ExportStats, export_users
+
+ROWS = [
+    (uuid.UUID(int=1), "Ann", "ann@example.com", True, True, 1),
+    (uuid.UUID(int=2), "Bob, Jr.", "bob@example.com", False, True, 3),
+    (uuid.UUID(int=3), "Cy", "cy@example.com", True, False, 2),
+]
+
+
+async def _batches(rows, size=2):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def _export(**kwargs) -> bytes:
+    return b"".join([chunk async for chunk in export_users(_batches(ROWS), **kwargs)])
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestExportUsers:
+    """Unit tests for the streaming user export."""
+
+    async def test_ndjson(self):
+        """Test every row becomes one JSON object with string ids."""
+        lines = (await _export(export_format="ndjson")).splitlines()
+
+        assert len(lines) == 3
+        assert orjson.loads(lines[1]) == {
+            "id": str(uuid.UUID(int=2)),
+            "name": "Bob, Jr.",
+            "email": "bob@example.com",
+            "is_public": False,
+            "is_active": True,
+            "version": 3,
+        }
+
+    async def test_csv_round_trip(self):
+        """Test CSV output has a header and quotes values that need it."""
+        rows = list(csv.reader(io.StringIO((await _export(export_format="csv")).decode())))
+
+        assert rows[0] == list(EXPORT_FIELDS)
+        assert rows[2][:3] == [str(uuid.UUID(int=2)), "Bob, Jr.", "bob@example.com"]
+        assert len(rows) == 4
+
+    async def test_csv_neutralizes_formulas(self):
+        """Test user-supplied cells that a spreadsheet would evaluate are prefixed with a quote."""
+        rows = [(uuid.UUID(int=4), "=HYPERLINK(\"x\")", "@evil@example.com", True, True, 1)]
+        chunks = [chunk async for chunk in export_users(_batches(rows), export_format="csv")]
+
+        exported = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+
+        assert exported[1][1:3] == ["'=HYPERLINK(\"x\")", "'@evil@example.com"]
+
+    async def test_gzip_and_stats(self):
+        """Test compressed output decompresses to the plain export and stats are filled."""
+        stats = ExportStats()
+
+        compressed = await _export(export_format="csv", compress=True, stats=stats)
+
+        assert gzip.decompress(compressed) == await _export(export_format="csv")
+        assert stats.rows == 3
+        assert stats.bytes == len(compressed)
+        assert stats.finished is not None
+        assert stats.rows_per_second > 0
+
+    async def test_cli_exports_table(self, db_session: AsyncSession, created_users):
+        """Test the export command streams the users table to a file object."""
+        output = io.BytesIO()
+
+        stats = await run_export(parse_args(["--format", "ndjson", "--active", "true"]), output)
+
+        exported = [orjson.loads(line) for line in output.getvalue().splitlines()]
+        active = sorted(str(user.id) for user in created_users if user.is_active)
+        assert [user["id"] for user in exported] == active
+        assert stats.rows == len(active)
@@ -0,0 +1,118 @@
+import asyncio
+import orjson
+import pytest
+import uuid
+
+from src.core.events import UserEvent
+from src.core.feed import UserEventHub
+from src.interface.routers.user import SSE_KEEPALIVE_FRAME, _stream_feed
+
+
+def _event(op: str = "update", seq: int = 1) -> UserEvent:
+    return UserEvent(op=op, ids=(uuid.uuid4(),), at=1.0, seq=seq)
+
+
+def _parse(frame: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    fields["data"] = orjson.loads(fields["data"])
+    return fields
+
+
+def _drain(queue: asyncio.Queue) -> list:
+    frames = []
+    while not queue.empty():
+        frames.append(_parse(queue.get_nowait()))
+    return frames
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestUserEventHub:
+    """Unit tests for change feed fan-out."""
+
+    async def test_fan_out_shares_encoded_frames(self):
+        """Test every subscriber receives the same frame, encoded once."""
+        hub = UserEventHub()
+        first, second = hub.subscribe(), hub.subscribe()
+        event = _event("create", seq=41)
+
+        await hub.on_event(event)
+
+        frame = first.queue.get_nowait()
+        assert second.queue.get_nowait() is frame
+        parsed = _parse(frame)
+        assert parsed["id"] == hub.last_event_id == "41"
+        assert parsed["event"] == "user"
+        assert parsed["data"] == {"op": "create", "ids": [str(event.ids[0])], "at": 1.0}
+
+    async def test_slow_subscriber_is_resynced(self):
+        """Test a full queue is flushed and replaced by a single resync frame."""
+        hub = UserEventHub(queue_size=2)
+        slow = hub.subscribe()
+
+        for seq in range(1, 4):
+            await hub.on_event(_event(seq=seq))
+
+        frames = _drain(slow.queue)
+        assert [frame["event"] for frame in frames] == ["resync"]
+        assert frames[0]["data"] == {"reason": "lagged"}
+        assert frames[0]["id"] == hub.last_event_id
+        assert hub.resyncs == 1
+
+    async def test_resume_from_last_event_id(self):
+        """Test resuming replays buffered events and resyncs ids it cannot serve."""
+        hub = UserEventHub(buffer_size=3)
+        # Sequence numbers are taken before commit, so they may arrive out of order.
+        for seq in (1, 3, 2, 4):
+            await hub.on_event(_event(seq=seq))
+
+        resumed = _drain(hub.subscribe("3").queue)
+        current = _drain(hub.subscribe(hub.last_event_id).queue)
+        evicted = _drain(hub.subscribe("1").queue)
+        unknown = _drain(hub.subscribe("99").queue)
+
+        assert [frame["id"] for frame in resumed] == ["2", "4"]
+        assert current == []
+        assert [frame["data"]["reason"] for frame in evicted + unknown] == ["expired", "expired"]
+
+    async def test_resume_on_another_worker(self):
+        """Test an id issued by one worker's hub resumes on another that saw the same events."""
+        first, second = UserEventHub(), UserEventHub()
+        events = [_event(seq=seq) for seq in (7, 8, 9)]
+        for event in events[:2]:
+            await first.on_event(event)
+        for event in events:
+            await second.on_event(event)
+
+        resumed = _drain(second.subscribe(first.last_event_id).queue)
+
+        assert [frame["id"] for frame in resumed] == ["9"]
+
+    async def test_reset_invalidates_buffered_ids(self):
+        """Test a listener reset resyncs subscribers and old event ids can no longer resume."""
+        hub = UserEventHub()
+        subscription = hub.subscribe()
+        await hub.on_event(_event(seq=5))
+        old_id = hub.last_event_id
+
+        await hub.on_reset("reconnect")
+
+        frames = _drain(subscription.queue)
+        assert [frame["event"] for frame in frames] == ["resync"]
+        assert frames[0]["data"] == {"reason": "reconnect"}
+        assert frames[0]["id"] == ""
+        assert hub.last_event_id is None
+        assert _drain(hub.subscribe(old_id).queue)[0]["event"] == "resync"
+
+    async def test_stream_sends_keepalives_and_unsubscribes(self):
+        """Test the SSE body interleaves keepalives and releases its queue when closed."""
+        hub = UserEventHub()
+        stream = _stream_feed(hub, None, keepalive=0.01)
+
+        assert await stream.__anext__() == SSE_KEEPALIVE_FRAME
+        await hub.on_event(_event())
+        frame = await stream.__anext__()
+        await stream.aclose()
+
+        assert _parse(frame)["event"] == "user"
+        assert hub.subscribers == set()
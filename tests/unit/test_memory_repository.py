@@ -0,0 +1,194 @@
+import pytest
+from src.repository.memory import InMemoryUserRepository, InMemoryUserStore
+from src.service.models.user import UserDTO
+from src.core.exceptions import (
+    NotFoundException,
+    AlreadyExistsException,
+    PreconditionFailedException,
+)
+import uuid
+
+
+@pytest.fixture
+def repo() -> InMemoryUserRepository:
+    return InMemoryUserRepository(InMemoryUserStore())
+
+
+@pytest.fixture
+async def stored_user(repo: InMemoryUserRepository, sample_user_data) -> UserDTO:
+    return await repo.create(UserDTO(
+        name=sample_user_data["name"],
+        email=sample_user_data["email"],
+        hashed_password="hashed_password_123",
+        is_public=sample_user_data["is_public"],
+    ))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestInMemoryUserRepository:
+    """Unit tests for the in-memory IUserRepository backend."""
+
+    async def test_create_and_get(self, repo: InMemoryUserRepository, stored_user: UserDTO):
+        """Test created users get an id, defaults and a full read-back."""
+        fetched = await repo.get(stored_user.id)
+
+        assert isinstance(stored_user.id, uuid.UUID)
+        assert stored_user.is_active == True
+        assert stored_user.version == 1
+        assert fetched == stored_user
+        assert fetched.hashed_password == "hashed_password_123"
+
+    async def test_get_profile_omits_password_hash(
+        self, repo: InMemoryUserRepository, stored_user: UserDTO
+    ):
+        """Test the public read path never carries the password hash."""
+        profile = await repo.get_profile(stored_user.id)
+
+        assert profile.email == stored_user.email
+        assert profile.hashed_password is None
+
+    async def test_get_not_found(self, repo: InMemoryUserRepository):
+        """Test unknown ids raise NotFoundException."""
+        with pytest.raises(NotFoundException):
+            await repo.get(uuid.uuid4())
+        with pytest.raises(NotFoundException):
+            await repo.get_credentials("nobody@example.com")
+
+    async def test_email_uniqueness_is_case_insensitive(
+        self, repo: InMemoryUserRepository, stored_user: UserDTO
+    ):
+        """Test duplicates are detected on the lowercased email."""
+        duplicate = UserDTO(
+            name="Other", email=stored_user.email.upper(), hashed_password="other_hash"
+        )
+
+        with pytest.raises(AlreadyExistsException):
+            await repo.create(duplicate)
+        assert await repo.existing_emails([stored_user.email.upper(), "new@example.com"]) == {
+            stored_user.email.lower()
+        }
+        assert (await repo.get_credentials(stored_user.email.upper())).id == stored_user.id
+
+    async def test_create_many_skips_conflicts(
+        self, repo: InMemoryUserRepository, stored_user: UserDTO
+    ):
+        """Test bulk inserts return None for emails that already exist."""
+        users = [
+            UserDTO(name="A", email="a@example.com", hashed_password="hash"),
+            UserDTO(name="Dup", email=stored_user.email, hashed_password="hash"),
+            UserDTO(name="A again", email="A@example.com", hashed_password="hash"),
+        ]
+
+        ids = await repo.create_many(users)
+
+        assert ids[0] is not None
+        assert ids[1:] == [None, None]
+
+    async def test_create_batch(self, repo: InMemoryUserRepository, stored_user: UserDTO):
+        """Test batched creates return full users and None for duplicates."""
+        created = await repo.create_batch([
+            UserDTO(name="B", email="b@example.com", hashed_password="hash"),
+            UserDTO(name="Dup", email=stored_user.email, hashed_password="hash"),
+        ])
+
+        assert created[0].email == "b@example.com"
+        assert created[0].hashed_password == "hash"
+        assert created[1] is None
+
+    async def test_get_page_and_stream_keyset(self, repo: InMemoryUserRepository):
+        """Test pages follow id order and honour filters."""
+        ids = await repo.create_many([
+            UserDTO(name=f"User {i}", email=f"user{i}@example.com",
+                    hashed_password="hash", is_public=i % 2 == 0)
+            for i in range(5)
+        ])
+        ordered = sorted(ids)
+
+        first = await repo.get_page(limit=2)
+        second = await repo.get_page(limit=2, after=first[-1].id)
+        public = await repo.get_page(limit=10, is_public=True)
+        streamed = [user.id async for user in repo.stream(batch_size=2)]
+        row_batches = [rows async for rows in repo.stream_rows(batch_size=2)]
+
+        assert [user.id for user in first + second] == ordered[:4]
+        assert all(user.is_public for user in public)
+        assert len(public) == 3
+        assert streamed == ordered
+        assert [len(rows) for rows in row_batches] == [2, 2, 1]
+        assert [row[0] for rows in row_batches for row in rows] == ordered
+
+    async def test_get_many_skips_missing(
+        self, repo: InMemoryUserRepository, stored_user: UserDTO
+    ):
+        """Test batch reads return only known ids, once each."""
+        users = await repo.get_many([stored_user.id, uuid.uuid4(), stored_user.id])
+
+        assert [user.id for user in users] == [stored_user.id]
+
+    async def test_update_bumps_version_and_reindexes_email(
+        self, repo: InMemoryUserRepository, stored_user: UserDTO
+    ):
+        """Test updates bump the version and move the email index entry."""
+        updated = await repo.update(stored_user.id, {"email": "renamed@example.com"})
+
+        assert updated.version == 2
+        assert await repo.existing_emails([stored_user.email]) == set()
+        assert (await repo.get_credentials("Renamed@example.com")).id == stored_user.id
+
+    async def test_update_conflicts(
+        self, repo: InMemoryUserRepository, stored_user: UserDTO
+    ):
+        """Test email clashes, stale versions and unknown ids raise like the SQL backend."""
+        other = await repo.create(
+            UserDTO(name="Other", email="other@example.com", hashed_password="hash")
+        )
+
+        with pytest.raises(AlreadyExistsException):
+            await repo.update(other.id, {"email": stored_user.email})
+        with pytest.raises(PreconditionFailedException) as exc_info:
+            await repo.update(stored_user.id, {"name": "Stale"}, expected_versions=[7])
+        with pytest.raises(NotFoundException):
+            await repo.update(uuid.uuid4(), {"name": "Ghost"})
+        assert exc_info.value.code == "version_mismatch"
+
+    async def test_update_password_hash_compare_and_set(
+        self, repo: InMemoryUserRepository, stored_user: UserDTO
+    ):
+        """Test the hash is only replaced when the old hash still matches."""
+        assert await repo.update_password_hash(stored_user.id, "stale", "new") == False
+        assert await repo.update_password_hash(
+            stored_user.id, "hashed_password_123", "new"
+        ) == True
+        user = await repo.get(stored_user.id)
+        assert user.hashed_password == "new"
+        assert user.version == 1
+
+    async def test_deactivate(self, repo: InMemoryUserRepository, stored_user: UserDTO):
+        """Test deactivation flips is_active and checks the version."""
+        with pytest.raises(PreconditionFailedException):
+            await repo.deactivate(stored_user.id, expected_versions=[2])
+
+        await repo.deactivate(stored_user.id, expected_versions=[1])
+
+        user = await repo.get(stored_user.id)
+        assert user.is_active == False
+        assert user.version == 2
+        with pytest.raises(NotFoundException):
+            await repo.deactivate(uuid.uuid4())
+
+    async def test_bulk_update_and_deactivate(
+        self, repo: InMemoryUserRepository, stored_user: UserDTO
+    ):
+        """Test bulk writes skip unknown ids and bump versions like the SQL backend."""
+        missing = uuid.uuid4()
+
+        updated = await repo.update_many([stored_user.id, missing], {"name": "Renamed"})
+        deactivated = await repo.deactivate_many([stored_user.id, missing])
+
+        user = await repo.get(stored_user.id)
+        assert updated == [stored_user.id]
+        assert deactivated == [stored_user.id]
+        assert user.name == "Renamed"
+        assert user.is_active == False
+        assert user.version == 3
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from src.core.metrics import Counter, Histogram, MetricsRegistry, instrument_engine, DB_STATEMENT_DURATION
+
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.mark.unit
+class TestMetrics:
+    """Unit tests for metric primitives and Prometheus rendering."""
+
+    def test_counter_renders_labels(self):
+        """Test counters accumulate per label set."""
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("jobs_total", "Jobs.", labelnames=("kind",)))
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        counter.inc(kind="b")
+
+        output = registry.render()
+
+        assert "# TYPE jobs_total counter" in output
+        assert 'jobs_total{kind="a"} 3' in output
+        assert 'jobs_total{kind="b"} 1' in output
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count follow the exposition format."""
+        histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        output = histogram.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 2' in output
+        assert 'latency_seconds_bucket{le="1"} 3' in output
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in output
+        assert "latency_seconds_sum 2.65" in output
+        assert "latency_seconds_count 4" in output
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestEngineInstrumentation:
+    """Unit tests for SQL statement timing."""
+
+    async def test_statement_timings_are_recorded(self):
+        """Test statements executed on an instrumented engine are timed by type."""
+        test_engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+        instrument_engine(test_engine.sync_engine)
+        before = DB_STATEMENT_DURATION.count(operation="SELECT")
+        try:
+            async with test_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+        finally:
+            await test_engine.dispose()
+
+        assert DB_STATEMENT_DURATION.count(operation="SELECT") == before + 2
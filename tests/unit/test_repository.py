@@ -1,10 +1,18 @@
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
-from src.repository.user import UserRepository
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from src.repository.user import UserRepository, page_statement, update_statement
 from src.service.models.user import UserDTO
-from src.core.exceptions import NotFoundException, AlreadyExistsException
+from src.core.exceptions import (
+    NotFoundException,
+    AlreadyExistsException,
+    PreconditionFailedException,
+)
 import uuid
 
+from tests.conftest import TEST_DATABASE_URL
+
 
 @pytest.mark.unit
 @pytest.mark.asyncio
@@ -21,11 +29,41 @@ class TestUserRepository:
             is_public=sample_user_data["is_public"]
         )
         
-        user_id = await repo.create(user_dto)
+        created = await repo.create(user_dto)
         
-        assert user_id is not None
-        assert isinstance(user_id, uuid.UUID)
+        assert created.id is not None
+        assert isinstance(created.id, uuid.UUID)
+        assert created.email == sample_user_data["email"]
+        assert created.is_active == True
+        assert created.hashed_password == "hashed_password_123"
     
+    async def test_writes_are_single_statement(
+        self,
+        db_session: AsyncSession,
+        sample_user_data
+    ):
+        """Test create, update and deactivate each issue exactly one statement."""
+        repo = UserRepository(db_session)
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split()[0])
+
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            created = await repo.create(UserDTO(
+                name=sample_user_data["name"],
+                email=sample_user_data["email"],
+                hashed_password="hashed_password_123",
+            ))
+            await repo.update(created.id, {"name": "Renamed"})
+            await repo.deactivate(created.id)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert statements == ["INSERT", "UPDATE", "UPDATE"]
+
     async def test_get_user_success(self, db_session: AsyncSession, created_user):
         """Test getting an existing user."""
         repo = UserRepository(db_session)
@@ -37,6 +75,17 @@ class TestUserRepository:
         assert user_dto.email == created_user.email
         assert user_dto.is_active == True
     
+    async def test_get_profile_omits_password_hash(self, db_session: AsyncSession, created_user):
+        """Test the profile read path does not load the password hash."""
+        repo = UserRepository(db_session)
+
+        profile = await repo.get_profile(created_user.id)
+
+        assert profile.id == created_user.id
+        assert profile.email == created_user.email
+        assert profile.hashed_password is None
+        assert (await repo.get(created_user.id)).hashed_password == created_user.hashed_password
+
     async def test_get_user_not_found(self, db_session: AsyncSession):
         """Test getting a non-existent user."""
         repo = UserRepository(db_session)
@@ -66,6 +115,100 @@ class TestUserRepository:
         
         assert "email" in str(exc_info.value.message).lower()
     
+    async def test_email_uniqueness_is_case_insensitive(
+        self,
+        db_session: AsyncSession,
+        created_user
+    ):
+        """Test the functional unique index and the email lookup ignore case."""
+        repo = UserRepository(db_session)
+
+        existing = await repo.existing_emails([created_user.email.upper(), "free@example.com"])
+        assert existing == {created_user.email.lower()}
+
+        with pytest.raises(AlreadyExistsException):
+            await repo.create(UserDTO(
+                name="Shouting",
+                email=created_user.email.upper(),
+                hashed_password="hashed_password_456",
+            ))
+
+    async def test_create_many_users(self, db_session: AsyncSession, created_user):
+        """Test bulk insert reports duplicates without failing the batch."""
+        repo = UserRepository(db_session, chunk_size=2)
+        users = [
+            UserDTO(name="First", email="first@example.com", hashed_password="h1"),
+            UserDTO(name="Taken", email=created_user.email, hashed_password="h2"),
+            UserDTO(name="Second", email="second@example.com", hashed_password="h3", is_public=False),
+            UserDTO(name="Repeat", email="first@example.com", hashed_password="h4"),
+        ]
+
+        ids = await repo.create_many(users)
+
+        assert ids[1] is None
+        assert ids[3] is None
+        first = await repo.get(ids[0])
+        second = await repo.get(ids[2])
+        assert first.email == "first@example.com"
+        assert first.is_active == True
+        assert second.is_public == False
+
+    async def test_create_batch(self, db_session: AsyncSession, created_user):
+        """Test one multi-row insert returns a user per row and None for duplicates."""
+        repo = UserRepository(db_session)
+        users = [
+            UserDTO(name="First", email="first@example.com", hashed_password="hash"),
+            UserDTO(name="Existing", email=created_user.email.upper(), hashed_password="hash"),
+            UserDTO(name="Again", email="First@example.com", hashed_password="hash"),
+        ]
+
+        created = await repo.create_batch(users)
+
+        assert created[0].email == "first@example.com"
+        assert created[0].version == 1
+        assert created[0].is_active == True
+        assert created[1:] == [None, None]
+
+    async def test_get_page_keyset(self, db_session: AsyncSession, created_users):
+        """Test keyset pagination walks all users in id order."""
+        repo = UserRepository(db_session)
+
+        first = await repo.get_page(3)
+        second = await repo.get_page(3, after=first[-1].id)
+
+        assert [u.id for u in first + second] == [u.id for u in created_users]
+        assert all(u.hashed_password is None for u in first)
+
+    @pytest.mark.parametrize("filters", [
+        {"is_active": False},
+        {"is_public": True},
+        {"is_active": True, "is_public": False},
+    ])
+    async def test_get_page_filters(
+        self,
+        db_session: AsyncSession,
+        created_users,
+        filters
+    ):
+        """Test listing filters on is_active and is_public."""
+        repo = UserRepository(db_session)
+
+        page = await repo.get_page(10, **filters)
+
+        expected = [
+            u.id for u in created_users
+            if all(getattr(u, k) == v for k, v in filters.items())
+        ]
+        assert [u.id for u in page] == expected
+
+    async def test_stream(self, db_session: AsyncSession, created_users):
+        """Test streaming yields every matching user through a server-side cursor."""
+        repo = UserRepository(db_session)
+
+        streamed = [u.id async for u in repo.stream(is_active=True, batch_size=2)]
+
+        assert streamed == [u.id for u in created_users if u.is_active]
+
     @pytest.mark.parametrize("update_fields", [
         {"name": "Updated Name"},
         {"is_public": False},
@@ -94,6 +237,48 @@ class TestUserRepository:
         with pytest.raises(NotFoundException):
             await repo.update(non_existent_id, {"name": "New Name"})
     
+    async def test_update_bumps_version(self, db_session: AsyncSession, created_user):
+        """Test every write increments the row version."""
+        repo = UserRepository(db_session)
+
+        updated = await repo.update(created_user.id, {"name": "Renamed"}, expected_versions=[1])
+        await repo.deactivate(created_user.id, expected_versions=[2])
+
+        assert updated.version == 2
+        assert (await repo.get(created_user.id)).version == 3
+
+    async def test_statements_are_reused(self, db_session: AsyncSession, created_users):
+        """Test repeated calls with the same shape reuse one prebuilt statement."""
+        repo = UserRepository(db_session)
+        first, second = created_users[0], created_users[1]
+
+        await repo.update(first.id, {"name": "A", "is_public": False})
+        update_misses = update_statement.cache_info().misses
+        await repo.update(second.id, {"is_public": True, "name": "B"})
+        await repo.get_page(limit=1, after=first.id, is_active=True)
+        page_misses = page_statement.cache_info().misses
+        page = await repo.get_page(limit=1, after=second.id, is_active=False)
+
+        assert update_statement.cache_info().misses == update_misses
+        assert page_statement.cache_info().misses == page_misses
+        assert all(not user.is_active for user in page)
+
+    async def test_update_version_mismatch(self, db_session: AsyncSession, created_user):
+        """Test a stale expected version fails the write and leaves the row untouched."""
+        repo = UserRepository(db_session)
+
+        with pytest.raises(PreconditionFailedException):
+            await repo.update(created_user.id, {"name": "Renamed"}, expected_versions=[7])
+        with pytest.raises(PreconditionFailedException):
+            await repo.deactivate(created_user.id, expected_versions=[])
+        with pytest.raises(NotFoundException):
+            await repo.update(uuid.uuid4(), {"name": "Renamed"}, expected_versions=[1])
+
+        user = await repo.get(created_user.id)
+        assert user.name == created_user.name
+        assert user.is_active == True
+        assert user.version == 1
+
     async def test_deactivate_user(self, db_session: AsyncSession, created_user):
         """Test deactivating a user."""
         repo = UserRepository(db_session)
@@ -111,3 +296,81 @@ class TestUserRepository:
         
         with pytest.raises(NotFoundException):
             await repo.deactivate(non_existent_id)
+
+
+    async def test_deactivate_many(self, db_session: AsyncSession, created_users):
+        """Test set-based deactivation commits per chunk and reports matched ids."""
+        repo = UserRepository(db_session, chunk_size=2)
+        targets = [user.id for user in created_users[:3]]
+        missing = uuid.uuid4()
+
+        deactivated = await repo.deactivate_many(targets + [missing, targets[0]])
+
+        assert sorted(deactivated) == sorted(targets)
+        for user_id in targets:
+            user = await repo.get(user_id)
+            assert user.is_active == False
+            assert user.version == 2
+        for untouched in created_users[3:]:
+            assert (await repo.get(untouched.id)).version == 1
+
+    async def test_update_many(self, db_session: AsyncSession, created_users):
+        """Test one bulk patch applies the same values to every matched row."""
+        repo = UserRepository(db_session)
+        targets = [created_users[0].id, created_users[2].id]
+
+        updated = await repo.update_many(targets + [uuid.uuid4()], {"is_public": False})
+        unchanged = await repo.update_many([targets[0]], {})
+
+        assert sorted(updated) == sorted(targets)
+        assert unchanged == [targets[0]]
+        for user_id in targets:
+            user = await repo.get(user_id)
+            assert user.is_public == False
+            assert user.version == 2
+        with pytest.raises(AlreadyExistsException):
+            await repo.update_many(targets, {"email": "same@example.com"})
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestReadReplicaRouting:
+    """Unit tests for routing repository reads to a replica session."""
+
+    @pytest.fixture
+    async def replica_session(self, db_session: AsyncSession):
+        replica_engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split()[0])
+
+        event.listen(replica_engine.sync_engine, "before_cursor_execute", record)
+        async with async_sessionmaker(replica_engine, class_=AsyncSession)() as session:
+            session.info["statements"] = statements
+            yield session
+        await replica_engine.dispose()
+
+    async def test_reads_go_to_replica(
+        self, db_session: AsyncSession, replica_session: AsyncSession, created_user
+    ):
+        """Test read-only calls use the replica while writes stay on the primary."""
+        repo = UserRepository(db_session, read_session=replica_session)
+
+        profile = await repo.get_profile(created_user.id)
+        page = await repo.get_page(limit=10)
+
+        assert profile.id == created_user.id
+        assert [user.id for user in page] == [created_user.id]
+        assert replica_session.info["statements"] == ["SELECT", "SELECT"]
+
+    async def test_reads_follow_writes_to_primary(
+        self, db_session: AsyncSession, replica_session: AsyncSession, created_user
+    ):
+        """Test reads after a write in the same request see the write."""
+        repo = UserRepository(db_session, read_session=replica_session)
+
+        await repo.update(created_user.id, {"name": "Renamed"})
+        profile = await repo.get_profile(created_user.id)
+
+        assert profile.name == "Renamed"
+        assert replica_session.info["statements"] == []
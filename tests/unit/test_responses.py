@@ -0,0 +1,75 @@
+import uuid
+import msgpack
+import orjson
+import pytest
+from src.interface.responses import (
+    FastJSONResponse,
+    MsgPackResponse,
+    etag_matches,
+    if_match_versions,
+    negotiate_response_class,
+)
+from src.interface.schemas import UserResponseSchema
+
+
+@pytest.mark.unit
+class TestResponseEncoding:
+    """Unit tests for response encoders and Accept negotiation."""
+
+    @pytest.mark.parametrize("accept,expected", [
+        (None, FastJSONResponse),
+        ("*/*", FastJSONResponse),
+        ("application/json", FastJSONResponse),
+        ("text/html", FastJSONResponse),
+        ("application/msgpack", MsgPackResponse),
+        ("application/x-msgpack, */*;q=0.1", MsgPackResponse),
+        ("application/json;q=0.9, application/vnd.msgpack", MsgPackResponse),
+        ("application/msgpack;q=0.2, application/json", FastJSONResponse),
+        ("application/msgpack;q=0", FastJSONResponse),
+    ])
+    def test_negotiation(self, accept, expected):
+        """Test the response class picked for various Accept headers."""
+        assert negotiate_response_class(accept) is expected
+
+    def test_encoders_agree(self):
+        """Test JSON and MessagePack encode the same model to the same data."""
+        user = UserResponseSchema(
+            id=uuid.uuid4(),
+            name="Test User",
+            email="test@example.com",
+            is_public=True,
+            is_active=True,
+        )
+
+        as_json = orjson.loads(FastJSONResponse(user).body)
+        as_msgpack = msgpack.unpackb(MsgPackResponse(user).body)
+
+        assert as_json == as_msgpack == {**user.model_dump(), "id": str(user.id)}
+
+    def test_json_encodes_plain_content(self):
+        """Test plain content with non-string keys and UUIDs is encoded with orjson."""
+        user_id = uuid.uuid4()
+
+        body = FastJSONResponse({"id": user_id, 1: "one"}).body
+
+        assert orjson.loads(body) == {"id": str(user_id), "1": "one"}
+
+    @pytest.mark.parametrize("header,expected", [
+        (None, None),
+        ("*", None),
+        ('"3"', [3]),
+        ('"3-msgpack", "4"', [3, 4]),
+        ('W/"3"', []),
+        ('"abc"', []),
+    ])
+    def test_if_match_versions(self, header, expected):
+        """Test If-Match parsing into acceptable row versions."""
+        assert if_match_versions(header) == expected
+
+    def test_if_none_match_uses_weak_comparison(self):
+        """Test If-None-Match matches weak tags, lists and the wildcard."""
+        assert etag_matches('W/"3"', '"3"')
+        assert etag_matches('"2", "3"', '"3"')
+        assert etag_matches("*", '"3"')
+        assert not etag_matches('"3"', '"3-msgpack"')
+        assert not etag_matches(None, '"3"')
@@ -1,5 +1,22 @@
+import asyncio
+import time
 import pytest
-from src.core.security import hash_password, verify_password
+from src.core.exceptions import ServiceUnavailableException
+from src.core.metrics import PASSWORD_HASH_DURATION
+from src.core.security import (
+    HashingEngine,
+    build_crypt_context,
+    calibrate_bcrypt_rounds,
+    hash_password,
+    hash_password_async,
+    verify_password,
+    verify_password_async,
+)
+
+
+def _slow_identity(value, delay):
+    time.sleep(delay)
+    return value
 
 
 @pytest.mark.unit
@@ -64,3 +81,157 @@ class TestSecurity:
         # But both verify correctly
         assert verify_password(password, hash1)
         assert verify_password(password, hash2)
+
+
+@pytest.mark.unit
+class TestBcryptCost:
+    """Unit tests for bcrypt cost calibration and upgrades."""
+
+    @pytest.mark.parametrize("base_seconds,expected", [
+        (0.01, 14),
+        (0.05, 12),
+        (0.3, 10),
+        (0.0001, 16),
+    ])
+    def test_calibrate_rounds(self, monkeypatch, base_seconds, expected):
+        """Test the cost is extrapolated from one measurement and clamped to the bounds."""
+        monkeypatch.setattr(
+            "src.core.security.measure_bcrypt_seconds", lambda rounds: base_seconds
+        )
+
+        assert calibrate_bcrypt_rounds(0.25, min_rounds=10, max_rounds=16) == expected
+
+    def test_pinned_rounds_flag_other_costs(self):
+        """Test hashes made with any other cost need an update and are re-hashed on verify."""
+        context = build_crypt_context(5)
+        old_hash = build_crypt_context(4).hash("secret")
+
+        valid, new_hash = context.verify_and_update("secret", old_hash)
+
+        assert context.needs_update(old_hash)
+        assert valid
+        assert new_hash.startswith("$2b$05$")
+        assert not context.needs_update(new_hash)
+        assert context.verify_and_update("wrong", old_hash) == (False, None)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestHashingEngine:
+    """Unit tests for the process-pool hashing engine."""
+
+    async def test_hash_password_async_roundtrip(self):
+        """Test async hashing produces a hash that verifies both ways."""
+        hashed_before = PASSWORD_HASH_DURATION.count(operation="hash_password")
+        hashed = await hash_password_async("SecurePassword123!")
+
+        assert PASSWORD_HASH_DURATION.count(operation="hash_password") == hashed_before + 1
+
+        assert hashed.startswith("$2b$")
+        assert verify_password("SecurePassword123!", hashed)
+        assert await verify_password_async("SecurePassword123!", hashed) == True
+        assert await verify_password_async("WrongPassword456!", hashed) == False
+
+    async def test_rejects_when_queue_is_full(self):
+        """Test jobs beyond pool size plus queue depth are rejected."""
+        engine = HashingEngine(pool_size=1, queue_size=1, timeout=5)
+        try:
+            results = await asyncio.gather(
+                *(engine.run(_slow_identity, i, 0.3) for i in range(3)),
+                return_exceptions=True,
+            )
+        finally:
+            engine.shutdown()
+
+        rejected = [r for r in results if isinstance(r, ServiceUnavailableException)]
+        assert len(rejected) == 1
+        assert sorted(r for r in results if isinstance(r, int)) == [0, 1]
+        assert engine.pending == 0
+
+    async def test_times_out(self):
+        """Test a job exceeding the timeout raises ServiceUnavailableException."""
+        engine = HashingEngine(pool_size=1, queue_size=0, timeout=0.05)
+        try:
+            with pytest.raises(ServiceUnavailableException) as exc_info:
+                await engine.run(_slow_identity, 1, 0.5)
+        finally:
+            engine.shutdown()
+
+        assert exc_info.value.code == "hashing_timeout"
+
+    async def test_timed_out_job_stays_admitted_until_it_finishes(self):
+        """Test a timed out job keeps its admission slot while the worker still runs it."""
+        engine = HashingEngine(pool_size=1, queue_size=0, timeout=0.05)
+        try:
+            with pytest.raises(ServiceUnavailableException):
+                await engine.run(_slow_identity, 1, 0.5)
+            assert engine.pending == 1
+            with pytest.raises(ServiceUnavailableException) as exc_info:
+                await engine.run(_slow_identity, 2, 0)
+            assert exc_info.value.code == "hashing_overloaded"
+
+            # Spawned workers import the app first, so allow for their startup.
+            for _ in range(200):
+                if engine.pending == 0:
+                    break
+                await asyncio.sleep(0.05)
+            assert engine.pending == 0
+            assert await engine.run(_slow_identity, 3, 0) == 3
+        finally:
+            engine.shutdown()
+
+    async def test_single_hash_interleaves_with_bulk(self):
+        """Test a signup hash is not queued behind a running bulk batch."""
+        engine = HashingEngine(pool_size=2, queue_size=64, timeout=30)
+        try:
+            await asyncio.gather(*(engine.run(_slow_identity, i, 0.2) for i in range(2)))
+            bulk_started = time.perf_counter()
+            bulk = asyncio.ensure_future(engine.hash_many(["BulkPassword1!"] * 16))
+            await asyncio.sleep(0.1)
+
+            single_started = time.perf_counter()
+            hashed = await engine.hash("SecurePassword123!")
+            single_seconds = time.perf_counter() - single_started
+            assert not bulk.done()
+
+            hashes = await bulk
+            bulk_seconds = time.perf_counter() - bulk_started
+        finally:
+            engine.shutdown()
+
+        assert verify_password("SecurePassword123!", hashed)
+        assert len(hashes) == 16
+        assert single_seconds < bulk_seconds / 4
+        assert engine.pending == 0
+
+    async def test_bulk_keeps_its_slots_while_singles_fill_the_queue(self):
+        """Test a running batch is never rejected when single jobs use up the rest of the queue."""
+        engine = HashingEngine(pool_size=2, queue_size=1, timeout=30)
+        try:
+            bulk = asyncio.ensure_future(engine.hash_many(["BulkPassword1!"] * 4))
+            await asyncio.sleep(0)
+            assert engine.pending == engine.bulk_concurrency == 1
+
+            singles = await asyncio.gather(
+                *(engine.run(_slow_identity, i, 0.2) for i in range(3)),
+                return_exceptions=True,
+            )
+            hashes = await bulk
+        finally:
+            engine.shutdown()
+
+        assert sorted(r for r in singles if isinstance(r, int)) == [0, 1]
+        assert [r.code for r in singles if isinstance(r, ServiceUnavailableException)] == [
+            "hashing_overloaded"
+        ]
+        assert len(hashes) == 4
+        assert engine.pending == 0
+
+    @pytest.mark.parametrize("pool_size,requested,expected", [
+        (4, None, 2), (4, 8, 3), (2, None, 1), (1, None, 1), (1, 4, 1),
+    ])
+    async def test_bulk_concurrency_leaves_a_worker_free(self, pool_size, requested, expected):
+        """Test bulk jobs never take the whole pool unless it has a single process."""
+        engine = HashingEngine(pool_size=pool_size, bulk_concurrency=requested)
+
+        assert engine.bulk_concurrency == expected
@@ -0,0 +1,25 @@
+import pytest
+from src.server import parse_args, server_options
+
+
+@pytest.mark.unit
+class TestServerOptions:
+    """Unit tests for the production server launcher."""
+
+    def test_production_options(self):
+        """Test workers and graceful shutdown are passed through and reload is off."""
+        options = server_options(parse_args(["--workers", "4", "--graceful-timeout", "15"]))
+
+        assert options["workers"] == 4
+        assert options["timeout_graceful_shutdown"] == 15
+        assert options["reload"] == False
+        assert options["lifespan"] == "on"
+
+    def test_falls_back_without_optional_speedups(self, monkeypatch):
+        """Test the stdlib loop and h11 are used when uvloop/httptools are missing."""
+        monkeypatch.setattr("src.server._available", lambda module: False)
+
+        options = server_options(parse_args([]))
+
+        assert options["loop"] == "asyncio"
+        assert options["http"] == "h11"
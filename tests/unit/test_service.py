@@ -1,10 +1,20 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from src.service.user import UserService
 from src.repository.user import UserRepository
 from src.service.models.user import UserDTO
-from src.core.exceptions import NotFoundException, AlreadyExistsException
+from src.core.exceptions import NotFoundException, AlreadyExistsException, ValidationException
+from src.core.metrics import PASSWORD_HASHES_SKIPPED, USER_SIGNUP_DUPLICATES
 from src.core.security import verify_password
+from src.core.batcher import MicroBatcher
+from src.core.di import PRIMARY_READS_COOKIE, flight_repository_factory, get_user_service
+from src.core.settings import get_settings
+from src.core.singleflight import SingleFlight
+from src.repository.cached import CachedUserRepository
 import uuid
 
 
@@ -29,11 +39,11 @@ class TestUserService:
             is_public=sample_user_data["is_public"]
         )
         
-        user_id = await service.create_user(user_dto)
+        created = await service.create_user(user_dto)
         
         # Verify user was created
-        created_user = await service.get_user(user_id)
-        assert created_user.id == user_id
+        created_user = await service.get_user(created.id)
+        assert created_user.id == created.id
         
         # Verify password was hashed (not equal to original)
         assert created_user.hashed_password != sample_user_data["password"]
@@ -44,6 +54,75 @@ class TestUserService:
             created_user.hashed_password
         )
     
+    async def test_create_users_hashes_passwords(
+        self,
+        db_session: AsyncSession,
+        created_user,
+        sample_user_data_2
+    ):
+        """Test bulk creation hashes every password and reports duplicates."""
+        repo = UserRepository(db_session)
+        service = UserService(repo)
+
+        users = [
+            UserDTO(
+                name=sample_user_data_2["name"],
+                email=sample_user_data_2["email"],
+                hashed_password=sample_user_data_2["password"],
+            ),
+            UserDTO(
+                name="Duplicate",
+                email=created_user.email,
+                hashed_password="password123",
+            ),
+        ]
+
+        results = await service.create_users(users)
+
+        assert [r.status for r in results] == ["created", "duplicate"]
+        assert results[1].id is None
+        created = await service.get_user(results[0].id)
+        assert verify_password(sample_user_data_2["password"], created.hashed_password)
+
+    async def test_duplicate_signups_skip_hashing(
+        self,
+        db_session: AsyncSession,
+        created_user,
+        monkeypatch
+    ):
+        """Test known duplicates are rejected before any password is hashed."""
+        hashed = []
+
+        async def fake_hash_many(passwords):
+            hashed.extend(passwords)
+            return [f"hashed-{password}" for password in passwords]
+
+        async def fail_hash(password):
+            raise AssertionError("duplicate signup must not be hashed")
+
+        monkeypatch.setattr("src.service.user.hash_password_async", fail_hash)
+        monkeypatch.setattr("src.service.user.hash_passwords_async", fake_hash_many)
+        service = UserService(UserRepository(db_session))
+        skipped_before = PASSWORD_HASHES_SKIPPED.value()
+        duplicates_before = USER_SIGNUP_DUPLICATES.value(stage="precheck")
+
+        with pytest.raises(AlreadyExistsException):
+            await service.create_user(UserDTO(
+                name="Retry",
+                email=created_user.email.upper(),
+                hashed_password="password123",
+            ))
+        results = await service.create_users([
+            UserDTO(name="New", email="new@example.com", hashed_password="p1"),
+            UserDTO(name="Taken", email=created_user.email, hashed_password="p2"),
+            UserDTO(name="Repeat", email="NEW@example.com", hashed_password="p3"),
+        ])
+
+        assert [r.status for r in results] == ["created", "duplicate", "duplicate"]
+        assert hashed == ["p1"]
+        assert PASSWORD_HASHES_SKIPPED.value() - skipped_before == 3
+        assert USER_SIGNUP_DUPLICATES.value(stage="precheck") - duplicates_before == 3
+
     async def test_get_user(self, db_session: AsyncSession, created_user):
         """Test getting a user through service."""
         repo = UserRepository(db_session)
@@ -63,6 +142,196 @@ class TestUserService:
         with pytest.raises(NotFoundException):
             await service.get_user(non_existent_id)
     
+    async def test_get_users_reports_missing(self, db_session: AsyncSession, created_users):
+        """Test batch lookup keeps request order and reports unknown ids."""
+        service = UserService(UserRepository(db_session))
+        unknown = uuid.uuid4()
+        requested = [created_users[2].id, unknown, created_users[0].id, created_users[2].id]
+
+        batch = await service.get_users(requested)
+
+        assert [u.id for u in batch.items] == [created_users[2].id, created_users[0].id]
+        assert batch.missing == [unknown]
+
+    async def test_create_user_batched(self, db_session: AsyncSession, monkeypatch):
+        """Test concurrent creates are inserted together and duplicates fail individually."""
+        async def fake_hash(password):
+            return f"hashed-{password}"
+
+        monkeypatch.setattr("src.service.user.hash_password_async", fake_hash)
+        session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+        batcher = MicroBatcher(
+            UserRepository(db_session).create_batch, max_size=10, max_wait=0.05
+        )
+        duplicates_before = USER_SIGNUP_DUPLICATES.value(stage="insert")
+
+        async def signup(email):
+            # Each request has its own session; only the batched insert is shared.
+            async with session_factory() as session:
+                service = UserService(UserRepository(session), create_batcher=batcher)
+                return await service.create_user(
+                    UserDTO(name="Batched", email=email, hashed_password="SecurePass123!")
+                )
+
+        results = await asyncio.gather(
+            signup("one@example.com"),
+            signup("two@example.com"),
+            signup("ONE@example.com"),
+            return_exceptions=True,
+        )
+        # Prechecks run on separate connections, so either spelling may reach the batch first.
+        created = [result for result in results if isinstance(result, UserDTO)]
+        conflicts = [result for result in results if isinstance(result, AlreadyExistsException)]
+
+        assert batcher.batches == 1
+        assert sorted(user.email.lower() for user in created) == [
+            "one@example.com", "two@example.com"
+        ]
+        assert len({user.id for user in created}) == 2
+        assert len(conflicts) == 1
+        assert USER_SIGNUP_DUPLICATES.value(stage="insert") == duplicates_before + 1
+
+    async def test_get_profile_singleflight(self, db_session: AsyncSession, created_user):
+        """Test concurrent lookups of the same id share one repository call."""
+        repo = UserRepository(db_session)
+        calls = []
+        original_get_profile = repo.get_profile
+
+        async def counting_get_profile(user_id):
+            calls.append(user_id)
+            await asyncio.sleep(0.01)
+            return await original_get_profile(user_id)
+
+        repo.get_profile = counting_get_profile
+        singleflight = SingleFlight()
+        service = UserService(repo, singleflight=singleflight)
+
+        users = await asyncio.gather(*(service.get_profile(created_user.id) for _ in range(5)))
+
+        assert len(calls) == 1
+        assert singleflight.shared == 4
+        assert all(u.id == created_user.id for u in users)
+        assert singleflight.snapshot()["inflight"] == 0
+
+    async def test_routed_reads_do_not_share_flights(
+        self, db_session: AsyncSession, created_user
+    ):
+        """Test primary and post-write reads never join a replica flight for the same id."""
+        replica_repo = UserRepository(db_session, read_session=db_session)
+        written_repo = UserRepository(db_session, read_session=db_session)
+        written_repo.wrote = True
+        primary_repo = UserRepository(db_session)
+        calls = []
+
+        def fake_get_profile(source):
+            async def get_profile(user_id):
+                calls.append(source)
+                await asyncio.sleep(0.01)
+                return source
+            return get_profile
+
+        for repo, source in [
+            (replica_repo, "replica"), (written_repo, "written"), (primary_repo, "primary")
+        ]:
+            repo.get_profile = fake_get_profile(source)
+        singleflight = SingleFlight()
+        services = [
+            UserService(repo, singleflight=singleflight)
+            for repo in (replica_repo, replica_repo, written_repo, primary_repo)
+        ]
+
+        results = await asyncio.gather(*(s.get_profile(created_user.id) for s in services))
+
+        assert results == ["replica", "replica", "written", "primary"]
+        assert sorted(calls) == ["primary", "replica", "written"]
+        assert singleflight.shared == 1
+
+    async def test_pinned_reads_skip_singleflight(self, db_session: AsyncSession, monkeypatch):
+        """Test a client pinned to the primary after a write skips shared flights and the cache."""
+        monkeypatch.setattr(get_settings(), "user_cache_enabled", True)
+        cookie = f"{PRIMARY_READS_COOKIE}={time.time() + 60}"
+        request = Request({"type": "http", "headers": [(b"cookie", cookie.encode())]})
+
+        pinned = await get_user_service(request, session=db_session, read_session=db_session)
+        unpinned = await get_user_service(
+            Request({"type": "http", "headers": []}), session=db_session, read_session=db_session
+        )
+
+        assert pinned.singleflight is None
+        assert isinstance(pinned.user_repository, UserRepository)
+        assert pinned.user_repository.read_target == "primary"
+        assert unpinned.singleflight is not None
+        assert isinstance(unpinned.user_repository, CachedUserRepository)
+        assert unpinned.user_repository.read_target == "replica"
+
+    async def test_cancelled_leader_does_not_break_shared_flight(
+        self, db_session: AsyncSession, created_user
+    ):
+        """Test followers still get the user when the request leading their flight is cancelled."""
+        flight_factory = flight_repository_factory(db_session)
+
+        @asynccontextmanager
+        async def slow_flight_repository(read_target):
+            async with flight_factory(read_target) as repo:
+                await asyncio.sleep(0.05)
+                yield repo
+
+        singleflight = SingleFlight()
+        leader = UserService(
+            UserRepository(db_session),
+            singleflight=singleflight,
+            flight_repository=slow_flight_repository,
+        )
+        follower = UserService(
+            UserRepository(db_session),
+            singleflight=singleflight,
+            flight_repository=slow_flight_repository,
+        )
+
+        leading = asyncio.ensure_future(leader.get_profile(created_user.id))
+        await asyncio.sleep(0)
+        following = asyncio.ensure_future(follower.get_profile(created_user.id))
+        await asyncio.sleep(0)
+        leading.cancel()
+        await db_session.close()
+
+        user = await following
+
+        assert leading.cancelled()
+        assert user.id == created_user.id
+        assert singleflight.shared == 1
+
+    async def test_get_profile_singleflight_propagates_errors(self, db_session: AsyncSession):
+        """Test every waiter of a shared call receives its exception."""
+        service = UserService(UserRepository(db_session), singleflight=SingleFlight())
+        missing_id = uuid.uuid4()
+
+        results = await asyncio.gather(
+            *(service.get_profile(missing_id) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, NotFoundException) for r in results)
+
+    async def test_list_users_cursor(self, db_session: AsyncSession, created_users):
+        """Test list_users returns an opaque cursor until the last page."""
+        repo = UserRepository(db_session)
+        service = UserService(repo)
+
+        first = await service.list_users(3)
+        second = await service.list_users(3, cursor=first.next_cursor)
+
+        assert first.next_cursor is not None
+        assert second.next_cursor is None
+        assert [u.id for u in first.items + second.items] == [u.id for u in created_users]
+
+    async def test_list_users_invalid_cursor(self, db_session: AsyncSession):
+        """Test a malformed cursor raises ValidationException."""
+        service = UserService(UserRepository(db_session))
+
+        with pytest.raises(ValidationException):
+            await service.list_users(10, cursor="not-a-cursor")
+
     @pytest.mark.parametrize("update_data,should_hash", [
         ({"name": "Updated Name"}, False),
         ({"password": "NewPassword123!"}, True),